@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# environment_fingerprint_mongo.py
+# Fingerprint do servidor, do dataset e do host cliente gravado com cada resumo
+
+import os
+import json
+import socket
+import platform
+from datetime import datetime
+
+import pandas as pd
+import pymongo
+from pymongo.errors import OperationFailure
+
+FINGERPRINT_FILE = "environment_fingerprint.json"
+
+# Coleções do dataset que entram na checagem de compatibilidade
+# (coleções auxiliares como mv_* ficam só no registro informativo)
+DATASET_COLLECTIONS = ["orders"]
+
+# Parâmetros de servidor relevantes para desempenho (getParameter)
+SERVER_PARAMETERS = [
+    "internalQueryExecYieldIterations",
+    "internalQueryMaxBlockingSortMemoryUsageBytes",
+    "internalDocumentSourceGroupMaxMemoryBytes",
+    "wiredTigerConcurrentReadTransactions",
+]
+
+
+# ============================================================
+# Host cliente
+# ============================================================
+
+def _total_memory_bytes():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def client_host_info():
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "memory_bytes": _total_memory_bytes(),
+        "python_version": platform.python_version(),
+        "libraries": {
+            "pymongo": pymongo.version,
+            "pandas": pd.__version__,
+        },
+    }
+
+
+# ============================================================
+# Servidor / dataset
+# ============================================================
+
+def server_info(db):
+    admin = db.client.admin
+    build = admin.command("buildInfo")
+    status = admin.command("serverStatus")
+    cache = status.get("wiredTiger", {}).get("cache", {})
+
+    parameters = {}
+    for name in SERVER_PARAMETERS:
+        try:
+            parameters[name] = admin.command("getParameter", 1, **{name: 1}).get(name)
+        except OperationFailure:
+            parameters[name] = None
+
+    try:
+        topology = admin.command("hello")
+    except OperationFailure:
+        topology = {}
+
+    return {
+        "version": build.get("version"),
+        "git_version": build.get("gitVersion"),
+        "storage_engine": status.get("storageEngine", {}).get("name"),
+        "wiredtiger_cache_bytes": cache.get("maximum bytes configured"),
+        "set_name": topology.get("setName"),
+        "is_mongos": topology.get("msg") == "isdbgrid",
+        # pelo mongos o serverStatus não tem wiredTiger (cache fica None)
+        "topology": (
+            "mongos" if topology.get("msg") == "isdbgrid"
+            else "replica_set" if topology.get("setName")
+            else "standalone"
+        ),
+        "parameters": parameters,
+    }
+
+
+def dataset_collections(db):
+    collections = {}
+    for name in sorted(db.list_collection_names()):
+        stats = db.command("collStats", name)
+        collections[name] = {
+            "count": stats.get("count"),
+            "size_bytes": stats.get("size"),
+            "storage_bytes": stats.get("storageSize"),
+            "index_bytes": stats.get("totalIndexSize"),
+            "sharded": stats.get("sharded", False),
+            "indexes": sorted(
+                f"{idx['name']}({','.join(f'{k}:{v}' for k, v in idx['key'].items())})"
+                for idx in db[name].list_indexes()
+            ),
+        }
+    return collections
+
+
+def collect_fingerprint(db, sf):
+    server = server_info(db)
+    collections = dataset_collections(db)
+    client = client_host_info()
+    version = server.get("version") or ""
+
+    return {
+        "captured_at": datetime.now().isoformat(timespec="seconds"),
+        "engine": "mongodb",
+        "sf": sf,
+        "database": db.name,
+        "server": server,
+        "dataset": {"collections": collections},
+        "client": client,
+        # Campos que precisam ser iguais para dois resumos serem comparáveis
+        "compatibility": {
+            "engine": "mongodb",
+            "sf": sf,
+            "server_version": ".".join(version.split(".")[:2]),
+            "cache_bytes": server.get("wiredtiger_cache_bytes"),
+            "row_counts": {
+                name: collections[name]["count"]
+                for name in DATASET_COLLECTIONS if name in collections
+            },
+            "indexes": [
+                f"{name}.{index}"
+                for name in DATASET_COLLECTIONS if name in collections
+                for index in collections[name]["indexes"]
+            ],
+            "client_cpu_count": client["cpu_count"],
+        },
+    }
+
+
+def write_fingerprint(fingerprint, output_dir):
+    path = os.path.join(output_dir, FINGERPRINT_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fingerprint, f, indent=2, default=str)
+    return path
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# materialized_views_mongo.py
+# Coleções de pré-agregação atualizadas a partir de change streams
+
+from collections import defaultdict
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure, PyMongoError
+
+# ============================================================
+# Coleções de resumo
+# ============================================================
+# mv_order_totals     -> M1 (receita total / nº de pedidos)
+# mv_product_revenue  -> M3 (receita por produto)
+# mv_customer_orders  -> M5 / Q6 (nº de pedidos por cliente)
+# mv_state            -> resume token do change stream
+
+SOURCE_COLLECTION = "orders"
+STATE_COLLECTION = "mv_state"
+STATE_ID = "orders_summaries"
+TOTALS_ID = "global"
+
+REBUILD_PIPELINES = {
+    "mv_order_totals": [
+        {"$group": {
+            "_id": TOTALS_ID,
+            "total_revenue": {"$sum": "$total_price"},
+            "num_orders": {"$sum": 1}
+        }},
+        {"$out": "mv_order_totals"}
+    ],
+    "mv_product_revenue": [
+        {"$unwind": "$order_line"},
+        {"$group": {
+            "_id": "$order_line.product_id",
+            "total_revenue": {"$sum": "$order_line.subtotal"},
+            "num_lines": {"$sum": 1}
+        }},
+        {"$out": "mv_product_revenue"}
+    ],
+    "mv_customer_orders": [
+        {"$group": {
+            "_id": "$customer_id",
+            "total_orders": {"$sum": 1}
+        }},
+        {"$out": "mv_customer_orders"}
+    ],
+}
+
+
+# ============================================================
+# Recarga completa
+# ============================================================
+
+# O resume token é tirado antes do $out: uma escrita em `orders` durante a
+# recarga entraria no resumo e de novo como delta no próximo refresh. Por
+# isso a recarga só vale se o change stream não tem eventos entre o token e o
+# fim dos $out; senão é refeita (até REBUILD_ATTEMPTS vezes) e, com escritas
+# contínuas, o token fica vazio e o próximo refresh recarrega de novo.
+REBUILD_ATTEMPTS = 3
+
+
+def _enable_change_images(db):
+    """
+    Pré e pós-imagens no change stream de `orders` (MongoDB 6.0+): cada
+    evento de update/replace/delete traz o documento antes e depois dele.
+    False se o servidor não aceita.
+    """
+    try:
+        db.command("collMod", SOURCE_COLLECTION, changeStreamPreAndPostImages={"enabled": True})
+        return True
+    except OperationFailure:
+        return False
+
+
+def _current_resume_token(db):
+    """Token do fim atual do change stream (None se não houver replica set)."""
+    try:
+        with db[SOURCE_COLLECTION].watch() as stream:
+            stream.try_next()
+            return stream.resume_token
+    except OperationFailure:
+        return None
+
+
+def _changed_since(db, token):
+    """Se `orders` teve alguma mudança depois de `token`."""
+    with db[SOURCE_COLLECTION].watch(resume_after=token) as stream:
+        return stream.try_next() is not None
+
+
+def rebuild_materialized_views(db):
+    """
+    Recarga completa. Retorna True se o resumo ficou consistente com um
+    resume token (refresh incremental possível a seguir); sem pré/pós-imagens
+    o refresh incremental não tem como calcular os deltas e não há token.
+    """
+    images = _enable_change_images(db)
+    for _ in range(REBUILD_ATTEMPTS):
+        token = _current_resume_token(db) if images else None
+
+        for pipeline in REBUILD_PIPELINES.values():
+            db[SOURCE_COLLECTION].aggregate(pipeline, allowDiskUse=True)
+
+        if token is None or not _changed_since(db, token):
+            break
+    else:
+        # escritas durante todas as tentativas: sem token confiável
+        token = None
+
+    db["mv_product_revenue"].create_index([("total_revenue", -1)])
+
+    db[STATE_COLLECTION].replace_one(
+        {"_id": STATE_ID},
+        {"_id": STATE_ID, "resume_token": token},
+        upsert=True,
+    )
+    return token is not None
+
+
+# ============================================================
+# Atualização incremental
+# ============================================================
+
+def _apply_order(deltas, order, sign):
+    deltas["totals"]["total_revenue"] += sign * (order.get("total_price") or 0)
+    deltas["totals"]["num_orders"] += sign
+    deltas["customers"][order.get("customer_id")] += sign
+    for line in order.get("order_line") or []:
+        product = deltas["products"][line.get("product_id")]
+        product["total_revenue"] += sign * (line.get("subtotal") or 0)
+        product["num_lines"] += sign
+
+
+def _write_deltas(db, deltas):
+    totals = deltas["totals"]
+    if totals["num_orders"] or totals["total_revenue"]:
+        db["mv_order_totals"].update_one(
+            {"_id": TOTALS_ID},
+            {"$inc": dict(totals)},
+            upsert=True,
+        )
+
+    customer_ops = [
+        UpdateOne({"_id": cid}, {"$inc": {"total_orders": n}}, upsert=True)
+        for cid, n in deltas["customers"].items() if n
+    ]
+    if customer_ops:
+        db["mv_customer_orders"].bulk_write(customer_ops, ordered=False)
+        db["mv_customer_orders"].delete_many({"total_orders": {"$lte": 0}})
+
+    product_ops = [
+        UpdateOne({"_id": pid}, {"$inc": dict(inc)}, upsert=True)
+        for pid, inc in deltas["products"].items() if inc["num_lines"] or inc["total_revenue"]
+    ]
+    if product_ops:
+        db["mv_product_revenue"].bulk_write(product_ops, ordered=False)
+        db["mv_product_revenue"].delete_many({"num_lines": {"$lte": 0}})
+
+
+def refresh_materialized_views(db):
+    """
+    Aplica nos resumos as mudanças de `orders` desde o último refresh.
+    Cada update/replace/delete usa as imagens do próprio evento (antes e
+    depois dele), não o documento atual: updates seguidos ou update seguido
+    de delete na mesma janela somam os deltas certos. Sem estado salvo, sem
+    replica set ou sem as imagens cai para a recarga completa.
+
+    Retorna (modo, nº de eventos aplicados).
+    """
+    state = db[STATE_COLLECTION].find_one({"_id": STATE_ID})
+    if not state or state.get("resume_token") is None:
+        rebuild_materialized_views(db)
+        return "rebuild", 0
+
+    deltas = {
+        "totals": {"total_revenue": 0.0, "num_orders": 0},
+        "customers": defaultdict(int),
+        "products": defaultdict(lambda: {"total_revenue": 0.0, "num_lines": 0}),
+    }
+    applied = 0
+
+    try:
+        with db[SOURCE_COLLECTION].watch(
+            resume_after=state["resume_token"],
+            full_document="required",
+            full_document_before_change="required",
+        ) as stream:
+            while True:
+                change = stream.try_next()
+                if change is None:
+                    break
+
+                op = change["operationType"]
+                before = change.get("fullDocumentBeforeChange")
+                after = change.get("fullDocument")
+
+                if op == "insert":
+                    _apply_order(deltas, after, +1)
+                elif op in ("delete", "update", "replace"):
+                    if before is None:
+                        raise LookupError(f"no pre-image for {op} event")
+                    _apply_order(deltas, before, -1)
+                    if after is not None:
+                        _apply_order(deltas, after, +1)
+                else:
+                    # drop / rename / invalidate: resumo não é mais confiável
+                    raise LookupError(f"unsupported change event {op}")
+                applied += 1
+
+            token = stream.resume_token
+    except (PyMongoError, LookupError):
+        rebuild_materialized_views(db)
+        return "rebuild", 0
+
+    _write_deltas(db, deltas)
+    db[STATE_COLLECTION].update_one(
+        {"_id": STATE_ID},
+        {"$set": {"resume_token": token}},
+    )
+    return "incremental", applied
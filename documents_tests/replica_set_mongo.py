@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# replica_set_mongo.py
+# Replica set local (1 primário + N secundários) para as leituras em réplicas
+#
+# Os secundários têm priority 0 (nunca viram primário) e tags de "pool":
+# o secundário i entra nos pools r<i>..r<N>, então a read preference com a tag
+# r<K> limita as leituras aos K primeiros secundários. Com isso a mesma
+# instância mede a vazão com 1, 2, ..., N réplicas sem reconfigurar nada.
+# Entre os secundários elegíveis o pymongo sorteia a cada operação
+# (localThresholdMS alto deixa todos elegíveis).
+#
+# Uso:
+#   python replica_set_mongo.py start --secondaries 3
+#   python replica_set_mongo.py load --sf 10
+#   python run_workload_mongo.py --sf 10 --replicas 2 --clients 8
+#   python replica_set_mongo.py stop
+
+import os
+import json
+import time
+import argparse
+
+from pymongo import MongoClient
+from pymongo.write_concern import WriteConcern
+
+from workload_config_mongo import MONGO_URI, MONGO_DB_BY_SF
+from sharded_cluster_mongo import log, spawn_process, stop_processes, wait_ready
+
+# ============================================================
+# Configuração do replica set
+# ============================================================
+
+REPLICA_SET = "rs_read"
+
+REPLICA_DIR = os.path.join("cluster", "replica_set")
+REPLICA_STATE = os.path.join(REPLICA_DIR, "replica_set.json")
+
+PRIMARY_PORT = 27120
+DEFAULT_SECONDARIES = 3
+
+MONGOD_BIN = os.environ.get("MONGOD_BIN", "mongod")
+
+MONGO_REPLICA_URI = f"mongodb://localhost:{PRIMARY_PORT}/?replicaSet={REPLICA_SET}"
+
+READ_PREFERENCES = ["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"]
+DEFAULT_READ_PREFERENCE = "secondary"
+
+# Janela de latência do server selection: todos os secundários locais elegíveis
+LOCAL_THRESHOLD_MS = 1000
+
+# Secundário com atraso maior que isto invalida a medição
+MAX_LAG_S = 5
+
+LOAD_BATCH_SIZE = 10_000
+
+
+def pool_tag(replicas: int) -> str:
+    return f"r{replicas}"
+
+
+def read_options(replicas, read_preference=DEFAULT_READ_PREFERENCE):
+    """kwargs do MongoClient para ler dos `replicas` primeiros secundários."""
+    options = {
+        "readPreference": read_preference,
+        "localThresholdMS": LOCAL_THRESHOLD_MS,
+    }
+    # primary não aceita tags
+    if read_preference != "primary":
+        options["readPreferenceTags"] = f"{pool_tag(replicas)}:1"
+    return options
+
+
+def check_replicas(client, replicas, max_lag_s=MAX_LAG_S):
+    """Motivo para não ler de `replicas` secundários, ou None se estão aptos."""
+    status = client.admin.command("replSetGetStatus")["members"]
+    config = {
+        m["_id"]: m for m in client.admin.command("replSetGetConfig")["config"]["members"]
+    }
+    pool = [m for m in status if pool_tag(replicas) in config[m["_id"]].get("tags", {})]
+    if len(pool) < replicas:
+        return (
+            f"only {len(pool)} secondaries tagged {pool_tag(replicas)}; "
+            f"start the replica set with --secondaries {replicas} or more"
+        )
+    primary = next((m for m in status if m["stateStr"] == "PRIMARY"), None)
+    for member in pool:
+        if member["stateStr"] != "SECONDARY":
+            return f"{member['name']} is {member['stateStr']}"
+        if primary is not None:
+            lag_s = (primary["optimeDate"] - member["optimeDate"]).total_seconds()
+            if lag_s > max_lag_s:
+                return f"{member['name']} lag {lag_s:.0f} s > {max_lag_s} s"
+    return None
+
+
+# ============================================================
+# Processos
+# ============================================================
+
+def _spawn(name, port):
+    return spawn_process(REPLICA_DIR, name, [
+        MONGOD_BIN, "--replSet", REPLICA_SET,
+        "--port", str(port), "--bind_ip", "localhost",
+        "--dbpath", os.path.join(REPLICA_DIR, name),
+    ])
+
+
+def _wait_members(client, members, timeout_s=120):
+    """Espera 1 PRIMARY e os demais SECONDARY."""
+    deadline = time.monotonic() + timeout_s
+    while True:
+        states = [m["stateStr"] for m in client.admin.command("replSetGetStatus")["members"]]
+        if states.count("PRIMARY") == 1 and states.count("SECONDARY") == members - 1:
+            return
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"replica set {REPLICA_SET} not ready: {states}")
+        time.sleep(0.5)
+
+
+def start_replica_set(secondaries=DEFAULT_SECONDARIES):
+    if os.path.exists(REPLICA_STATE):
+        raise RuntimeError(f"replica set already running (see {REPLICA_STATE})")
+
+    os.makedirs(REPLICA_DIR, exist_ok=True)
+    ports = [PRIMARY_PORT + i for i in range(secondaries + 1)]
+    pids = [_spawn("primary" if i == 0 else f"secondary{i}", port) for i, port in enumerate(ports)]
+
+    # estado salvo antes da inicialização para que `stop` funcione mesmo se algo falhar
+    with open(REPLICA_STATE, "w") as f:
+        json.dump({"pids": pids, "secondaries": secondaries}, f)
+
+    for port in ports:
+        wait_ready(port)
+
+    members = [{"_id": 0, "host": f"localhost:{PRIMARY_PORT}", "priority": 2}]
+    for i in range(1, secondaries + 1):
+        members.append({
+            "_id": i,
+            "host": f"localhost:{ports[i]}",
+            "priority": 0,
+            "tags": {pool_tag(k): "1" for k in range(i, secondaries + 1)},
+        })
+
+    with MongoClient(port=PRIMARY_PORT, directConnection=True) as client:
+        client.admin.command("replSetInitiate", {"_id": REPLICA_SET, "members": members})
+        _wait_members(client, len(members))
+
+    log(f"Replica set ready at {MONGO_REPLICA_URI} (1 primary + {secondaries} secondaries)")
+
+
+def stop_replica_set():
+    # secundários primeiro
+    stop_processes(REPLICA_STATE, "replica set")
+
+
+# ============================================================
+# Carga dos dados
+# ============================================================
+
+def load_replicated_copy(sf):
+    """
+    Copia todas as coleções do database do SF (com os índices) do servidor
+    base para o replica set. Cada lote só é confirmado quando chegou a todos
+    os membros, então os secundários terminam a carga já em dia.
+    """
+    dbname = MONGO_DB_BY_SF[sf]
+
+    with MongoClient(MONGO_URI) as source, MongoClient(MONGO_REPLICA_URI) as target:
+        members = len(target.admin.command("replSetGetStatus")["members"])
+        target_db = target.get_database(dbname, write_concern=WriteConcern(w=members))
+        target.drop_database(dbname)
+
+        start = time.perf_counter()
+        for name in source[dbname].list_collection_names():
+            if name.startswith("system."):
+                continue
+            for index in source[dbname][name].list_indexes():
+                if index["name"] != "_id_":
+                    target_db[name].create_index(list(index["key"].items()))
+
+            batch = []
+            copied = 0
+            for doc in source[dbname][name].find(batch_size=LOAD_BATCH_SIZE):
+                batch.append(doc)
+                if len(batch) >= LOAD_BATCH_SIZE:
+                    target_db[name].insert_many(batch, ordered=False)
+                    copied += len(batch)
+                    batch = []
+            if batch:
+                target_db[name].insert_many(batch, ordered=False)
+                copied += len(batch)
+            log(f"Loaded {copied} documents into {dbname}.{name}")
+
+        log(
+            f"{dbname} replicated to {members} members "
+            f"in {(time.perf_counter() - start) / 60:.1f} min"
+        )
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local MongoDB replica set for read-replica experiments")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    start = sub.add_parser("start", help="Start the primary and the secondaries")
+    start.add_argument("--secondaries", type=int, default=DEFAULT_SECONDARIES)
+
+    sub.add_parser("stop", help="Stop all replica set processes")
+
+    load = sub.add_parser("load", help="Copy the SF database from the base server into the replica set")
+    load.add_argument("--sf", type=int, required=True, choices=sorted(MONGO_DB_BY_SF))
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "start":
+        start_replica_set(args.secondaries)
+    elif args.command == "stop":
+        stop_replica_set()
+    elif args.command == "load":
+        load_replicated_copy(args.sf)
+
+
+if __name__ == "__main__":
+    main()
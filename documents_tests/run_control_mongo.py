@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# run_control_mongo.py
+# Classificação dos erros do pymongo e timeout por pipeline; retries com
+# backoff e clientes concorrentes são os do run_control.py comum
+# (experiments_latest/koupil_tests/mysql, no sys.path via workload_config_mongo.py)
+
+import multiprocessing
+
+from pymongo.errors import (
+    AutoReconnect,
+    ConnectionFailure,
+    ExecutionTimeout,
+    NetworkTimeout,
+    OperationFailure,
+    PyMongoError,
+)
+
+from run_control import (
+    TIMEOUT,
+    TRANSIENT,
+    QUERY,
+    OTHER,
+    client_timeout_s,
+    run_record,
+    run_concurrently,
+    run_with_retries as _run_with_retries,
+)
+
+# ============================================================
+# CLASSIFICAÇÃO DE ERROS
+# ============================================================
+# TIMEOUT: maxTimeMS (code 50) / timeout do socket; TRANSIENT: conexão
+# perdida, primário indisponível, write conflict...; QUERY: pipeline
+# inválida, operador desconhecido
+
+# 50 MaxTimeMSExpired, 262 ExceededTimeLimit
+TIMEOUT_CODES = {50, 262}
+
+
+def classify_error(exc):
+    if isinstance(exc, multiprocessing.TimeoutError):
+        return TIMEOUT
+    # NetworkTimeout é subclasse de AutoReconnect: testar antes
+    if isinstance(exc, (ExecutionTimeout, NetworkTimeout)):
+        return TIMEOUT
+    if isinstance(exc, (AutoReconnect, ConnectionFailure)):
+        return TRANSIENT
+    if isinstance(exc, OperationFailure):
+        if exc.code in TIMEOUT_CODES:
+            return TIMEOUT
+        if exc.has_error_label("RetryableReadError") or exc.has_error_label("TransientTransactionError"):
+            return TRANSIENT
+        return QUERY
+    if isinstance(exc, PyMongoError) and exc.has_error_label("RetryableReadError"):
+        return TRANSIENT
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return TRANSIENT
+    return OTHER
+
+
+# ============================================================
+# TIMEOUTS / RETRIES
+# ============================================================
+
+def max_time_options(timeout_ms):
+    """kwargs de aggregate(): maxTimeMS só quando há limite."""
+    return {"maxTimeMS": int(timeout_ms)} if timeout_ms else {}
+
+
+def run_with_retries(fn, retries, backoff_s, log=print):
+    return _run_with_retries(fn, retries, backoff_s, log, classify=classify_error)
@@ -1,204 +1,720 @@
-import os
-import time
-import argparse
-from datetime import datetime
-
-import pandas as pd
-from pymongo import MongoClient
-
-from workload_config_mongo import (
-    TASK_DEFINITIONS,
-    TASK_RUNS,
-    DEFAULT_RUNS_PER_TASK,
-    MONGO_URI,
-    MONGO_DB_BY_SF,
-)
-
-# ============================================================
-# Argumentos de linha de comando
-# ============================================================
-
-def parse_args():
-    parser = argparse.ArgumentParser(
-        description="Run MongoDB workload for a given Scale Factor (SF)"
-    )
-    parser.add_argument(
-        "--sf",
-        type=int,
-        required=True,
-        choices=[1, 10, 30, 100],
-        help="Scale Factor (1, 10, 30, 100)",
-    )
-    return parser.parse_args()
-
-
-# ============================================================
-# Conexão MongoDB
-# ============================================================
-
-def connect_mongo(sf: int):
-    if sf not in MONGO_DB_BY_SF:
-        raise ValueError(f"SF {sf} not configured in MONGO_DB_BY_SF")
-
-    dbname = MONGO_DB_BY_SF[sf]
-    client = MongoClient(MONGO_URI)
-    db = client[dbname]
-    return client, db
-
-
-# ============================================================
-# Logging
-# ============================================================
-
-def log_title(msg):
-    print("\n" + "=" * 70)
-    print(msg)
-    print("=" * 70)
-
-
-def log(msg):
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
-
-
-# ============================================================
-# Execução de uma pipeline (1 run)
-# ============================================================
-
-def run_pipeline_once(task_name, collection_name, pipeline, run_number, sf):
-    client, db = connect_mongo(sf)
-
-    start = time.perf_counter()
-    cursor = db[collection_name].aggregate(
-        pipeline,
-        allowDiskUse=True
-    )
-    rows = list(cursor)
-    elapsed_ms = (time.perf_counter() - start) * 1000
-
-    client.close()
-
-    df = pd.DataFrame(rows)
-
-    log(
-        f"Task {task_name} | run {run_number} | "
-        f"{len(rows)} rows | {elapsed_ms:.2f} ms"
-    )
-
-    return df, len(rows), elapsed_ms
-
-
-# ============================================================
-# Main
-# ============================================================
-
-def main():
-    args = parse_args()
-    sf = args.sf
-
-    dbname = MONGO_DB_BY_SF[sf]
-
-    # Diretório de saída isolado por SF
-    output_dir = os.path.join("outputs", f"sf{sf}")
-    os.makedirs(output_dir, exist_ok=True)
-
-    log_title(f"MongoDB Workload – SF{sf}")
-    log(f"Database: {dbname}")
-    log(f"Output directory: {output_dir}")
-
-    summary_rows = []
-
-    for task_name, task in TASK_DEFINITIONS.items():
-        collection = task["collection"]
-        pipeline = task["pipeline"]
-
-        runs = TASK_RUNS.get(task_name, DEFAULT_RUNS_PER_TASK)
-
-        log_title(f"Running task: {task_name}")
-        log(f"Collection: {collection}")
-        log(f"Configured runs: {runs}")
-
-        run_times = []
-        run_rows = []
-        last_df = None
-
-        for run in range(1, runs + 1):
-            try:
-                df, rows, elapsed_ms = run_pipeline_once(
-                    task_name,
-                    collection,
-                    pipeline,
-                    run,
-                    sf
-                )
-                run_times.append(elapsed_ms)
-                run_rows.append(rows)
-                last_df = df
-
-            except Exception as e:
-                log(f"ERROR running {task_name} (run {run}): {e}")
-
-        if not run_times:
-            continue
-
-        avg_time = sum(run_times) / len(run_times)
-        min_time = min(run_times)
-        max_time = max(run_times)
-        std_time = (
-            pd.Series(run_times).std(ddof=0)
-            if len(run_times) > 1
-            else 0.0
-        )
-
-        summary_rows.append({
-            "task": task_name,
-            "sf": sf,
-            "database": dbname,
-            "collection": collection,
-            "runs_configured": runs,
-            "runs_valid": len(run_times),
-            "example_rows": run_rows[-1],
-            "avg_time_ms": round(avg_time, 2),
-            "min_time_ms": round(min_time, 2),
-            "max_time_ms": round(max_time, 2),
-            "std_time_ms": round(std_time, 2),
-        })
-
-        # Resultado da última execução
-        if last_df is not None and not last_df.empty:
-            result_csv = os.path.join(
-                output_dir,
-                f"{task_name}_result.csv"
-            )
-            last_df.to_csv(result_csv, index=False)
-
-        # Tempos por run
-        runs_df = pd.DataFrame({
-            "run": list(range(1, len(run_times) + 1)),
-            "time_ms": run_times,
-            "rows": run_rows,
-        })
-
-        runs_csv = os.path.join(
-            output_dir,
-            f"{task_name}_runs.csv"
-        )
-        runs_df.to_csv(runs_csv, index=False)
-
-    # ========================================================
-    # Resumo geral
-    # ========================================================
-
-    summary_df = pd.DataFrame(summary_rows)
-    summary_csv = os.path.join(
-        output_dir,
-        "workload_summary_mongo.csv"
-    )
-    summary_df.to_csv(summary_csv, index=False)
-
-    log_title("MongoDB workload finished")
-    log(f"Summary saved to: {summary_csv}")
-
-
-if __name__ == "__main__":
-    main()
-
+import os
+import time
+import argparse
+from dataclasses import replace
+from datetime import datetime
+
+import pandas as pd
+from pymongo import MongoClient
+
+# workload_config_mongo põe experiments_latest/koupil_tests/mysql no sys.path
+# (task_registry, run_log, result_sample, workload_trace)
+from workload_config_mongo import (
+    REGISTRY,
+    DEFAULT_RUNS_PER_TASK,
+    MONGO_URI,
+    MONGO_DB_BY_SF,
+    DEFAULT_SPLIT_WORKERS,
+    DEFAULT_TIMEOUT_MS,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF_S,
+)
+from task_registry import Task
+from result_sample import DEFAULT_SAMPLE_SIZE, batched, consume, sample_frame
+from materialized_views_mongo import (
+    rebuild_materialized_views,
+    refresh_materialized_views,
+)
+from sharded_cluster_mongo import (
+    BASELINE_LAYOUT,
+    SHARDED_LAYOUTS,
+    MONGO_SHARDED_URI,
+    sharded_database_name,
+)
+from replica_set_mongo import (
+    MONGO_REPLICA_URI,
+    READ_PREFERENCES,
+    DEFAULT_READ_PREFERENCE,
+    read_options,
+    check_replicas,
+)
+from split_scan_mongo import SplitScanner, id_range, chunk_bounds
+from environment_fingerprint_mongo import collect_fingerprint, write_fingerprint
+from wire_protocol_mongo import (
+    DEFAULT_PROTOCOL,
+    PROTOCOLS,
+    BytesOutCounter,
+    client_options,
+    cursor_options,
+)
+from run_control_mongo import (
+    client_timeout_s,
+    max_time_options,
+    run_with_retries,
+    run_record,
+    run_concurrently,
+)
+from run_log import RunLog, derive_outputs
+from workload_trace import TRACE_FILE, TraceRecorder
+
+# ============================================================
+# Argumentos de linha de comando
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run MongoDB workload for a given Scale Factor (SF)"
+    )
+    parser.add_argument(
+        "--sf",
+        type=int,
+        choices=[1, 10, 30, 100],
+        help="Scale Factor (1, 10, 30, 100)",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="TASK",
+        help="Executa só estas tasks (nomes do registro)",
+    )
+    parser.add_argument(
+        "--tag",
+        nargs="+",
+        metavar="TAG",
+        help="Executa só as tasks com alguma destas tags",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        help="Sobrescreve o número de runs de todas as tasks selecionadas",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Lista as tasks registradas e sai",
+    )
+    parser.add_argument(
+        "--materialized",
+        action="store_true",
+        help="Também executa as tasks que leem das coleções de pré-agregação",
+    )
+    parser.add_argument(
+        "--refresh-materialized",
+        action="store_true",
+        help="Recria as coleções de pré-agregação em vez de aplicar só as mudanças",
+    )
+    parser.add_argument(
+        "--layout",
+        default=BASELINE_LAYOUT,
+        choices=[BASELINE_LAYOUT] + list(SHARDED_LAYOUTS),
+        help="baseline = servidor único; sharded_* = cluster local "
+             "(ver sharded_cluster_mongo.py)",
+    )
+    parser.add_argument(
+        "--split-scan",
+        type=int,
+        nargs="?",
+        default=0,
+        const=DEFAULT_SPLIT_WORKERS,
+        metavar="N",
+        help="Também executa as tasks com `split` divididas em N processos",
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Lê dos K primeiros secundários do replica set local "
+             "(ver replica_set_mongo.py); 0 = servidor base",
+    )
+    parser.add_argument(
+        "--read-preference",
+        default=DEFAULT_READ_PREFERENCE,
+        choices=READ_PREFERENCES,
+        help="Read preference das tasks com --replicas",
+    )
+    parser.add_argument(
+        "--protocol",
+        nargs="+",
+        default=[],
+        choices=list(PROTOCOLS),
+        metavar="PROFILE",
+        help="Também executa as tasks com estes perfis de protocolo "
+             f"(variantes <task>_<perfil>; {', '.join(PROTOCOLS)})",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="N",
+        help="Guarda só uma amostra aleatória (+ início e fim) do resultado: N "
+             f"documentos, ou Task.sample / {DEFAULT_SAMPLE_SIZE} sem N "
+             "(padrão: resultado inteiro)",
+    )
+    parser.add_argument(
+        "--timeout-ms",
+        type=int,
+        help="maxTimeMS para todas as tasks (0 = sem limite; padrão: "
+             f"timeout_ms da task ou {DEFAULT_TIMEOUT_MS})",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="Retries por run em erros transitórios (conexão, failover)",
+    )
+    parser.add_argument(
+        "--clients",
+        type=int,
+        default=1,
+        help="Clientes concorrentes (threads em loop fechado) repartindo "
+             "os runs de cada task",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Diretório de saída (padrão: outputs/sf<SF>[_<layout>])",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continua a execução interrompida a partir do run_log.jsonl "
+             "(runs falhos são executados de novo)",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const=TRACE_FILE,
+        metavar="FILE",
+        help="Grava a sequência de invocações para o workload_replay.py "
+             f"(padrão: {TRACE_FILE} no diretório de saída)",
+    )
+    args = parser.parse_args()
+    if not args.list and args.sf is None:
+        parser.error("--sf is required")
+    if args.replicas and args.layout != BASELINE_LAYOUT:
+        parser.error("--replicas only applies to the baseline layout")
+    return args
+
+
+# ============================================================
+# Conexão MongoDB
+# ============================================================
+
+def resolve_database(sf: int, layout: str = BASELINE_LAYOUT, replicas: int = 0):
+    if sf not in MONGO_DB_BY_SF:
+        raise ValueError(f"SF {sf} not configured in MONGO_DB_BY_SF")
+
+    dbname = MONGO_DB_BY_SF[sf]
+    if replicas:
+        return MONGO_REPLICA_URI, dbname
+    if layout == BASELINE_LAYOUT:
+        return MONGO_URI, dbname
+    return MONGO_SHARDED_URI, sharded_database_name(dbname, layout)
+
+
+def connect_mongo(sf: int, layout: str = BASELINE_LAYOUT, timeout_ms=None,
+                  protocol=PROTOCOLS[DEFAULT_PROTOCOL], replicas=0,
+                  read_preference="primary"):
+    """
+    Com replicas > 0 conecta no replica set local; read_preference decide se
+    as leituras vão para o primário (setup) ou para os secundários (runs).
+    """
+    uri, dbname = resolve_database(sf, layout, replicas)
+    socket_timeout_s = client_timeout_s(timeout_ms)
+    client = MongoClient(
+        uri,
+        socketTimeoutMS=socket_timeout_s * 1000 if socket_timeout_s else None,
+        **client_options(protocol),
+        **(read_options(replicas, read_preference) if replicas else {}),
+    )
+    db = client[dbname]
+    return client, db
+
+
+# ============================================================
+# Logging
+# ============================================================
+
+def log_title(msg):
+    print("\n" + "=" * 70)
+    print(msg)
+    print("=" * 70)
+
+
+def log(msg):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
+
+
+# ============================================================
+# Execução de uma pipeline (1 run)
+# ============================================================
+
+def run_pipeline_once(task_name, collection_name, pipeline, run_number, sf,
+                      layout=BASELINE_LAYOUT, timeout_ms=None,
+                      protocol=PROTOCOLS[DEFAULT_PROTOCOL], measure_wire=True,
+                      replicas=0, read_preference=DEFAULT_READ_PREFERENCE,
+                      sample=None):
+    client, db = connect_mongo(
+        sf, layout, timeout_ms, protocol, replicas, read_preference
+    )
+
+    try:
+        wire = BytesOutCounter(db) if measure_wire else None
+        start = time.perf_counter()
+        cursor = db[collection_name].aggregate(
+            pipeline,
+            allowDiskUse=True,
+            **cursor_options(protocol),
+            **max_time_options(timeout_ms)
+        )
+        if sample is None:
+            rows = list(cursor)
+            row_count = len(rows)
+        else:
+            # o cursor já entrega em lotes (batchSize); só a amostra fica em memória
+            reservoir, _ = consume(batched(cursor), sample)
+            row_count = reservoir.count
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        wire_bytes = wire.delta() if wire else None
+        # membro que atendeu a leitura (primário ou secundário sorteado)
+        server = f"{cursor.address[0]}:{cursor.address[1]}" if cursor.address else None
+    finally:
+        client.close()
+
+    if sample is None:
+        df = pd.DataFrame(rows)
+    else:
+        df = sample_frame(reservoir)
+        log(f"Task {task_name} | run {run_number} | kept {len(df)} of {row_count} documents")
+
+    log(
+        f"Task {task_name} | run {run_number} | {row_count} rows | "
+        + (f"{wire_bytes / 1e6:.2f} MB | " if wire_bytes is not None else "")
+        + f"{elapsed_ms:.2f} ms"
+    )
+
+    return df, row_count, elapsed_ms, wire_bytes, server
+
+
+def run_split_scan_once(scanner, task_name, collection, pipeline, merge,
+                        bounds, run_number, timeout_ms=None):
+    df, rows, elapsed_ms = scanner.run_once(
+        collection,
+        pipeline,
+        merge,
+        bounds,
+        timeout_ms,
+    )
+
+    log(
+        f"Task {task_name} | run {run_number} | "
+        f"{len(bounds)} chunks | {rows} rows | {elapsed_ms:.2f} ms"
+    )
+
+    return df, rows, elapsed_ms, None, None
+
+
+# ============================================================
+# Pré-agregação
+# ============================================================
+
+def prepare_materialized_views(sf, rebuild, layout=BASELINE_LAYOUT, replicas=0):
+    client, db = connect_mongo(sf, layout, replicas=replicas)
+    try:
+        start = time.perf_counter()
+        if rebuild:
+            if not rebuild_materialized_views(db):
+                log(
+                    "No resume token for the materialized views (no replica "
+                    "set, no change stream pre/post-images or writes during "
+                    "the rebuild): next refresh rebuilds"
+                )
+            mode, applied = "rebuild", 0
+        else:
+            mode, applied = refresh_materialized_views(db)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        log(
+            f"Materialized views refreshed ({mode}, "
+            f"{applied} change events) in {elapsed_ms:.2f} ms"
+        )
+    finally:
+        client.close()
+
+
+# ============================================================
+# Comparação com a task base (pré-agregação / split scan)
+# ============================================================
+
+def add_speedup_vs_base(summary_df, base_tasks):
+    avg_by_task = dict(zip(summary_df["task"], summary_df["avg_time_ms"]))
+    summary_df["base_task"] = summary_df["task"].map(base_tasks)
+    summary_df["speedup_vs_base"] = [
+        round(avg_by_task[base] / avg, 2)
+        if base in avg_by_task and pd.notna(avg) and avg > 0
+        else None
+        for base, avg in zip(summary_df["base_task"], summary_df["avg_time_ms"])
+    ]
+    return summary_df
+
+
+# ============================================================
+# Resumo (derivado do run_log)
+# ============================================================
+
+def write_summary(run_log, output_dir, base_tasks):
+    """Regera os <task>_runs.csv e o workload_summary_mongo.csv a partir do log."""
+    summary_df = pd.DataFrame(
+        derive_outputs(run_log.path, output_dir, rows_column="example_rows")
+    )
+    if base_tasks and not summary_df.empty:
+        summary_df = add_speedup_vs_base(summary_df, base_tasks)
+    summary_csv = os.path.join(
+        output_dir,
+        "workload_summary_mongo.csv"
+    )
+    summary_df.to_csv(summary_csv, index=False)
+    return summary_csv
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def select_tasks(args):
+    include_tags = []
+    if args.materialized:
+        include_tags.append("materialized")
+    if args.split_scan:
+        include_tags.append("split-scan")
+    try:
+        return REGISTRY.select(
+            only=args.only,
+            tags=args.tag,
+            include_tags=include_tags,
+        )
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+
+
+def main():
+    args = parse_args()
+    if args.list:
+        print(REGISTRY.describe())
+        return
+
+    sf = args.sf
+    tasks = select_tasks(args)
+
+    layout = args.layout
+    replicas = args.replicas
+    _, dbname = resolve_database(sf, layout, replicas)
+
+    # Diretório de saída isolado por SF (e por layout, se não for o baseline;
+    # _r<K> para leituras nos secundários)
+    if args.output_dir:
+        output_dir = args.output_dir
+    elif layout == BASELINE_LAYOUT:
+        output_dir = os.path.join("outputs", f"sf{sf}")
+    else:
+        output_dir = os.path.join("outputs", f"sf{sf}_{layout}")
+    if replicas and not args.output_dir:
+        output_dir += f"_r{replicas}"
+    os.makedirs(output_dir, exist_ok=True)
+
+    log_title(f"MongoDB Workload – SF{sf}")
+    log(f"Database: {dbname}")
+    log(f"Layout: {layout}")
+    log(f"Clients: {args.clients}")
+    log(f"Output directory: {output_dir}")
+
+    if replicas:
+        client, _ = connect_mongo(sf, layout, replicas=replicas)
+        try:
+            problem = check_replicas(client, replicas)
+        finally:
+            client.close()
+        if problem:
+            raise SystemExit(f"Cannot read from {replicas} replica(s): {problem}")
+        log(f"Read replicas: {replicas} ({args.read_preference})")
+
+    # Variantes de protocolo: mesma pipeline, outro batchSize/compressão
+    task_protocols = {task.name: DEFAULT_PROTOCOL for task in tasks}
+    for profile in [p for p in args.protocol if p != DEFAULT_PROTOCOL]:
+        for task in [t for t in tasks if task_protocols[t.name] == DEFAULT_PROTOCOL]:
+            variant = replace(
+                task,
+                name=f"{task.name}_{profile}",
+                tags=task.tags + ("protocol",),
+                equivalent=None,
+                base_task=task.name,
+                split=None,
+            )
+            task_protocols[variant.name] = profile
+            tasks.append(variant)
+
+    log(f"Tasks: {', '.join(task.name for task in tasks)}")
+
+    # serverStatus conta o tráfego do servidor inteiro: com vários clientes
+    # não dá para atribuir bytes a um run (nem com réplicas, porque o comando
+    # vai ao primário e a leitura a um secundário)
+    measure_wire = args.clients == 1 and not replicas
+    if not measure_wire:
+        log("Wire bytes not measured with --clients > 1 or --replicas (server-wide counter)")
+
+    if any("materialized" in task.tags and task.base_task for task in tasks):
+        prepare_materialized_views(sf, args.refresh_materialized, layout, replicas)
+
+    split_runs = {}
+    scanner = None
+    if args.split_scan:
+        uri, _ = resolve_database(sf, layout, replicas)
+        scanner = SplitScanner(uri, dbname, args.split_scan)
+        client, db = connect_mongo(sf, layout, replicas=replicas)
+        try:
+            for task in [t for t in tasks if t.split]:
+                lo, hi = id_range(db, task.collection)
+                if lo is None:
+                    log(f"Skipping split scan of {task.name}: collection is empty")
+                    continue
+                split_task = Task(
+                    name=f"{task.name}_split{args.split_scan}",
+                    build=task.query,
+                    collection=task.collection,
+                    tags=task.tags + ("split",),
+                    runs=task.runs,
+                    expected_rows=task.expected_rows,
+                    timeout_ms=task.timeout_ms,
+                    base_task=task.name,
+                )
+                bounds = chunk_bounds(lo, hi, args.split_scan)
+                if bounds == [(None, None)]:
+                    log(
+                        f"Split scan of {task.name} runs as a single chunk: "
+                        f"_id is {type(lo).__name__}, not ObjectId or int"
+                    )
+                split_runs[split_task.name] = (task.split["merge"], bounds)
+                tasks.append(split_task)
+        finally:
+            client.close()
+
+    base_tasks = {task.name: task.base_task for task in tasks if task.base_task}
+
+    # Cada run concluído vira um evento no run_log.jsonl; os *_runs.csv e o
+    # resumo são regerados dele ao fim de cada task. Com --resume a execução
+    # continua no primeiro run que ainda não está no log
+    try:
+        run_log = RunLog(
+            output_dir,
+            {"engine": "mongodb", "sf": sf, "database": dbname, "layout": layout},
+            resume=args.resume,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    # Trace: instante, task e params de cada invocação, na ordem em que
+    # aconteceram
+    trace = None
+    if args.trace:
+        trace_path = (
+            args.trace
+            if os.path.dirname(args.trace)
+            else os.path.join(output_dir, args.trace)
+        )
+        trace = TraceRecorder(
+            trace_path,
+            {"engine": "mongodb", "sf": sf, "database": dbname, "layout": layout},
+            resume=args.resume,
+        )
+        log(f"Trace: {trace_path}")
+
+    for task in tasks:
+        task_name = task.name
+        collection = task.collection
+        pipeline = task.query()
+
+        runs = args.runs or task.runs_or(DEFAULT_RUNS_PER_TASK)
+        expected_rows = task.expected_rows_for(sf)
+        timeout_ms = (
+            args.timeout_ms
+            if args.timeout_ms is not None
+            else task.timeout_ms_for(sf, DEFAULT_TIMEOUT_MS)
+        )
+
+        log_title(f"Running task: {task_name}")
+        log(f"Collection: {collection}")
+        log(f"Configured runs: {runs}")
+        log(f"maxTimeMS: {timeout_ms or 'none'}")
+        if task_name in task_protocols:
+            log(f"Protocol: {task_protocols[task_name]}")
+
+        # Amostra do resultado só com --sample: tamanho de --sample N ou de
+        # Task.sample (split scans sempre guardam o resultado inteiro)
+        sample = None
+        if args.sample is not None:
+            sample = dict(task.sample or {})
+            if args.sample:
+                sample["size"] = args.sample
+        if task_name in split_runs:
+            sample = None
+        if sample is not None:
+            log(f"Result sample: {sample.get('size', DEFAULT_SAMPLE_SIZE)} documents + head/tail")
+
+        done = run_log.completed(task_name)
+        if done:
+            log(f"Resuming: {len(done)} run(s) already in the run log")
+
+        run_log.task(task_name, {
+            "task": task_name,
+            "sf": sf,
+            "database": dbname,
+            "layout": layout,
+            "collection": collection,
+            "runs_configured": runs,
+            "clients": args.clients,
+            "replicas": replicas,
+            "read_preference": args.read_preference if replicas else None,
+            "protocol": task_protocols.get(task_name),
+            "result_sample": sample.get("size", DEFAULT_SAMPLE_SIZE) if sample else None,
+            "timeout_ms": timeout_ms,
+            "expected_rows": expected_rows,
+            "equivalent_task": task.equivalent,
+        })
+
+        protocol = PROTOCOLS.get(
+            task_protocols.get(task_name),
+            PROTOCOLS[DEFAULT_PROTOCOL]
+        )
+        last_df = None
+        ok_runs = []
+
+        def execute_run(run, client):
+            nonlocal last_df
+
+            def execute():
+                if task_name in split_runs:
+                    merge, bounds = split_runs[task_name]
+                    return run_split_scan_once(
+                        scanner,
+                        task_name,
+                        collection,
+                        pipeline,
+                        merge,
+                        bounds,
+                        run,
+                        timeout_ms
+                    )
+                return run_pipeline_once(
+                    task_name,
+                    collection,
+                    pipeline,
+                    run,
+                    sf,
+                    layout,
+                    timeout_ms,
+                    protocol,
+                    measure_wire,
+                    replicas,
+                    args.read_preference,
+                    sample
+                )
+
+            started = time.perf_counter()
+            outcome = run_with_retries(
+                execute,
+                args.retries,
+                DEFAULT_RETRY_BACKOFF_S,
+                log=log
+            )
+            if outcome.ok:
+                df, rows, elapsed_ms, wire_bytes, server = outcome.result
+                if trace is not None:
+                    trace.record(
+                        task_name,
+                        started,
+                        elapsed_ms,
+                        rows,
+                        client,
+                        task.params,
+                        task.base_task
+                    )
+                if expected_rows is not None and rows != expected_rows:
+                    log(
+                        f"WARNING {task_name} (run {run}): "
+                        f"{rows} rows, expected {expected_rows}"
+                    )
+                run_log.run(
+                    task_name,
+                    run_record(
+                        run, outcome, elapsed_ms, rows, client, wire_bytes, server
+                    )
+                )
+                ok_runs.append(run)
+                last_df = df
+            else:
+                log(
+                    f"ERROR running {task_name} (run {run}) "
+                    f"[{outcome.error_class}, {outcome.attempts} attempt(s)]: "
+                    f"{outcome.error}"
+                )
+                run_log.run(task_name, run_record(run, outcome, client=client))
+                if trace is not None:
+                    trace.record(
+                        task_name,
+                        started,
+                        client=client,
+                        params=task.params,
+                        base_task=task.base_task
+                    )
+
+        pending = [run for run in range(1, runs + 1) if run not in done]
+        if pending:
+            wall_ms = run_concurrently(pending, args.clients, execute_run)
+            run_log.segment(task_name, args.clients, len(ok_runs), wall_ms)
+
+        # Resultado da última execução
+        if last_df is not None and not last_df.empty:
+            result_csv = os.path.join(
+                output_dir,
+                f"{task_name}_result.csv"
+            )
+            last_df.to_csv(result_csv, index=False)
+
+        # Tempos por run e resumo parcial
+        run_log.sync()
+        write_summary(run_log, output_dir, base_tasks)
+
+    # ========================================================
+    # Resumo geral
+    # ========================================================
+
+    run_log.close()
+    if trace is not None:
+        trace.close()
+    if scanner is not None:
+        scanner.close()
+
+    summary_csv = write_summary(run_log, output_dir, base_tasks)
+
+    # Fingerprint do ambiente (servidor, dataset, host) ao lado do resumo
+    client, db = connect_mongo(sf, layout, replicas=replicas)
+    try:
+        fingerprint_json = write_fingerprint(
+            collect_fingerprint(db, sf),
+            output_dir
+        )
+    except Exception as e:
+        fingerprint_json = None
+        log(f"WARNING could not capture environment fingerprint: {e}")
+    finally:
+        client.close()
+
+    log_title("MongoDB workload finished")
+    log(f"Summary saved to: {summary_csv}")
+    if fingerprint_json:
+        log(f"Environment fingerprint saved to: {fingerprint_json}")
+
+
+if __name__ == "__main__":
+    main()
+
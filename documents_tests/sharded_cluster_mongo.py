@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# sharded_cluster_mongo.py
+# Cluster local (config server + N shards + mongos) para os layouts com hashed sharding
+#
+# Uso:
+#   python sharded_cluster_mongo.py start --shards 3
+#   python sharded_cluster_mongo.py load --sf 100 --shard-key order_id
+#   python sharded_cluster_mongo.py stop
+
+import os
+import json
+import time
+import signal
+import argparse
+import subprocess
+from datetime import datetime
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from workload_config_mongo import MONGO_URI, MONGO_DB_BY_SF
+
+# ============================================================
+# Configuração do cluster
+# ============================================================
+
+BASELINE_LAYOUT = "baseline"
+
+# layout -> shard key (hashed)
+SHARDED_LAYOUTS = {
+    "sharded_order_id": "order_id",
+    "sharded_customer_id": "customer_id",
+}
+
+CLUSTER_DIR = os.path.join("cluster", "sharded")
+CLUSTER_STATE = os.path.join(CLUSTER_DIR, "cluster.json")
+
+MONGOS_PORT = 27100
+CONFIG_PORT = 27101
+FIRST_SHARD_PORT = 27110
+DEFAULT_SHARDS = 3
+
+MONGOD_BIN = os.environ.get("MONGOD_BIN", "mongod")
+MONGOS_BIN = os.environ.get("MONGOS_BIN", "mongos")
+
+MONGO_SHARDED_URI = f"mongodb://localhost:{MONGOS_PORT}/"
+
+LOAD_BATCH_SIZE = 10_000
+
+
+def sharded_database_name(dbname: str, layout: str) -> str:
+    return f"{dbname}_{layout}"
+
+
+# ============================================================
+# Logging
+# ============================================================
+
+def log(msg):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
+
+
+# ============================================================
+# Processos
+# ============================================================
+
+def spawn_process(cluster_dir, name, args):
+    """
+    Sobe `args` em background com a saída em <cluster_dir>/<name>.log e cria
+    <cluster_dir>/<name>/ (dbpath dos mongod). Devolve o pid.
+    """
+    os.makedirs(os.path.join(cluster_dir, name), exist_ok=True)
+    logfile = open(os.path.join(cluster_dir, f"{name}.log"), "ab")
+    proc = subprocess.Popen(args, stdout=logfile, stderr=subprocess.STDOUT)
+    log(f"Started {name} (pid {proc.pid})")
+    return proc.pid
+
+
+def wait_ready(port, timeout_s=60):
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            with MongoClient(port=port, directConnection=True,
+                             serverSelectionTimeoutMS=1000) as client:
+                client.admin.command("ping")
+                return
+        except PyMongoError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"mongo on port {port} did not start in {timeout_s}s")
+            time.sleep(0.5)
+
+
+def stop_processes(state_path, what):
+    """SIGTERM nos pids do arquivo de estado, do último ao primeiro, e remove o arquivo."""
+    if not os.path.exists(state_path):
+        log(f"No {what} state found")
+        return
+
+    with open(state_path) as f:
+        state = json.load(f)
+
+    for pid in reversed(state["pids"]):
+        try:
+            os.kill(pid, signal.SIGTERM)
+            log(f"Stopped pid {pid}")
+        except OSError:
+            pass
+
+    os.remove(state_path)
+
+
+def _init_replica_set(port, name, configsvr=False):
+    with MongoClient(port=port, directConnection=True) as client:
+        client.admin.command("replSetInitiate", {
+            "_id": name,
+            "configsvr": configsvr,
+            "members": [{"_id": 0, "host": f"localhost:{port}"}],
+        })
+        deadline = time.monotonic() + 60
+        while not client.admin.command("hello").get("isWritablePrimary"):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"replica set {name} has no primary")
+            time.sleep(0.5)
+
+
+def start_cluster(shards=DEFAULT_SHARDS):
+    if os.path.exists(CLUSTER_STATE):
+        raise RuntimeError(f"cluster already running (see {CLUSTER_STATE})")
+
+    os.makedirs(CLUSTER_DIR, exist_ok=True)
+    pids = []
+
+    pids.append(spawn_process(CLUSTER_DIR, "config", [
+        MONGOD_BIN, "--configsvr", "--replSet", "cfg",
+        "--port", str(CONFIG_PORT), "--bind_ip", "localhost",
+        "--dbpath", os.path.join(CLUSTER_DIR, "config"),
+    ]))
+
+    shard_ports = [FIRST_SHARD_PORT + i for i in range(shards)]
+    for i, port in enumerate(shard_ports):
+        pids.append(spawn_process(CLUSTER_DIR, f"shard{i}", [
+            MONGOD_BIN, "--shardsvr", "--replSet", f"shard{i}",
+            "--port", str(port), "--bind_ip", "localhost",
+            "--dbpath", os.path.join(CLUSTER_DIR, f"shard{i}"),
+        ]))
+
+    # estado salvo antes da inicialização para que `stop` funcione mesmo se algo falhar
+    with open(CLUSTER_STATE, "w") as f:
+        json.dump({"pids": pids, "shards": shards}, f)
+
+    wait_ready(CONFIG_PORT)
+    _init_replica_set(CONFIG_PORT, "cfg", configsvr=True)
+    for i, port in enumerate(shard_ports):
+        wait_ready(port)
+        _init_replica_set(port, f"shard{i}")
+
+    pids.append(spawn_process(CLUSTER_DIR, "mongos", [
+        MONGOS_BIN, "--configdb", f"cfg/localhost:{CONFIG_PORT}",
+        "--port", str(MONGOS_PORT), "--bind_ip", "localhost",
+    ]))
+    with open(CLUSTER_STATE, "w") as f:
+        json.dump({"pids": pids, "shards": shards}, f)
+
+    wait_ready(MONGOS_PORT)
+    with MongoClient(MONGO_SHARDED_URI) as client:
+        for i, port in enumerate(shard_ports):
+            client.admin.command("addShard", f"shard{i}/localhost:{port}")
+
+    log(f"Sharded cluster ready at {MONGO_SHARDED_URI} ({shards} shards)")
+
+
+def stop_cluster():
+    # mongos primeiro, config server por último
+    stop_processes(CLUSTER_STATE, "cluster")
+
+
+# ============================================================
+# Carga dos dados
+# ============================================================
+
+def load_sharded_copy(sf, layout):
+    """
+    Copia a coleção `orders` do servidor base (MONGO_URI) para o cluster,
+    já com a coleção particionada por hash da shard key do layout.
+    """
+    shard_key = SHARDED_LAYOUTS[layout]
+    source_db = MONGO_DB_BY_SF[sf]
+    target_db = sharded_database_name(source_db, layout)
+
+    with MongoClient(MONGO_URI) as source, MongoClient(MONGO_SHARDED_URI) as target:
+        target.drop_database(target_db)
+        target.admin.command("enableSharding", target_db)
+        target[target_db]["orders"].create_index([(shard_key, "hashed")])
+        target.admin.command(
+            "shardCollection",
+            f"{target_db}.orders",
+            key={shard_key: "hashed"},
+        )
+
+        # mesmos índices secundários do layout base
+        for index in source[source_db]["orders"].list_indexes():
+            if index["name"] != "_id_":
+                target[target_db]["orders"].create_index(list(index["key"].items()))
+
+        start = time.perf_counter()
+        batch = []
+        copied = 0
+        cursor = source[source_db]["orders"].find(batch_size=LOAD_BATCH_SIZE)
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= LOAD_BATCH_SIZE:
+                target[target_db]["orders"].insert_many(batch, ordered=False)
+                copied += len(batch)
+                batch = []
+                if copied % (LOAD_BATCH_SIZE * 100) == 0:
+                    log(f"{copied} documents copied")
+        if batch:
+            target[target_db]["orders"].insert_many(batch, ordered=False)
+            copied += len(batch)
+
+        log(
+            f"Loaded {copied} documents into {target_db}.orders "
+            f"(hashed on {shard_key}) in {(time.perf_counter() - start) / 60:.1f} min"
+        )
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local sharded MongoDB cluster for layout experiments")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    start = sub.add_parser("start", help="Start config server, shards and mongos")
+    start.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+
+    sub.add_parser("stop", help="Stop all cluster processes")
+
+    load = sub.add_parser("load", help="Copy orders from the base server into the cluster")
+    load.add_argument("--sf", type=int, required=True, choices=sorted(MONGO_DB_BY_SF))
+    load.add_argument("--shard-key", required=True,
+                      choices=sorted(SHARDED_LAYOUTS.values()))
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "start":
+        start_cluster(args.shards)
+    elif args.command == "stop":
+        stop_cluster()
+    elif args.command == "load":
+        layout = next(name for name, key in SHARDED_LAYOUTS.items() if key == args.shard_key)
+        load_sharded_copy(args.sf, layout)
+
+
+if __name__ == "__main__":
+    main()
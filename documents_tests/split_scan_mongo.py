@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# split_scan_mongo.py
+# Pipeline dividida em faixas de _id, executada em paralelo por processos
+
+import time
+from multiprocessing import Pool
+
+import pandas as pd
+from bson import ObjectId
+from pymongo import MongoClient
+
+from run_control_mongo import client_timeout_s, max_time_options
+
+# ============================================================
+# Worker (um MongoClient por processo, reaproveitado entre runs)
+# ============================================================
+
+_db = None
+
+
+def _init_worker(uri, dbname):
+    global _db
+    _db = MongoClient(uri)[dbname]
+
+
+def _scan_chunk(args):
+    collection, pipeline, lo, hi, last, timeout_ms = args
+    if lo is None:
+        # faixa única sem filtro (_id que não dá para interpolar)
+        match = []
+    else:
+        id_range = {"$gte": lo, "$lte": hi} if last else {"$gte": lo, "$lt": hi}
+        match = [{"$match": {"_id": id_range}}]
+    cursor = _db[collection].aggregate(
+        match + pipeline,
+        allowDiskUse=True,
+        **max_time_options(timeout_ms),
+    )
+    rows = 0
+    first = None
+    for doc in cursor:
+        if first is None:
+            first = doc
+        rows += 1
+    return rows, first
+
+
+# ============================================================
+# Faixas de _id
+# ============================================================
+
+def id_range(db, collection):
+    first = db[collection].find_one({}, {"_id": 1}, sort=[("_id", 1)])
+    last = db[collection].find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    if first is None:
+        return None, None
+    return first["_id"], last["_id"]
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _oid_to_int(oid):
+    return int.from_bytes(oid.binary, "big")
+
+
+def _int_to_oid(value):
+    return ObjectId(value.to_bytes(12, "big"))
+
+
+def _int_bounds(lo, hi, chunks):
+    step = max(1, -(-(hi - lo) // chunks))
+    starts = list(range(lo, hi, step)) or [lo]
+    return [
+        (start, hi if i == len(starts) - 1 else start + step)
+        for i, start in enumerate(starts)
+    ]
+
+
+def chunk_bounds(lo, hi, chunks):
+    """
+    Faixas contíguas [lo, hi), a última fechada em hi.
+    ObjectId: limites interpolados no valor de 96 bits; como ele começa pelo
+    timestamp, as faixas acompanham a ordem de inserção.
+    Inteiro: limites interpolados direto no _id.
+    Outros tipos (string, tipos misturados): uma faixa só, sem filtro de
+    _id, i.e. (None, None).
+    """
+    if isinstance(lo, ObjectId) and isinstance(hi, ObjectId):
+        return [
+            (_int_to_oid(start), _int_to_oid(end))
+            for start, end in _int_bounds(_oid_to_int(lo), _oid_to_int(hi), chunks)
+        ]
+    if _is_int(lo) and _is_int(hi):
+        return _int_bounds(int(lo), int(hi), chunks)
+    return [(None, None)]
+
+
+# ============================================================
+# Merge
+# ============================================================
+
+MERGE_FUNCS = {
+    "sum": sum,
+    "min": min,
+    "max": max,
+}
+
+
+def merge_chunks(results, merge):
+    """
+    merge=None: scan de documentos, só a contagem é somada.
+    merge={campo: sum|min|max}: agregado de 1 documento por faixa.
+    """
+    total_rows = sum(rows for rows, _ in results)
+    if not merge:
+        return None, total_rows
+
+    firsts = [first for _, first in results if first is not None]
+    merged = {
+        field: MERGE_FUNCS[func]([doc[field] for doc in firsts if doc.get(field) is not None])
+        for field, func in merge.items()
+    }
+    return pd.DataFrame([merged]), 1
+
+
+# ============================================================
+# Execução
+# ============================================================
+
+class SplitScanner:
+    """Pool de N processos, cada um com seu MongoClient."""
+
+    def __init__(self, uri, dbname, workers):
+        self.workers = workers
+        self.pool = Pool(workers, initializer=_init_worker, initargs=(uri, dbname))
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run_once(self, collection, pipeline, merge, bounds, timeout_ms=None):
+        """
+        timeout_ms vale para cada faixa (maxTimeMS nos workers); o run
+        inteiro desiste com multiprocessing.TimeoutError após o mesmo
+        limite mais a margem do cliente.
+        """
+        start = time.perf_counter()
+        work = [
+            (collection, pipeline, lo, hi, i == len(bounds) - 1, timeout_ms)
+            for i, (lo, hi) in enumerate(bounds)
+        ]
+        pending = self.pool.map_async(_scan_chunk, work)
+        results = pending.get(timeout=client_timeout_s(timeout_ms))
+        df, rows = merge_chunks(results, merge)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return df, rows, elapsed_ms
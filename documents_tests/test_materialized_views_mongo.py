@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# test_materialized_views_mongo.py
+# Refresh incremental das coleções de resumo contra um change stream simulado
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pymongo")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from materialized_views_mongo import (
+    SOURCE_COLLECTION,
+    STATE_COLLECTION,
+    STATE_ID,
+    TOTALS_ID,
+    refresh_materialized_views,
+)
+
+
+def order(order_id, customer_id, lines):
+    """lines: [(product_id, subtotal)]"""
+    return {
+        "_id": order_id,
+        "customer_id": customer_id,
+        "total_price": sum(subtotal for _, subtotal in lines),
+        "order_line": [{"product_id": p, "subtotal": subtotal} for p, subtotal in lines],
+    }
+
+
+class FakeStream:
+
+    def __init__(self, events):
+        self._events = list(events)
+        self.resume_token = {"_data": "end"}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def try_next(self):
+        return self._events.pop(0) if self._events else None
+
+
+class FakeOrders:
+    """
+    `orders` com um histórico de mudanças. Como o servidor: com
+    full_document="updateLookup" o fullDocument é o documento atual (ou None
+    se já foi apagado); com "required" é a pós-imagem do próprio evento.
+    """
+
+    def __init__(self):
+        self.docs = {}
+        self.history = []
+
+    def insert(self, doc):
+        self.docs[doc["_id"]] = doc
+        self.history.append(("insert", None, doc))
+
+    def replace(self, doc):
+        before = self.docs[doc["_id"]]
+        self.docs[doc["_id"]] = doc
+        self.history.append(("replace", before, doc))
+
+    def delete(self, order_id):
+        before = self.docs.pop(order_id)
+        self.history.append(("delete", before, None))
+
+    def watch(self, resume_after=None, full_document=None, full_document_before_change=None):
+        events = []
+        for op, before, after in self.history:
+            if op != "insert" and full_document == "updateLookup":
+                after = self.docs.get((before or after)["_id"])
+            if op == "delete":
+                after = None
+            event = {"operationType": op, "fullDocument": after}
+            if full_document_before_change in ("required", "whenAvailable"):
+                event["fullDocumentBeforeChange"] = before
+            events.append(event)
+        return FakeStream(events)
+
+
+class FakeSummary:
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        if "$inc" in update:
+            for field, n in update["$inc"].items():
+                doc[field] = doc.get(field, 0) + n
+        if "$set" in update:
+            doc.update(update["$set"])
+
+    def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+    def delete_many(self, query):
+        ((field, cond),) = query.items()
+        for key in [k for k, d in self.docs.items() if d.get(field, 0) <= cond["$lte"]]:
+            del self.docs[key]
+
+
+class FakeDB(dict):
+
+    def __missing__(self, name):
+        self[name] = FakeOrders() if name == SOURCE_COLLECTION else FakeSummary()
+        return self[name]
+
+
+def refreshed(changes):
+    """Resumos depois de um refresh a partir de resumos vazios com token salvo."""
+    db = FakeDB()
+    db[STATE_COLLECTION].docs[STATE_ID] = {"_id": STATE_ID, "resume_token": {"_data": "start"}}
+    changes(db[SOURCE_COLLECTION])
+    assert refresh_materialized_views(db) == ("incremental", len(db[SOURCE_COLLECTION].history))
+    return db
+
+
+def totals(db):
+    doc = db["mv_order_totals"].docs.get(TOTALS_ID, {})
+    return doc.get("total_revenue", 0), doc.get("num_orders", 0)
+
+
+def test_update_then_update_counts_the_order_once():
+    def changes(orders):
+        orders.insert(order(1, 10, [(100, 5.0)]))
+        orders.replace(order(1, 10, [(100, 7.0)]))
+        orders.replace(order(1, 10, [(100, 9.0), (200, 1.0)]))
+
+    db = refreshed(changes)
+    assert totals(db) == (10.0, 1)
+    assert db["mv_product_revenue"].docs[100]["total_revenue"] == 9.0
+    assert db["mv_product_revenue"].docs[100]["num_lines"] == 1
+    assert db["mv_product_revenue"].docs[200]["num_lines"] == 1
+    assert db["mv_customer_orders"].docs[10]["total_orders"] == 1
+
+
+def test_update_then_delete_removes_the_order_once():
+    def changes(orders):
+        orders.insert(order(1, 10, [(100, 5.0)]))
+        orders.insert(order(2, 20, [(100, 3.0)]))
+        orders.replace(order(1, 11, [(100, 7.0)]))
+        orders.delete(1)
+
+    db = refreshed(changes)
+    assert totals(db) == (3.0, 1)
+    assert db["mv_product_revenue"].docs[100]["total_revenue"] == 3.0
+    assert db["mv_product_revenue"].docs[100]["num_lines"] == 1
+    assert set(db["mv_customer_orders"].docs) == {20}
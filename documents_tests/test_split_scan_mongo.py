@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# test_split_scan_mongo.py
+# Faixas de _id do --split-scan (split_scan_mongo.chunk_bounds)
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pymongo")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bson import ObjectId
+
+# workload_config_mongo põe o run_control.py comum no sys.path
+import workload_config_mongo  # noqa: F401
+from split_scan_mongo import chunk_bounds
+
+
+def assert_contiguous(bounds, lo, hi):
+    assert bounds[0][0] == lo
+    assert bounds[-1][1] == hi
+    assert all(end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:]))
+    assert all(start < end for start, end in bounds)
+
+
+def test_int_ids():
+    bounds = chunk_bounds(1, 100, 4)
+    assert bounds == [(1, 26), (26, 51), (51, 76), (76, 100)]
+    assert_contiguous(bounds, 1, 100)
+
+
+def test_single_int_id():
+    assert chunk_bounds(7, 7, 4) == [(7, 7)]
+
+
+def test_object_ids_follow_insertion_order():
+    lo = ObjectId("65f000000000000000000000")
+    hi = ObjectId("65f0ffff0000000000000000")
+    bounds = chunk_bounds(lo, hi, 8)
+    assert len(bounds) == 8
+    assert_contiguous(bounds, lo, hi)
+    assert all(isinstance(b, ObjectId) for pair in bounds for b in pair)
+    # os limites ficam dentro do intervalo de timestamps de lo..hi
+    times = [start.generation_time for start, _ in bounds]
+    assert times == sorted(times)
+    assert lo.generation_time <= times[-1] <= hi.generation_time
+
+
+@pytest.mark.parametrize("lo, hi", [
+    ("a", "z"),
+    (1, "z"),
+    (True, 10),
+    (ObjectId("65f000000000000000000000"), 10),
+])
+def test_other_types_are_one_unfiltered_chunk(lo, hi):
+    assert chunk_bounds(lo, hi, 4) == [(None, None)]
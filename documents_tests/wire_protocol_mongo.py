@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# wire_protocol_mongo.py
+# Perfis de protocolo cliente/servidor (dimensão de experimento) e bytes
+# transferidos por run
+#
+# batch_size vira o batchSize do cursor (documentos por getMore; None = padrão
+# do servidor, 101 docs no 1º lote e depois até 16 MB). compressors é a
+# compressão do wire protocol negociada na conexão; zstd e snappy precisam dos
+# pacotes zstandard / python-snappy no cliente (sem eles o pymongo avisa e
+# conecta sem compressão).
+
+DEFAULT_PROTOCOL = "default"
+
+PROTOCOLS = {
+    "default": {},
+    "batch_1k": {"batch_size": 1_000},
+    "batch_10k": {"batch_size": 10_000},
+    "zlib": {"compressors": "zlib"},
+    "zstd": {"compressors": "zstd"},
+    "snappy": {"compressors": "snappy"},
+    "zstd_batch_10k": {"compressors": "zstd", "batch_size": 10_000},
+}
+
+
+# ============================================================
+# Opções do cliente / cursor
+# ============================================================
+
+def client_options(protocol):
+    """kwargs do MongoClient."""
+    if protocol.get("compressors"):
+        return {"compressors": protocol["compressors"]}
+    return {}
+
+
+def cursor_options(protocol):
+    """kwargs do aggregate()/find()."""
+    if protocol.get("batch_size"):
+        return {"batchSize": protocol["batch_size"]}
+    return {}
+
+
+# ============================================================
+# Bytes no fio
+# ============================================================
+
+def server_bytes_out(db):
+    """
+    Bytes enviados pelo servidor desde o start. physicalBytesOut (4.2+) é o
+    que passou na rede, já comprimido; bytesOut é o tamanho antes da compressão.
+    """
+    network = db.client.admin.command(
+        {"serverStatus": 1, "metrics": 0, "locks": 0, "wiredTiger": 0, "tcmalloc": 0}
+    )["network"]
+    return network.get("physicalBytesOut", network["bytesOut"])
+
+
+class BytesOutCounter:
+    """
+    Bytes servidor -> cliente desde a criação, sem contar a resposta do próprio
+    serverStatus. O contador é do servidor inteiro: só vale com um cliente e
+    sem outra carga no servidor.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        first = server_bytes_out(db)
+        self.start = server_bytes_out(db)
+        self.overhead = self.start - first
+
+    def delta(self):
+        return server_bytes_out(self.db) - self.start - self.overhead
@@ -1,3 +1,16 @@
+import os
+import sys
+
+# task_registry e os demais módulos que não dependem da engine (run_log,
+# result_sample, workload_trace...) são os de experiments_latest/koupil_tests/mysql
+MYSQL_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "experiments_latest", "koupil_tests", "mysql"
+))
+if MYSQL_DIR not in sys.path:
+    sys.path.append(MYSQL_DIR)
+
+from task_registry import TaskRegistry
+
 # ============================================================
 # MongoDB Connection
 # ============================================================
@@ -22,79 +35,219 @@ MONGO_DB_BY_SF = {
 # ============================================================
 
 DEFAULT_RUNS_PER_TASK = 5
+DEFAULT_SPLIT_WORKERS = 4
 
-TASK_RUNS = {
-    # pode sobrescrever runs por task se quiser
-    # "M1_TR1_denormalized_scan": 5,
-}
+# Limite por pipeline (maxTimeMS); `timeout_ms` da task sobrescreve
+DEFAULT_TIMEOUT_MS = 30 * 60 * 1000
+# Retries de erros transitórios (conexão, failover), com backoff exponencial
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_S = 2.0
+
+# Todas as tasks abaixo são registradas aqui. Metadados por task:
+#   collection, tags, runs, params, expected_rows, timeout_ms, equivalent (task gêmea
+#   no MySQL), base_task (variante comparada com outra task),
+#   split (split_scan_mongo.py), sample (amostra do resultado com --sample,
+#   result_sample.py), default=False (só roda com --only / --tag / flag da
+#   variante)
+REGISTRY = TaskRegistry()
 
 
 # ============================================================
 # Tasks – Regras ER + Query
 # ============================================================
 
-TASK_DEFINITIONS = {
-
-    # --------------------------------------------------------
-    # T-R1 — Denormalized + scans
-    # --------------------------------------------------------
-    "M1_TR1_denormalized_scan": {
-        "collection": "orders",
-        "pipeline": [
-            {"$group": {
-                "_id": None,
-                "total_revenue": {"$sum": "$total_price"},
-                "num_orders": {"$sum": 1}
-            }},
-            {"$project": {
-                "_id": 0,
-                "total_revenue": 1,
-                "num_orders": 1
-            }}
-        ],
-    },
-
-    # --------------------------------------------------------
-    # T-R2 — Document-centric CRUD (read)
-    # --------------------------------------------------------
-    "M2_TR2_single_order_lookup": {
-        "collection": "orders",
-        "pipeline": [
-            {"$match": {"order_id": {"$exists": True}}},
-            {"$limit": 1}
-        ],
-    },
-
-    # --------------------------------------------------------
-    # T-R3 — Normalized logic simulated (heavy unwind)
-    # --------------------------------------------------------
-    "M3_TR3_join_like_unwind": {
-        "collection": "orders",
-        "pipeline": [
-            {"$unwind": "$order_line"},
-            {"$group": {
-                "_id": "$order_line.product_id",
-                "total_revenue": {"$sum": "$order_line.subtotal"}
-            }},
-            {"$project": {
-                "_id": 0,
-                "product_id": "$_id",
-                "total_revenue": 1
-            }},
-            {"$sort": {"total_revenue": -1}}
-        ],
-    },
-
-    # --------------------------------------------------------
-    # T-R4 — Indexed attribute filtering
-    # --------------------------------------------------------
-    "M4_TR4_filter_by_product": {
-        "collection": "orders",
-        "pipeline": [
-            {"$unwind": "$order_line"},
-            {"$match": {"order_line.product_id": {"$exists": True}}},
-            {"$limit": 100}
-        ],
-    },
-}
+# --------------------------------------------------------
+# T-R1 — Denormalized + scans
+# --------------------------------------------------------
+@REGISTRY.task(
+    "M1_TR1_denormalized_scan",
+    collection="orders",
+    tags=("T-R1", "scan", "aggregate"),
+    expected_rows=1,
+    equivalent="T-R1_denorm_scan",
+    split={"merge": {"total_revenue": "sum", "num_orders": "sum"}},
+)
+def m1_denormalized_scan():
+    return [
+        {"$group": {
+            "_id": None,
+            "total_revenue": {"$sum": "$total_price"},
+            "num_orders": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 0,
+            "total_revenue": 1,
+            "num_orders": 1
+        }}
+    ]
+
+
+# --------------------------------------------------------
+# T-R2 — Document-centric CRUD (read)
+# --------------------------------------------------------
+@REGISTRY.task(
+    "M2_TR2_single_order_lookup",
+    collection="orders",
+    tags=("T-R2", "lookup"),
+    expected_rows=1,
+    equivalent="T-R2_single_order",
+)
+def m2_single_order_lookup():
+    return [
+        {"$match": {"order_id": {"$exists": True}}},
+        {"$limit": 1}
+    ]
+
+
+# --------------------------------------------------------
+# T-R3 — Normalized logic simulated (heavy unwind)
+# --------------------------------------------------------
+@REGISTRY.task(
+    "M3_TR3_join_like_unwind",
+    collection="orders",
+    tags=("T-R3", "aggregate", "group-by"),
+    equivalent="T-R3_join_revenue",
+)
+def m3_join_like_unwind():
+    return [
+        {"$unwind": "$order_line"},
+        {"$group": {
+            "_id": "$order_line.product_id",
+            "total_revenue": {"$sum": "$order_line.subtotal"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "product_id": "$_id",
+            "total_revenue": 1
+        }},
+        {"$sort": {"total_revenue": -1}}
+    ]
+
+
+# --------------------------------------------------------
+# T-R4 — Indexed attribute filtering
+# --------------------------------------------------------
+@REGISTRY.task(
+    "M4_TR4_filter_by_product",
+    collection="orders",
+    tags=("T-R4", "index"),
+    expected_rows=100,
+    equivalent="T-R4_index_filter",
+)
+def m4_filter_by_product():
+    return [
+        {"$unwind": "$order_line"},
+        {"$match": {"order_line.product_id": {"$exists": True}}},
+        {"$limit": 100}
+    ]
+
 
+# ============================================================
+# Pré-agregação (materialized_views_mongo.py)
+# ============================================================
+# Tag "materialized": executadas com --materialized, lado a lado com as tasks base
+
+@REGISTRY.task(
+    "M1_TR1_denormalized_scan_mv",
+    collection="mv_order_totals",
+    tags=("T-R1", "materialized"),
+    expected_rows=1,
+    equivalent="T-R1_denorm_scan_mv",
+    base_task="M1_TR1_denormalized_scan",
+    default=False,
+)
+def m1_denormalized_scan_mv():
+    return [
+        {"$match": {"_id": "global"}},
+        {"$project": {
+            "_id": 0,
+            "total_revenue": 1,
+            "num_orders": 1
+        }}
+    ]
+
+
+@REGISTRY.task(
+    "M3_TR3_join_like_unwind_mv",
+    collection="mv_product_revenue",
+    tags=("T-R3", "materialized"),
+    equivalent="T-R3_join_revenue_mv",
+    base_task="M3_TR3_join_like_unwind",
+    default=False,
+)
+def m3_join_like_unwind_mv():
+    return [
+        {"$project": {
+            "_id": 0,
+            "product_id": "$_id",
+            "total_revenue": 1
+        }},
+        {"$sort": {"total_revenue": -1}}
+    ]
+
+
+@REGISTRY.task(
+    "M5_TR5_orders_per_customer",
+    collection="orders",
+    tags=("T-R5", "aggregate", "group-by", "materialized"),
+    equivalent="T-R5_orders_per_customer",
+    default=False,
+)
+def m5_orders_per_customer():
+    return [
+        {"$group": {
+            "_id": "$customer_id",
+            "total_orders": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 0,
+            "customer_id": "$_id",
+            "total_orders": 1
+        }}
+    ]
+
+
+@REGISTRY.task(
+    "M5_TR5_orders_per_customer_mv",
+    collection="mv_customer_orders",
+    tags=("T-R5", "materialized"),
+    equivalent="T-R5_orders_per_customer_mv",
+    base_task="M5_TR5_orders_per_customer",
+    default=False,
+)
+def m5_orders_per_customer_mv():
+    return [
+        {"$project": {
+            "_id": 0,
+            "customer_id": "$_id",
+            "total_orders": 1
+        }}
+    ]
+
+
+# ============================================================
+# Split scan (split_scan_mongo.py)
+# ============================================================
+# Tasks com `split` ganham a variante <task>_split<N> com --split-scan N:
+# a pipeline roda em N faixas de _id, cada uma em um processo com seu
+# próprio MongoClient, e os resultados são combinados por `merge`
+# (None = scan, soma só a contagem).
+
+# Scan de documentos single-stream, base de M1_TR1_order_docs_scan_split<N>
+@REGISTRY.task(
+    "M1_TR1_order_docs_scan",
+    collection="orders",
+    tags=("T-R1", "scan", "split-scan"),
+    equivalent="T-R1_order_rows_scan",
+    split={"merge": None},
+    default=False,
+)
+def m1_order_docs_scan():
+    return [
+        {"$project": {
+            "_id": 0,
+            "order_id": 1,
+            "customer_id": 1,
+            "total_price": 1
+        }}
+    ]
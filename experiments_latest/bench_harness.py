@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# bench_harness.py
+# Micro-benchmark dos próprios runners, sem os servidores
+#
+# Roda o run_query_once (MySQL), o run_pipeline_once (MongoDB) e o resumo
+# derivado do run_log contra substitutos locais:
+#   mysql    pymysql.connect trocado por uma conexão SQLite em memória com
+#            uma tabela sintética (SET / SHOW STATUS viram no-op)
+#   mongodb  connect_mongo trocado por um cliente mock cujo aggregate gera
+#            os documentos em memória ({"$limit": n} decide o tamanho)
+#   summary  RunLog + write_summary com tasks x runs sintéticos
+# Cada suíte roda num processo próprio (os dois runners têm módulos com o
+# mesmo nome: run_log, task_registry, ...).
+#
+# Por caso e tamanho de resultado (1 linha a milhões):
+#   median_ms    mediana de --repeats execuções
+#   source_ms    só a leitura do substituto (SQLite fetchall / iterar o mock)
+#   overhead_ms  median_ms - source_ms: custo do harness (DataFrame, digest,
+#                amostra, log); no tamanho 1 é o custo fixo por run
+#   rows_per_s   vazão do harness
+#   peak_mb      pico de memória Python (tracemalloc) em uma execução extra
+#   check        resultado conferido (linhas, amostra, digest)
+# Bytes no fio não são medidos (os substitutos devolvem 0).
+#
+# Uso:
+#   python bench_harness.py
+#   python bench_harness.py --suite mysql --sizes 1 1000 1000000 --repeats 3
+#   python bench_harness.py --out bench_new.json --compare bench_old.json
+#   (exit code 1 com check falho ou caso mais lento que --threshold)
+
+import os
+import gc
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+import contextlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MYSQL_DIR = os.path.join(HERE, "koupil_tests", "mysql")
+MONGO_DIR = os.path.join(HERE, "..", "documents_tests")
+
+SUITES = ("mysql", "mongodb", "summary")
+
+DEFAULT_SIZES = [1, 1_000, 100_000, 1_000_000]
+DEFAULT_REPEATS = 5
+# tasks x runs do resumo
+SUMMARY_TASKS = 20
+DEFAULT_SUMMARY_RUNS = [100, 1_000, 10_000]
+
+SAMPLE = {"size": 1_000, "head": 20, "tail": 20}
+
+# --compare: mais lento que isso (fração) é regressão
+DEFAULT_THRESHOLD = 0.20
+
+DEFAULT_OUT = "bench_harness_results.json"
+
+
+# ============================================================
+# Medição
+# ============================================================
+
+def measure(fn, repeats):
+    """(resultado da 1ª execução, mediana em ms, pico de memória em bytes)."""
+    times = []
+    first = None
+    for i in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+        if i == 0:
+            first = result
+        del result
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, statistics.median(times), peak
+
+
+def case_row(suite, case, size, median_ms, source_ms, peak, check):
+    overhead_ms = median_ms - source_ms if source_ms is not None else None
+    return {
+        "suite": suite,
+        "case": case,
+        "size": size,
+        "median_ms": round(median_ms, 3),
+        "source_ms": round(source_ms, 3) if source_ms is not None else None,
+        "overhead_ms": round(overhead_ms, 3) if overhead_ms is not None else None,
+        "rows_per_s": round(size / (median_ms / 1000)) if median_ms > 0 else None,
+        "peak_mb": round(peak / 1e6, 2),
+        "check": check,
+    }
+
+
+def check_result(rows, df, size, sampled, digest=None, expected_digest=None):
+    if rows != size:
+        return f"rows {rows} != {size}"
+    if sampled:
+        limit = SAMPLE["size"] + SAMPLE["head"] + SAMPLE["tail"]
+        if len(df) > limit or (size and df["_row"].max() >= size):
+            return f"sample of {len(df)} rows out of bounds"
+    elif len(df) != size:
+        return f"frame has {len(df)} rows, expected {size}"
+    if expected_digest is not None and digest != expected_digest:
+        return "result digest differs"
+    return "ok"
+
+
+# ============================================================
+# Substituto do MySQL (SQLite)
+# ============================================================
+
+class SqliteStandIn:
+    """Um banco SQLite em memória compartilhado por todas as "conexões"."""
+
+    def __init__(self, rows):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE bench_rows (order_id INTEGER, customer_id INTEGER, "
+            "total_price REAL, status TEXT)"
+        )
+        self.db.execute(
+            """
+            WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i + 1 < ?)
+            INSERT INTO bench_rows
+            SELECT i, i % 1000, (i % 9973) / 7.0, CASE i % 3 WHEN 0 THEN 'open' ELSE 'closed' END
+            FROM seq
+            """,
+            (rows,),
+        )
+
+    def connect(self, **_):
+        return _SqliteConnection(self.db)
+
+
+class _SqliteConnection:
+
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, cursor_class=None):
+        return _SqliteCursor(self.db.cursor())
+
+    def close(self):
+        pass
+
+
+class _SqliteCursor:
+    # SSCursor ou Cursor: o SQLite lê sob demanda nos dois casos
+
+    def __init__(self, cur):
+        self.cur = cur
+        self._status = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cur.close()
+
+    @property
+    def description(self):
+        return self.cur.description
+
+    def execute(self, sql, params=None):
+        statement = sql.lstrip().upper()
+        self._status = None
+        if statement.startswith("SET "):
+            return 0
+        if statement.startswith("SHOW "):
+            self._status = [("Bytes_sent", "0")]
+            return 1
+        if params:
+            self.cur.execute(sql, params)
+        else:
+            self.cur.execute(sql)
+        return 0
+
+    def fetchone(self):
+        if self._status is not None:
+            return self._status.pop(0) if self._status else None
+        return self.cur.fetchone()
+
+    def fetchmany(self, size):
+        return self.cur.fetchmany(size)
+
+    def fetchall(self):
+        return self.cur.fetchall()
+
+
+def bench_mysql(sizes, repeats):
+    sys.path.insert(0, MYSQL_DIR)
+    import pymysql
+    import run_workload_mysql_sf as runner
+    from task_registry import result_digest
+    from wire_protocol import PROTOCOLS, DEFAULT_PROTOCOL
+
+    standin = SqliteStandIn(max(sizes))
+    pymysql.connect = standin.connect
+    db_config = {"host": "standin", "port": 0}
+
+    cases = {
+        "full": {"protocol": PROTOCOLS[DEFAULT_PROTOCOL]},
+        "stream_10k": {"protocol": PROTOCOLS["stream_10k"]},
+        "digest": {"protocol": PROTOCOLS[DEFAULT_PROTOCOL], "digest": True},
+        "sample": {"protocol": PROTOCOLS[DEFAULT_PROTOCOL], "sample": SAMPLE},
+        "sample_digest": {"protocol": PROTOCOLS[DEFAULT_PROTOCOL], "sample": SAMPLE, "digest": True},
+    }
+
+    results = []
+    for size in sizes:
+        sql = f"SELECT order_id, customer_id, total_price, status FROM bench_rows LIMIT {size}"
+        expected_digest = result_digest(standin.db.execute(sql).fetchall())
+        _, source_ms, _ = measure(lambda: standin.db.execute(sql).fetchall(), repeats)
+
+        for case, options in cases.items():
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result, median_ms, peak = measure(
+                    lambda: runner.run_query_once(db_config, "bench", sql, 1, **options), repeats
+                )
+            df, rows, _, _, _, digest = result
+            check = check_result(
+                rows, df, size, "sample" in options, digest,
+                expected_digest if options.get("digest") else None,
+            )
+            results.append(case_row("mysql", case, size, median_ms, source_ms, peak, check))
+    return results
+
+
+# ============================================================
+# Substituto do MongoDB (mock em memória)
+# ============================================================
+
+def _documents(n):
+    for i in range(n):
+        yield {"order_id": i, "customer_id": i % 1000, "total_price": (i % 9973) / 7.0,
+               "status": "open" if i % 3 == 0 else "closed"}
+
+
+class _MockCursor:
+
+    address = ("standin", 27017)
+
+    def __init__(self, n):
+        self._docs = _documents(n)
+
+    def __iter__(self):
+        return self._docs
+
+
+class _MockCollection:
+
+    def aggregate(self, pipeline, **_):
+        limit = next(stage["$limit"] for stage in pipeline if "$limit" in stage)
+        return _MockCursor(limit)
+
+
+class _MockDatabase:
+
+    def __getitem__(self, name):
+        return _MockCollection()
+
+
+class _MockClient:
+
+    def close(self):
+        pass
+
+
+def bench_mongo(sizes, repeats):
+    sys.path.insert(0, MONGO_DIR)
+    import run_workload_mongo as runner
+    from wire_protocol_mongo import PROTOCOLS, DEFAULT_PROTOCOL
+
+    runner.connect_mongo = lambda *args, **kwargs: (_MockClient(), _MockDatabase())
+
+    cases = {
+        "full": {"protocol": PROTOCOLS[DEFAULT_PROTOCOL]},
+        "batch_10k": {"protocol": PROTOCOLS["batch_10k"]},
+        "sample": {"protocol": PROTOCOLS[DEFAULT_PROTOCOL], "sample": SAMPLE},
+    }
+
+    results = []
+    for size in sizes:
+        pipeline = [{"$limit": size}]
+        _, source_ms, _ = measure(lambda: list(_MockCursor(size)), repeats)
+
+        for case, options in cases.items():
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result, median_ms, peak = measure(
+                    lambda: runner.run_pipeline_once(
+                        "bench", "orders", pipeline, 1, 1, measure_wire=False, **options
+                    ),
+                    repeats,
+                )
+            df, rows, _, _, _ = result
+            check = check_result(rows, df, size, "sample" in options)
+            results.append(case_row("mongodb", case, size, median_ms, source_ms, peak, check))
+    return results
+
+
+# ============================================================
+# Resumo derivado do run_log
+# ============================================================
+
+def bench_summary(runs_per_task, repeats):
+    sys.path.insert(0, MYSQL_DIR)
+    import run_workload_mysql_sf as runner
+    from run_log import RunLog
+    from run_control import RunOutcome, run_record
+
+    results = []
+    for runs in runs_per_task:
+        events = SUMMARY_TASKS * runs
+        with tempfile.TemporaryDirectory() as output_dir:
+
+            def write_log():
+                run_log = RunLog(output_dir, {"engine": "bench", "runs": runs})
+                for t in range(SUMMARY_TASKS):
+                    task = f"T{t:02d}"
+                    run_log.task(task, {"task": task, "runs_configured": runs})
+                    for run in range(1, runs + 1):
+                        outcome = RunOutcome(result=None, attempts=1)
+                        run_log.run(task, run_record(run, outcome, 1.0 + (run * 7919 % 1000) / 100, 1))
+                run_log.close()
+                return run_log
+
+            run_log, log_ms, log_peak = measure(write_log, repeats)
+            results.append(case_row("summary", "run_log_write", events, log_ms, None, log_peak, "ok"))
+
+            summary_csv, summary_ms, summary_peak = measure(
+                lambda: runner.write_summary(run_log, output_dir, {}, {}), repeats
+            )
+            with open(summary_csv, encoding="utf-8") as f:
+                lines = sum(1 for _ in f) - 1
+            check = "ok" if lines == SUMMARY_TASKS else f"summary has {lines} tasks"
+            results.append(case_row("summary", "write_summary", events, summary_ms, None, summary_peak, check))
+    return results
+
+
+# ============================================================
+# Relatório
+# ============================================================
+
+COLUMNS = ["suite", "case", "size", "median_ms", "source_ms", "overhead_ms", "rows_per_s", "peak_mb", "check"]
+
+
+def print_table(results):
+    table = [COLUMNS] + [["" if r[c] is None else str(r[c]) for c in COLUMNS] for r in results]
+    widths = [max(len(row[i]) for row in table) for i in range(len(COLUMNS))]
+    for row in table:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def compare(results, baseline, threshold):
+    """Casos mais lentos que o baseline por mais de `threshold`."""
+    previous = {(r["suite"], r["case"], r["size"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get((r["suite"], r["case"], r["size"]))
+        if old is None or not old["median_ms"]:
+            continue
+        ratio = r["median_ms"] / old["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{r['suite']}/{r['case']} size={r['size']}: "
+                f"{old['median_ms']} -> {r['median_ms']} ms (x{ratio:.2f})"
+            )
+    return regressions
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline micro-benchmark of the workload runners")
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Result sizes (rows) for the mysql and mongodb suites")
+    parser.add_argument("--summary-runs", type=int, nargs="+", default=DEFAULT_SUMMARY_RUNS,
+                        help=f"Runs per task for the summary suite ({SUMMARY_TASKS} tasks)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="JSON with every measured case")
+    parser.add_argument("--compare", metavar="JSON", help="Previous --out file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown (fraction of the median) reported as a regression")
+    # uso interno: uma suíte por processo
+    parser.add_argument("--child", metavar="RESULT_FILE", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def run_child(args):
+    suite = args.suite[0]
+    if suite == "mysql":
+        results = bench_mysql(args.sizes, args.repeats)
+    elif suite == "mongodb":
+        results = bench_mongo(args.sizes, args.repeats)
+    else:
+        results = bench_summary(args.summary_runs, args.repeats)
+    with open(args.child, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        run_child(args)
+        return
+
+    results = []
+    failed_suites = []
+    for suite in args.suite:
+        print(f">>> {suite}")
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            result_file = tmp.name
+        cmd = [
+            sys.executable, os.path.abspath(__file__),
+            "--suite", suite,
+            "--sizes", *map(str, args.sizes),
+            "--summary-runs", *map(str, args.summary_runs),
+            "--repeats", str(args.repeats),
+            "--child", result_file,
+        ]
+        try:
+            if subprocess.run(cmd).returncode != 0:
+                failed_suites.append(suite)
+                continue
+            with open(result_file, encoding="utf-8") as f:
+                results.extend(json.load(f))
+        finally:
+            os.remove(result_file)
+
+    print()
+    print_table(results)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+    print(f"\nSaved to: {args.out}")
+
+    problems = [f"suite {suite} failed" for suite in failed_suites]
+    problems += [f"{r['suite']}/{r['case']} size={r['size']}: {r['check']}" for r in results if r["check"] != "ok"]
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            problems += compare(results, json.load(f)["results"], args.threshold)
+    for problem in problems:
+        print(f"WARNING {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
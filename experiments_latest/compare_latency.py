@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# compare_latency.py
+# Compara a latência de cauda (p50/p90/p99/p99.9) entre MySQL e MongoDB
+#
+# Lê o latency_histograms.json de cada diretório de saída dos runners e
+# pareia as tasks pelo `equivalent_task` dos resumos. Histogramas da mesma
+# task e SF vindos de vários diretórios (ex.: workers concorrentes) são
+# mesclados; com --merge-sf os SFs também são mesclados num só histograma.
+#
+# Uso:
+#   python compare_latency.py --mysql koupil_tests/mysql/outputs/sf10 \
+#       --mongo ../documents_tests/outputs/sf10
+#   python compare_latency.py --mysql koupil_tests/mysql/outputs/sf* \
+#       --mongo ../documents_tests/outputs/sf* --merge-sf
+
+import os
+import sys
+import glob
+import argparse
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MYSQL_DIR = os.path.join(HERE, "koupil_tests", "mysql")
+
+# latency_histogram.py é o mesmo que os runners usam
+sys.path.insert(0, MYSQL_DIR)
+from latency_histogram import (
+    HISTOGRAM_FILE,
+    PERCENTILES,
+    LatencyHistogram,
+    load_histograms,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare MySQL and MongoDB tail latency")
+    parser.add_argument("--mysql", nargs="+", required=True, help="MySQL output directories")
+    parser.add_argument("--mongo", nargs="+", required=True, help="MongoDB output directories")
+    parser.add_argument("--merge-sf", action="store_true",
+                        help="Merge all scale factors into one histogram per task")
+    parser.add_argument("--out", default="latency_comparison.csv", help="Output CSV")
+    return parser.parse_args()
+
+
+# ============================================================
+# Leitura
+# ============================================================
+
+def load_side(dirs, merge_sf):
+    """
+    {(sf, task): LatencyHistogram} mesclado por SF (ou "all" com merge_sf) e
+    {task: equivalent_task} lido dos resumos.
+    """
+    merged = {}
+    equivalents = {}
+    for d in dirs:
+        path = os.path.join(d, HISTOGRAM_FILE)
+        if not os.path.exists(path):
+            raise SystemExit(f"No {HISTOGRAM_FILE} in {d}")
+        context, histograms = load_histograms(path)
+        sf = "all" if merge_sf else context.get("sf")
+        for task, hist in histograms.items():
+            key = (sf, task)
+            if key in merged:
+                merged[key].merge(hist)
+            else:
+                merged[key] = LatencyHistogram(hist.significant_digits).merge(hist)
+
+        for summary_csv in glob.glob(os.path.join(d, "workload_summary*.csv")):
+            summary = pd.read_csv(summary_csv)
+            if "equivalent_task" in summary.columns:
+                equivalents.update(summary.dropna(subset=["equivalent_task"])
+                                   .set_index("task")["equivalent_task"].to_dict())
+    return merged, equivalents
+
+
+# ============================================================
+# Comparação
+# ============================================================
+
+def _side_columns(prefix, hist):
+    row = {f"{prefix}_runs": hist.count if hist else 0}
+    values = hist.percentiles() if hist else dict.fromkeys(PERCENTILES)
+    row.update({f"{prefix}_{name}": value for name, value in values.items()})
+    return row
+
+
+def compare(mysql, mongo, mysql_equivalents, mongo_equivalents):
+    # pares MySQL -> Mongo vindos de qualquer um dos lados
+    pairs = dict(mysql_equivalents)
+    pairs.update({my: mo for mo, my in mongo_equivalents.items() if my not in pairs})
+
+    rows = []
+    for (sf, mysql_task), mysql_hist in mysql.items():
+        mongo_task = pairs.get(mysql_task)
+        mongo_hist = mongo.get((sf, mongo_task))
+        if mongo_hist is None:
+            continue
+        row = {"sf": sf, "mysql_task": mysql_task, "mongo_task": mongo_task}
+        row.update(_side_columns("mysql", mysql_hist))
+        row.update(_side_columns("mongo", mongo_hist))
+        for name in PERCENTILES:
+            my, mo = row[f"mysql_{name}"], row[f"mongo_{name}"]
+            row[f"{name[:-3]}_ratio_mysql_mongo"] = round(my / mo, 2) if my and mo else None
+        rows.append(row)
+    if not rows:
+        raise SystemExit("No MySQL/MongoDB task pairs with histograms on both sides")
+    return pd.DataFrame(rows).sort_values(["mysql_task", "sf"], key=lambda c: c.astype(str))
+
+
+def main():
+    args = parse_args()
+    mysql, mysql_equivalents = load_side(args.mysql, args.merge_sf)
+    mongo, mongo_equivalents = load_side(args.mongo, args.merge_sf)
+    comparison = compare(mysql, mongo, mysql_equivalents, mongo_equivalents)
+    comparison.to_csv(args.out, index=False)
+    print(comparison.to_string(index=False))
+    print(f"\nSaved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# compare_layouts.py
+# Compara os resumos de layouts particionados/shardeados com o baseline
+#
+# Lê <outputs>/sf<SF>/workload_summary*.csv (baseline) e
+# <outputs>/sf<SF>_<layout>/workload_summary*.csv, gerados pelos runners
+# com --layout, e grava <outputs>/layout_comparison.csv.
+#
+# Uso:
+#   python compare_layouts.py --outputs koupil_tests/mysql/outputs
+#   python compare_layouts.py --outputs ../documents_tests/outputs
+
+import os
+import re
+import sys
+import glob
+import argparse
+
+import pandas as pd
+
+from environment_compat import (
+    IncompatibleEnvironments,
+    load_fingerprint,
+    require_compatible,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MYSQL_DIR = os.path.join(HERE, "koupil_tests", "mysql")
+MONGO_DIR = os.path.join(HERE, "..", "documents_tests")
+
+# nomes dos layouts de cada runner
+sys.path.insert(0, MYSQL_DIR)
+sys.path.insert(0, MONGO_DIR)
+from partitioned_layouts import LAYOUTS
+from sharded_cluster_mongo import SHARDED_LAYOUTS
+
+# sf<SF> e sf<SF>_<layout>; as outras pastas dos runners (sf<SF>_r<K> das
+# réplicas, sf<SF>_graph / sf<SF>_kv do multimodel...) não são layouts
+SUMMARY_DIR_RE = re.compile(
+    r"^sf(\d+)(?:_(%s))?$" % "|".join(map(re.escape, sorted({*LAYOUTS, *SHARDED_LAYOUTS})))
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare partitioned/sharded layouts against the baseline")
+    parser.add_argument("--outputs", required=True, help="Runner outputs directory")
+    return parser.parse_args()
+
+
+# Layouts diferem de propósito em índices/chaves; o resto do ambiente não
+LAYOUT_IGNORED_KEYS = ("indexes",)
+# Layouts shardeados do Mongo são lidos pelo mongos, cujo serverStatus não
+# tem a seção wiredTiger: cache_bytes fica None e não dá para comparar
+MONGOS_IGNORED_KEYS = ("cache_bytes",)
+
+
+def _is_mongos(fingerprint):
+    return bool(fingerprint.get("server", {}).get("is_mongos"))
+
+
+def check_environments(outputs_dir, dirs_by_sf):
+    """Dentro de cada SF, todos os layouts devem vir do mesmo ambiente."""
+    for sf, subs in dirs_by_sf.items():
+        fingerprints = [(sub, load_fingerprint(os.path.join(outputs_dir, sub))) for sub in subs]
+        known = [(sub, fp) for sub, fp in fingerprints if fp is not None]
+        for sub, fp in fingerprints:
+            if fp is None:
+                print(f"WARNING {sub}: no environment fingerprint, compatibility not checked")
+        for sub, fp in known[1:]:
+            ignore = LAYOUT_IGNORED_KEYS
+            if _is_mongos(known[0][1]) or _is_mongos(fp):
+                ignore += MONGOS_IGNORED_KEYS
+                print(f"NOTE {known[0][0]} vs {sub}: read through mongos, cache size not compared")
+            require_compatible(
+                known[0][1], fp, ignore=ignore,
+                what=f"environments ({known[0][0]} vs {sub})",
+            )
+
+
+def load_summaries(outputs_dir):
+    frames = []
+    dirs_by_sf = {}
+    for sub in sorted(os.listdir(outputs_dir)):
+        match = SUMMARY_DIR_RE.match(sub)
+        if not match:
+            continue
+        dirs_by_sf.setdefault(int(match.group(1)), []).append(sub)
+        for path in glob.glob(os.path.join(outputs_dir, sub, "workload_summary*.csv")):
+            df = pd.read_csv(path)
+            df["sf"] = int(match.group(1))
+            df["layout"] = match.group(2) or "baseline"
+            # tasks sem nenhum run válido ficam de fora da comparação
+            frames.append(df[["task", "sf", "layout", "avg_time_ms"]].dropna(subset=["avg_time_ms"]))
+    if not frames:
+        raise SystemExit(f"No workload summaries found under {outputs_dir}")
+    try:
+        check_environments(outputs_dir, dirs_by_sf)
+    except IncompatibleEnvironments as e:
+        raise SystemExit(str(e))
+    return pd.concat(frames, ignore_index=True)
+
+
+def compare_layouts(summary):
+    baseline = (
+        summary[summary["layout"] == "baseline"]
+        .set_index(["task", "sf"])["avg_time_ms"]
+    )
+    out = summary.copy()
+    out["baseline_avg_time_ms"] = [
+        baseline.get((task, sf)) for task, sf in zip(out["task"], out["sf"])
+    ]
+    out["speedup_vs_baseline"] = (out["baseline_avg_time_ms"] / out["avg_time_ms"]).round(2)
+
+    # crescimento do tempo em relação ao menor SF medido no mesmo layout
+    smallest = out.loc[out.groupby(["task", "layout"])["sf"].idxmin()]
+    ref = smallest.set_index(["task", "layout"])[["sf", "avg_time_ms"]]
+    out["growth_vs_min_sf"] = [
+        round(avg / ref.loc[(task, layout), "avg_time_ms"], 2)
+        if ref.loc[(task, layout), "avg_time_ms"] > 0 else None
+        for task, layout, avg in zip(out["task"], out["layout"], out["avg_time_ms"])
+    ]
+    return out.sort_values(["task", "sf", "layout"]).reset_index(drop=True)
+
+
+def main():
+    args = parse_args()
+    comparison = compare_layouts(load_summaries(args.outputs))
+    out_csv = os.path.join(args.outputs, "layout_comparison.csv")
+    comparison.to_csv(out_csv, index=False)
+    print(comparison.to_string(index=False))
+    print(f"\nSaved to: {out_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# environment_compat.py
+# Leitura do environment_fingerprint.json gravado pelos runners e checagem
+# de compatibilidade entre duas execuções
+
+import os
+import json
+
+FINGERPRINT_FILE = "environment_fingerprint.json"
+
+
+class IncompatibleEnvironments(Exception):
+    pass
+
+
+def load_fingerprint(outputs_dir):
+    path = os.path.join(outputs_dir, FINGERPRINT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def incompatibilities(a, b, ignore=()):
+    """
+    Lista as chaves de `compatibility` que diferem entre dois fingerprints
+    (dicts completos ou só a parte `compatibility`).
+    """
+    a = a.get("compatibility", a)
+    b = b.get("compatibility", b)
+    diffs = []
+    for key in sorted(set(a) | set(b)):
+        if key in ignore:
+            continue
+        if a.get(key) != b.get(key):
+            diffs.append(f"{key}: {a.get(key)!r} != {b.get(key)!r}")
+    return diffs
+
+
+def require_compatible(a, b, ignore=(), what="environments"):
+    diffs = incompatibilities(a, b, ignore)
+    if diffs:
+        raise IncompatibleEnvironments(
+            f"Refusing to compare incompatible {what}:\n  " + "\n  ".join(diffs)
+        )
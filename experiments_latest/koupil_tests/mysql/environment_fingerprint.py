@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# environment_fingerprint.py
+# Fingerprint do servidor, do dataset e do host cliente gravado com cada resumo
+
+import os
+import json
+import socket
+import platform
+from datetime import datetime
+
+import pandas as pd
+import pymysql
+
+# ================================
+# O QUE É COLETADO
+# ================================
+
+SERVER_VARIABLES = [
+    "version",
+    "version_comment",
+    "innodb_buffer_pool_size",
+    "innodb_buffer_pool_instances",
+    "innodb_flush_method",
+    "innodb_flush_log_at_trx_commit",
+    "innodb_io_capacity",
+    "innodb_log_file_size",
+    "innodb_redo_log_capacity",
+    "innodb_parallel_read_threads",
+    "join_buffer_size",
+    "sort_buffer_size",
+    "tmp_table_size",
+    "max_heap_table_size",
+    "max_connections",
+    "optimizer_switch",
+    "transaction_isolation",
+    "character_set_server",
+]
+
+# Tabelas do dataset: contagem exata de linhas e checagem de compatibilidade
+# (as demais, como mv_*, usam a estimativa do information_schema)
+COUNTED_TABLES = ["Order", "Order_line", "Product"]
+
+FINGERPRINT_FILE = "environment_fingerprint.json"
+
+
+# ================================
+# HOST CLIENTE
+# ================================
+
+def _total_memory_bytes():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def client_host_info():
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "memory_bytes": _total_memory_bytes(),
+        "python_version": platform.python_version(),
+        "libraries": {
+            "pymysql": pymysql.__version__,
+            "pandas": pd.__version__,
+        },
+    }
+
+
+# ================================
+# SERVIDOR / DATASET
+# ================================
+
+def server_variables(cur):
+    cur.execute(
+        "SHOW GLOBAL VARIABLES WHERE Variable_name IN ("
+        + ", ".join(["%s"] * len(SERVER_VARIABLES)) + ");",
+        SERVER_VARIABLES,
+    )
+    return {name: value for name, value in cur.fetchall()}
+
+
+def dataset_tables(cur, dbname):
+    cur.execute(
+        "SELECT TABLE_NAME, ENGINE, TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH, CREATE_OPTIONS "
+        "FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME;",
+        (dbname,),
+    )
+    tables = {}
+    for name, engine, est_rows, data_len, index_len, options in cur.fetchall():
+        tables[name] = {
+            "engine": engine,
+            "estimated_rows": est_rows,
+            "data_bytes": data_len,
+            "index_bytes": index_len,
+            "create_options": options,
+        }
+
+    for name in COUNTED_TABLES:
+        if name in tables:
+            cur.execute(f"SELECT COUNT(*) FROM `{name}`;")
+            tables[name]["rows"] = cur.fetchone()[0]
+    return tables
+
+
+def dataset_indexes(cur, dbname):
+    cur.execute(
+        "SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, "
+        "GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) "
+        "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = %s "
+        "GROUP BY TABLE_NAME, INDEX_NAME, NON_UNIQUE ORDER BY TABLE_NAME, INDEX_NAME;",
+        (dbname,),
+    )
+    return [
+        f"{table}.{index}({columns}){'' if non_unique else ' UNIQUE'}"
+        for table, index, non_unique, columns in cur.fetchall()
+    ]
+
+
+def collect_fingerprint(db_config, sf):
+    """
+    Coletado depois das tasks: o COUNT(*) das tabelas grandes não deve
+    aquecer o buffer pool antes das medições.
+    """
+    conn = pymysql.connect(**db_config)
+    try:
+        with conn.cursor() as cur:
+            variables = server_variables(cur)
+            tables = dataset_tables(cur, db_config["database"])
+            indexes = dataset_indexes(cur, db_config["database"])
+    finally:
+        conn.close()
+
+    client = client_host_info()
+    version = variables.get("version", "")
+
+    return {
+        "captured_at": datetime.now().isoformat(timespec="seconds"),
+        "engine": "mysql",
+        "sf": sf,
+        "database": db_config["database"],
+        "server": {
+            "host": db_config["host"],
+            "port": db_config["port"],
+            "variables": variables,
+        },
+        "dataset": {
+            "tables": tables,
+            "indexes": indexes,
+        },
+        "client": client,
+        # Campos que precisam ser iguais para dois resumos serem comparáveis
+        "compatibility": {
+            "engine": "mysql",
+            "sf": sf,
+            "server_version": ".".join(version.split("-")[0].split(".")[:2]),
+            "cache_bytes": int(variables.get("innodb_buffer_pool_size") or 0),
+            "row_counts": {
+                name: info["rows"] for name, info in tables.items() if "rows" in info
+            },
+            "indexes": [
+                index for index in indexes if index.split(".", 1)[0] in COUNTED_TABLES
+            ],
+            "client_cpu_count": client["cpu_count"],
+        },
+    }
+
+
+def write_fingerprint(fingerprint, output_dir):
+    path = os.path.join(output_dir, FINGERPRINT_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fingerprint, f, indent=2, default=str)
+    return path
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# latency_histogram.py
+# Histograma de latência no estilo HDR: memória fixa, erro relativo limitado,
+# mesclável entre workers / SFs e serializável em JSON
+
+import json
+import math
+
+# Dígitos significativos preservados (3 => erro relativo < 0.1%)
+DEFAULT_SIGNIFICANT_DIGITS = 3
+
+# Valores gravados em µs inteiros
+UNIT_PER_MS = 1000
+
+HISTOGRAM_FILE = "latency_histograms.json"
+
+PERCENTILES = {
+    "p50_ms": 50.0,
+    "p90_ms": 90.0,
+    "p99_ms": 99.0,
+    "p99_9_ms": 99.9,
+}
+
+
+class LatencyHistogram:
+    """
+    Buckets log-lineares como no HdrHistogram: abaixo de `sub_bucket_count` µs
+    cada valor tem seu bucket; acima, cada faixa [2^k, 2^(k+1)) é dividida em
+    sub_bucket_count / 2 buckets iguais. Só os buckets usados são guardados,
+    e o número de buckets possíveis não depende do número de amostras.
+    """
+
+    def __init__(self, significant_digits=DEFAULT_SIGNIFICANT_DIGITS):
+        self.significant_digits = significant_digits
+        largest_exact = 2 * 10 ** significant_digits
+        self._sub_bits = math.ceil(math.log2(largest_exact))
+        self._sub_count = 1 << self._sub_bits
+        self._half = self._sub_count >> 1
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    # ---------- buckets ----------
+
+    def _index(self, value):
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return self._sub_count + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _bucket_range(self, index):
+        """[lo, hi) em µs do bucket."""
+        if index < self._sub_count:
+            return index, index + 1
+        shift = (index - self._sub_count) // self._half + 1
+        lo = ((index - self._sub_count) % self._half + self._half) << shift
+        return lo, lo + (1 << shift)
+
+    # ---------- gravação ----------
+
+    def record(self, value_ms, count=1):
+        value = max(0, int(round(value_ms * UNIT_PER_MS)))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if other.significant_digits != self.significant_digits:
+            raise ValueError(
+                f"Cannot merge histograms with {other.significant_digits} and "
+                f"{self.significant_digits} significant digits"
+            )
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    # ---------- leitura ----------
+
+    def percentile(self, p):
+        """
+        Valor (ms) no percentil p: limite superior do bucket que contém a
+        amostra de posição ceil(p% * count), limitado ao min/max observados.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                _, hi = self._bucket_range(index)
+                value = min(max(hi - 1, self.min), self.max)
+                return value / UNIT_PER_MS
+        return self.max / UNIT_PER_MS
+
+    def percentiles(self):
+        return {
+            name: None if p is None else round(p, 3)
+            for name, p in ((name, self.percentile(q)) for name, q in PERCENTILES.items())
+        }
+
+    def mean(self):
+        return self.total / self.count / UNIT_PER_MS if self.count else None
+
+    # ---------- serialização ----------
+
+    def to_dict(self):
+        return {
+            "significant_digits": self.significant_digits,
+            "unit": "us",
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "counts": {str(index): n for index, n in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls(data["significant_digits"])
+        hist.counts = {int(index): n for index, n in data["counts"].items()}
+        hist.count = data["count"]
+        hist.total = data["total"]
+        hist.min = data["min"]
+        hist.max = data["max"]
+        return hist
+
+
+# ================================
+# ARQUIVO latency_histograms.json
+# ================================
+
+def write_histograms(path, histograms, context=None):
+    """histograms: {task: LatencyHistogram}."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "context": context or {},
+                "tasks": {task: hist.to_dict() for task, hist in histograms.items()},
+            },
+            f,
+            indent=1,
+        )
+    return path
+
+
+def load_histograms(path):
+    """Devolve (context, {task: LatencyHistogram})."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("context", {}), {
+        task: LatencyHistogram.from_dict(hist) for task, hist in data["tasks"].items()
+    }
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# materialized_views.py
+# Tabelas de pré-agregação mantidas incrementalmente por triggers
+
+# ================================
+# TABELAS DE RESUMO
+# ================================
+# mv_order_totals     -> T-R1 (receita total / nº de pedidos com total_price > 0)
+# mv_product_revenue  -> T-R3 (receita por produto)
+# mv_customer_orders  -> T-R5 (nº de pedidos por cliente)
+
+SUMMARY_TABLES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS mv_order_totals (
+        id TINYINT PRIMARY KEY,
+        total_revenue DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        num_orders BIGINT NOT NULL DEFAULT 0
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS mv_product_revenue (
+        product_id BIGINT PRIMARY KEY,
+        total_revenue DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        num_lines BIGINT NOT NULL DEFAULT 0,
+        KEY idx_mv_product_revenue_total (total_revenue)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS mv_customer_orders (
+        customer_id BIGINT PRIMARY KEY,
+        total_orders BIGINT NOT NULL DEFAULT 0
+    );
+    """,
+]
+
+# Recarga completa (usada na criação e para ressincronizar)
+FULL_REFRESH_SQL = [
+    "DELETE FROM mv_order_totals;",
+    """
+    INSERT INTO mv_order_totals (id, total_revenue, num_orders)
+    SELECT 1, COALESCE(SUM(total_price), 0), COUNT(*)
+    FROM `Order`
+    WHERE total_price > 0;
+    """,
+    "DELETE FROM mv_product_revenue;",
+    """
+    INSERT INTO mv_product_revenue (product_id, total_revenue, num_lines)
+    SELECT product_id, SUM(price), COUNT(*)
+    FROM Order_line
+    GROUP BY product_id;
+    """,
+    "DELETE FROM mv_customer_orders;",
+    """
+    INSERT INTO mv_customer_orders (customer_id, total_orders)
+    SELECT customer_id, COUNT(*)
+    FROM `Order`
+    GROUP BY customer_id;
+    """,
+]
+
+# ================================
+# TRIGGERS (manutenção incremental)
+# ================================
+
+TRIGGER_NAMES = [
+    "trg_mv_order_ins",
+    "trg_mv_order_del",
+    "trg_mv_order_upd",
+    "trg_mv_order_line_ins",
+    "trg_mv_order_line_del",
+    "trg_mv_order_line_upd",
+]
+
+TRIGGERS_DDL = [
+    """
+    CREATE TRIGGER trg_mv_order_ins AFTER INSERT ON `Order`
+    FOR EACH ROW
+    BEGIN
+        IF NEW.total_price > 0 THEN
+            UPDATE mv_order_totals
+            SET total_revenue = total_revenue + NEW.total_price,
+                num_orders = num_orders + 1
+            WHERE id = 1;
+        END IF;
+        INSERT INTO mv_customer_orders (customer_id, total_orders)
+        VALUES (NEW.customer_id, 1)
+        ON DUPLICATE KEY UPDATE total_orders = total_orders + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_mv_order_del AFTER DELETE ON `Order`
+    FOR EACH ROW
+    BEGIN
+        IF OLD.total_price > 0 THEN
+            UPDATE mv_order_totals
+            SET total_revenue = total_revenue - OLD.total_price,
+                num_orders = num_orders - 1
+            WHERE id = 1;
+        END IF;
+        UPDATE mv_customer_orders
+        SET total_orders = total_orders - 1
+        WHERE customer_id = OLD.customer_id;
+        DELETE FROM mv_customer_orders
+        WHERE customer_id = OLD.customer_id AND total_orders <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_mv_order_upd AFTER UPDATE ON `Order`
+    FOR EACH ROW
+    BEGIN
+        IF OLD.total_price > 0 THEN
+            UPDATE mv_order_totals
+            SET total_revenue = total_revenue - OLD.total_price,
+                num_orders = num_orders - 1
+            WHERE id = 1;
+        END IF;
+        IF NEW.total_price > 0 THEN
+            UPDATE mv_order_totals
+            SET total_revenue = total_revenue + NEW.total_price,
+                num_orders = num_orders + 1
+            WHERE id = 1;
+        END IF;
+        IF NOT (OLD.customer_id <=> NEW.customer_id) THEN
+            UPDATE mv_customer_orders
+            SET total_orders = total_orders - 1
+            WHERE customer_id = OLD.customer_id;
+            DELETE FROM mv_customer_orders
+            WHERE customer_id = OLD.customer_id AND total_orders <= 0;
+            INSERT INTO mv_customer_orders (customer_id, total_orders)
+            VALUES (NEW.customer_id, 1)
+            ON DUPLICATE KEY UPDATE total_orders = total_orders + 1;
+        END IF;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_mv_order_line_ins AFTER INSERT ON Order_line
+    FOR EACH ROW
+    INSERT INTO mv_product_revenue (product_id, total_revenue, num_lines)
+    VALUES (NEW.product_id, NEW.price, 1)
+    ON DUPLICATE KEY UPDATE
+        total_revenue = total_revenue + NEW.price,
+        num_lines = num_lines + 1
+    """,
+    """
+    CREATE TRIGGER trg_mv_order_line_del AFTER DELETE ON Order_line
+    FOR EACH ROW
+    BEGIN
+        UPDATE mv_product_revenue
+        SET total_revenue = total_revenue - OLD.price,
+            num_lines = num_lines - 1
+        WHERE product_id = OLD.product_id;
+        DELETE FROM mv_product_revenue
+        WHERE product_id = OLD.product_id AND num_lines <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_mv_order_line_upd AFTER UPDATE ON Order_line
+    FOR EACH ROW
+    BEGIN
+        UPDATE mv_product_revenue
+        SET total_revenue = total_revenue - OLD.price,
+            num_lines = num_lines - 1
+        WHERE product_id = OLD.product_id;
+        DELETE FROM mv_product_revenue
+        WHERE product_id = OLD.product_id AND num_lines <= 0;
+        INSERT INTO mv_product_revenue (product_id, total_revenue, num_lines)
+        VALUES (NEW.product_id, NEW.price, 1)
+        ON DUPLICATE KEY UPDATE
+            total_revenue = total_revenue + NEW.price,
+            num_lines = num_lines + 1;
+    END
+    """,
+]
+
+
+# ================================
+# SETUP / REFRESH
+# ================================
+
+def setup_materialized_views(conn):
+    """
+    Cria as tabelas de resumo, faz a carga inicial e (re)instala os
+    triggers. Carga e triggers são feitos com as tabelas base travadas,
+    para que nenhuma alteração fique fora do resumo.
+    """
+    with conn.cursor() as cur:
+        for ddl in SUMMARY_TABLES_DDL:
+            cur.execute(ddl)
+        cur.execute("LOCK TABLES `Order` WRITE, Order_line WRITE, "
+                    "mv_order_totals WRITE, mv_product_revenue WRITE, "
+                    "mv_customer_orders WRITE;")
+        try:
+            for name in TRIGGER_NAMES:
+                cur.execute(f"DROP TRIGGER IF EXISTS {name};")
+            for sql in FULL_REFRESH_SQL:
+                cur.execute(sql)
+            conn.commit()
+            for ddl in TRIGGERS_DDL:
+                cur.execute(ddl)
+        finally:
+            cur.execute("UNLOCK TABLES;")
+    conn.commit()
+
+
+def materialized_views_ready(conn) -> bool:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT COUNT(*) FROM information_schema.TRIGGERS "
+            "WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME IN ("
+            + ", ".join(["%s"] * len(TRIGGER_NAMES)) + ");",
+            TRIGGER_NAMES,
+        )
+        (count,) = cur.fetchone()
+    return count == len(TRIGGER_NAMES)
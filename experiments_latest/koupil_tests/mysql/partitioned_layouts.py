@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# partitioned_layouts.py
+# Cópias particionadas de `Order` / Order_line para comparar com o layout base
+
+# ================================
+# LAYOUTS
+# ================================
+# Cada layout vira um database próprio (<database>_<layout>) com as mesmas
+# tabelas e nomes, então as tasks de workload_config.py rodam sem mudança.
+# tabela -> (tipo de particionamento, coluna)
+
+BASELINE_LAYOUT = "baseline"
+
+LAYOUTS = {
+    "range_order": {
+        "Order": ("RANGE", "order_id"),
+        "Order_line": ("RANGE", "order_id"),
+    },
+    "hash_order": {
+        "Order": ("HASH", "order_id"),
+        "Order_line": ("HASH", "order_id"),
+    },
+    "hash_customer": {
+        "Order": ("HASH", "customer_id"),
+        "Order_line": ("HASH", "order_id"),
+    },
+}
+
+DEFAULT_PARTITIONS = 16
+
+# Tabelas copiadas sem particionamento (dimensões pequenas)
+COPIED_TABLES = ["Product", "Customer"]
+
+
+def layout_database_name(dbname: str, layout: str) -> str:
+    if layout == BASELINE_LAYOUT:
+        return dbname
+    return f"{dbname}_{layout}"
+
+
+# ================================
+# DDL
+# ================================
+
+def _unique_keys(cur, dbname, table):
+    """
+    {índice: [(coluna, prefixo)]} da PRIMARY KEY e dos índices UNIQUE, na
+    ordem das colunas. Índices funcionais (sem coluna) não têm como receber a
+    coluna de partição: ValueError.
+    """
+    cur.execute(
+        "SELECT INDEX_NAME, COLUMN_NAME, SUB_PART FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND NON_UNIQUE = 0 "
+        "ORDER BY INDEX_NAME, SEQ_IN_INDEX;",
+        (dbname, table),
+    )
+    keys = {}
+    for index, column, sub_part in cur.fetchall():
+        if column is None:
+            raise ValueError(
+                f"{dbname}.{table}: unique index {index} is functional and cannot "
+                f"include the partitioning column"
+            )
+        keys.setdefault(index, []).append((column, sub_part))
+    return keys
+
+
+def _key_columns(columns):
+    return ", ".join(f"`{c}`({n})" if n else f"`{c}`" for c, n in columns)
+
+
+def _extend_unique_keys(cur, source_db, target_db, table, column):
+    """
+    O MySQL exige a coluna de partição em toda chave única (PRIMARY KEY e
+    UNIQUE): ela entra no fim das que ainda não a têm.
+    """
+    changes = []
+    for index, columns in _unique_keys(cur, source_db, table).items():
+        if column in [c for c, _ in columns]:
+            continue
+        cols = _key_columns(columns + [(column, None)])
+        if index == "PRIMARY":
+            changes.append(f"DROP PRIMARY KEY, ADD PRIMARY KEY ({cols})")
+        else:
+            changes.append(f"DROP INDEX `{index}`, ADD UNIQUE INDEX `{index}` ({cols})")
+    if changes:
+        cur.execute(f"ALTER TABLE `{target_db}`.`{table}` {', '.join(changes)};")
+
+
+def _range_bounds(cur, dbname, table, column, partitions):
+    cur.execute(f"SELECT MIN(`{column}`), MAX(`{column}`) FROM `{dbname}`.`{table}`;")
+    lo, hi = cur.fetchone()
+    if lo is None:
+        return []
+    step = max(1, (int(hi) - int(lo) + 1) // partitions)
+    return [int(lo) + step * i for i in range(1, partitions)]
+
+
+def _partition_clause(cur, dbname, table, kind, column, partitions):
+    if kind == "HASH":
+        return f"PARTITION BY HASH(`{column}`) PARTITIONS {partitions}"
+
+    bounds = _range_bounds(cur, dbname, table, column, partitions)
+    parts = [f"PARTITION p{i} VALUES LESS THAN ({b})" for i, b in enumerate(bounds)]
+    parts.append(f"PARTITION p{len(bounds)} VALUES LESS THAN MAXVALUE")
+    return f"PARTITION BY RANGE(`{column}`) (" + ", ".join(parts) + ")"
+
+
+def _table_exists(cur, dbname, table):
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s;",
+        (dbname, table),
+    )
+    return cur.fetchone()[0] > 0
+
+
+def provision_layout(conn, source_db, layout, partitions=DEFAULT_PARTITIONS, log=print):
+    """
+    Cria <source_db>_<layout> copiando as tabelas do database base e
+    particionando `Order` / Order_line conforme LAYOUTS[layout].
+    CREATE TABLE ... LIKE não copia foreign keys (que o MySQL não aceita
+    em tabelas particionadas); a coluna de partição entra na PK e nos
+    índices UNIQUE que ainda não a têm.
+    """
+    target_db = layout_database_name(source_db, layout)
+    spec = LAYOUTS[layout]
+
+    with conn.cursor() as cur:
+        # índices que não aceitam a coluna de partição: falha antes de apagar nada
+        for table in spec:
+            _unique_keys(cur, source_db, table)
+
+        cur.execute(f"DROP DATABASE IF EXISTS `{target_db}`;")
+        cur.execute(f"CREATE DATABASE `{target_db}`;")
+
+        for table in COPIED_TABLES:
+            if not _table_exists(cur, source_db, table):
+                continue
+            cur.execute(f"CREATE TABLE `{target_db}`.`{table}` LIKE `{source_db}`.`{table}`;")
+            cur.execute(f"INSERT INTO `{target_db}`.`{table}` SELECT * FROM `{source_db}`.`{table}`;")
+            conn.commit()
+
+        for table, (kind, column) in spec.items():
+            log(f"Provisioning {target_db}.{table} ({kind} on {column}, {partitions} partitions)")
+            cur.execute(f"CREATE TABLE `{target_db}`.`{table}` LIKE `{source_db}`.`{table}`;")
+            _extend_unique_keys(cur, source_db, target_db, table, column)
+
+            clause = _partition_clause(cur, source_db, table, kind, column, partitions)
+            cur.execute(f"ALTER TABLE `{target_db}`.`{table}` {clause};")
+            cur.execute(f"INSERT INTO `{target_db}`.`{table}` SELECT * FROM `{source_db}`.`{table}`;")
+            conn.commit()
+
+            cur.execute(f"ANALYZE TABLE `{target_db}`.`{table}`;")
+            cur.fetchall()
+
+    return target_db
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# read_replicas.py
+# Réplicas de leitura locais do MySQL e distribuição dos runs entre elas
+#
+# As réplicas são servidores MySQL que partem de uma cópia do primário
+# (ex.: restore de um dump com GTIDs) e seguem o primário por replicação com
+# GTID auto-position. Os layouts e as tabelas de pré-agregação criados no
+# primário chegam às réplicas pela própria replicação.
+#
+# Uso:
+#   python read_replicas.py attach      # CHANGE REPLICATION SOURCE + START REPLICA em cada réplica
+#   python read_replicas.py status      # threads de replicação e atraso de cada réplica
+#   python run_workload_mysql_sf.py --sf 10 --replicas 2 --clients 8
+#
+# Endpoints: MYSQL_REPLICAS="host:porta,host:porta" (padrão: 127.0.0.1:3317..3319)
+
+import os
+import argparse
+import threading
+
+import pymysql
+
+# ================================
+# CONFIGURAÇÃO
+# ================================
+
+DEFAULT_REPLICAS = "127.0.0.1:3317,127.0.0.1:3318,127.0.0.1:3319"
+
+# Primário como as réplicas o enxergam (em docker, o nome do container)
+SOURCE_HOST = os.environ.get("MYSQL_SOURCE_HOST", "127.0.0.1")
+SOURCE_PORT = int(os.environ.get("MYSQL_SOURCE_PORT", "3307"))
+
+CREDENTIALS = {"user": "root", "password": "root"}
+
+# Réplica com atraso maior que isto não entra no roteamento
+MAX_LAG_S = 5
+
+
+def replica_endpoints():
+    """[(host, port)] na ordem de MYSQL_REPLICAS; --replicas K usa as K primeiras."""
+    endpoints = []
+    for item in os.environ.get("MYSQL_REPLICAS", DEFAULT_REPLICAS).split(","):
+        host, port = item.strip().rsplit(":", 1)
+        endpoints.append((host, int(port)))
+    return endpoints
+
+
+# ================================
+# ESTADO DA REPLICAÇÃO
+# ================================
+
+def _first(row, *names):
+    # nomes novos (8.0.22+, Replica_/Source_) ou antigos (Slave_/Master_)
+    for name in names:
+        if name in row:
+            return row[name]
+    return None
+
+
+def replica_status(db_config):
+    """{"io_running", "sql_running", "lag_s", "error"} ou None se não for réplica."""
+    conn = pymysql.connect(**{**db_config, "cursorclass": pymysql.cursors.DictCursor})
+    try:
+        with conn.cursor() as cur:
+            try:
+                cur.execute("SHOW REPLICA STATUS;")
+            except pymysql.err.ProgrammingError:
+                cur.execute("SHOW SLAVE STATUS;")
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    return {
+        "io_running": _first(row, "Replica_IO_Running", "Slave_IO_Running") == "Yes",
+        "sql_running": _first(row, "Replica_SQL_Running", "Slave_SQL_Running") == "Yes",
+        "lag_s": _first(row, "Seconds_Behind_Source", "Seconds_Behind_Master"),
+        "error": _first(row, "Last_Error") or None,
+    }
+
+
+def check_replica(db_config, max_lag_s=MAX_LAG_S):
+    """Motivo para não usar a réplica, ou None se ela está apta."""
+    status = replica_status(db_config)
+    if status is None:
+        return "not configured as a replica"
+    if not (status["io_running"] and status["sql_running"]):
+        return f"replication stopped ({status['error'] or 'no error reported'})"
+    if status["lag_s"] is None or status["lag_s"] > max_lag_s:
+        return f"lag {status['lag_s']} s > {max_lag_s} s"
+    return None
+
+
+# ================================
+# ROTEAMENTO
+# ================================
+
+class ReplicaRouter:
+    """
+    Round robin dos runs entre as `count` primeiras réplicas de
+    replica_endpoints(). Todas são checadas na criação: uma réplica parada ou
+    atrasada invalida a medição, então levanta ValueError em vez de seguir
+    com menos réplicas.
+    """
+
+    def __init__(self, db_config, count, max_lag_s=MAX_LAG_S):
+        endpoints = replica_endpoints()
+        if count > len(endpoints):
+            raise ValueError(
+                f"{count} replicas requested but only {len(endpoints)} configured in MYSQL_REPLICAS"
+            )
+        self.configs = [
+            {**db_config, "host": host, "port": port} for host, port in endpoints[:count]
+        ]
+        for config in self.configs:
+            problem = check_replica(config, max_lag_s)
+            if problem:
+                raise ValueError(f"Replica {config['host']}:{config['port']}: {problem}")
+        self._next = 0
+        # clientes concorrentes (threads) pedem réplica ao mesmo tempo
+        self._lock = threading.Lock()
+
+    def next_config(self):
+        with self._lock:
+            config = self.configs[self._next % len(self.configs)]
+            self._next += 1
+        return config
+
+
+def server_name(db_config):
+    return f"{db_config['host']}:{db_config['port']}"
+
+
+# ================================
+# SETUP
+# ================================
+
+def attach_replica(db_config):
+    conn = pymysql.connect(**db_config)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("STOP REPLICA;")
+            cur.execute(
+                "CHANGE REPLICATION SOURCE TO SOURCE_HOST = %s, SOURCE_PORT = %s, "
+                "SOURCE_USER = %s, SOURCE_PASSWORD = %s, SOURCE_AUTO_POSITION = 1, "
+                "GET_SOURCE_PUBLIC_KEY = 1;",
+                (SOURCE_HOST, SOURCE_PORT, CREDENTIALS["user"], CREDENTIALS["password"]),
+            )
+            cur.execute("SET GLOBAL super_read_only = ON;")
+            cur.execute("START REPLICA;")
+    finally:
+        conn.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local MySQL read replicas")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("attach", help="Point every replica at the source and start replication")
+    sub.add_parser("status", help="Show replication threads and lag of every replica")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    for host, port in replica_endpoints():
+        config = {"host": host, "port": port, **CREDENTIALS}
+        if args.command == "attach":
+            attach_replica(config)
+            print(f"{host}:{port}: replicating from {SOURCE_HOST}:{SOURCE_PORT}")
+        else:
+            status = replica_status(config)
+            problem = check_replica(config)
+            print(f"{host}:{port}: {status} -> {problem or 'ok'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# result_sample.py
+# Amostra de tamanho fixo de um resultado grande, montada enquanto o
+# resultado é lido
+#
+# O resultado inteiro passa pelo consumidor (tempo e contagem de linhas são
+# os da leitura completa), mas só ficam em memória as `head` primeiras, as
+# `tail` últimas e uma amostra aleatória uniforme de `size` linhas
+# (reservoir sampling, algoritmo L de Li: o custo por lote é proporcional ao
+# número de substituições, não ao número de linhas).
+#
+# Só com --sample no runner (a leitura passa a ser em lotes sem buffer).
+# Configuração por task: Task.sample = {"size": 1000, "head": 20, "tail": 20}
+# (chaves omitidas usam os padrões abaixo; "seed" fixa o sorteio).
+
+import math
+import time
+import random
+from collections import deque
+from itertools import islice
+
+DEFAULT_SAMPLE_SIZE = 1_000
+DEFAULT_HEAD = 20
+DEFAULT_TAIL = 20
+
+# Lote usado ao consumir cursores que entregam uma linha por vez
+BATCH_ROWS = 10_000
+
+# Colunas acrescentadas ao <task>_result.csv amostrado
+POSITION_COLUMN = "_row"
+PART_COLUMN = "_part"
+
+
+class ReservoirSample:
+
+    def __init__(self, size=DEFAULT_SAMPLE_SIZE, head=DEFAULT_HEAD, tail=DEFAULT_TAIL, seed=None):
+        if size < 1:
+            raise ValueError("sample size must be at least 1")
+        self.size = size
+        self.head_size = head
+        self.count = 0
+        self._rng = random.Random(seed)
+        self._head = []
+        self._tail = deque(maxlen=tail) if tail else None
+        # [(posição, linha)]
+        self._reservoir = []
+        self._w = None
+        self._next = None
+
+    def _uniform(self):
+        # (0, 1): log(0) não existe
+        while True:
+            u = self._rng.random()
+            if u > 0.0:
+                return u
+
+    def _advance(self):
+        self._w *= math.exp(math.log(self._uniform()) / self.size)
+        self._next += int(math.log(self._uniform()) / math.log1p(-self._w)) + 1
+
+    def extend(self, rows):
+        """Consome um lote (lista) de linhas."""
+        n = len(rows)
+        if not n:
+            return
+        start = self.count
+
+        if len(self._head) < self.head_size:
+            self._head.extend(rows[: self.head_size - len(self._head)])
+        if self._tail is not None:
+            keep = min(n, self._tail.maxlen)
+            self._tail.extend(zip(range(start + n - keep, start + n), rows[n - keep:]))
+
+        offset = 0
+        if len(self._reservoir) < self.size:
+            offset = min(self.size - len(self._reservoir), n)
+            self._reservoir.extend(zip(range(start, start + offset), rows[:offset]))
+            if len(self._reservoir) == self.size:
+                # o 1º salto parte de w = 1: _advance() sorteia o w inicial
+                self._w = 1.0
+                self._next = start + offset - 1
+                self._advance()
+
+        if self._next is not None:
+            end = start + n
+            while self._next < end:
+                self._reservoir[self._rng.randrange(self.size)] = (self._next, rows[self._next - start])
+                self._advance()
+
+        self.count += n
+
+    def rows(self):
+        """[(posição, parte, linha)] em ordem de posição, sem repetir linhas."""
+        parts = {}
+        for position, row in self._reservoir:
+            parts[position] = ("sample", row)
+        if self._tail is not None:
+            for position, row in self._tail:
+                parts[position] = ("tail", row)
+        for position, row in enumerate(self._head):
+            parts[position] = ("head", row)
+        return [(position, part, row) for position, (part, row) in sorted(parts.items())]
+
+    def __len__(self):
+        return len(self.rows())
+
+
+# ================================
+# CONSUMO
+# ================================
+
+def batched(rows, size=BATCH_ROWS):
+    """Lotes (listas) de um iterável de linhas, ex.: um cursor do pymongo."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def consume(batches, sample, digest=None):
+    """
+    Lê todos os lotes guardando só a amostra (`sample` = Task.sample). Com
+    `digest` (ResultDigest) o hash do resultado é calculado junto; devolve
+    (amostra, segundos gastos no digest) para o runner descontar esse tempo.
+    """
+    reservoir = ReservoirSample(**sample)
+    digest_s = 0.0
+    for batch in batches:
+        reservoir.extend(batch)
+        if digest is not None:
+            start = time.perf_counter()
+            digest.update(batch)
+            digest_s += time.perf_counter() - start
+    return reservoir, digest_s
+
+
+def sample_frame(reservoir, columns=None):
+    """DataFrame da amostra, com a posição da linha no resultado e a parte."""
+    import pandas as pd
+
+    entries = reservoir.rows()
+    df = pd.DataFrame([row for _, _, row in entries], columns=columns)
+    df.insert(0, PART_COLUMN, [part for _, part, _ in entries])
+    df.insert(0, POSITION_COLUMN, [position for position, _, _ in entries])
+    return df
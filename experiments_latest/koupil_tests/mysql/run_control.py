@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# run_control.py
+# Timeout por statement, retries com backoff (com classificação de erros)
+# e execução dos runs por clientes concorrentes
+
+import time
+import queue
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+try:
+    import pymysql
+except ImportError:
+    # runners de outras engines usam só os retries / clientes concorrentes daqui
+    pymysql = None
+
+# ================================
+# PADRÕES
+# ================================
+
+# Margem do timeout de leitura do cliente sobre o MAX_EXECUTION_TIME do servidor
+CLIENT_TIMEOUT_GRACE_S = 30
+
+# ================================
+# CLASSIFICAÇÃO DE ERROS
+# ================================
+
+TIMEOUT = "timeout"        # MAX_EXECUTION_TIME / timeout do cliente
+TRANSIENT = "transient"    # conexão perdida, deadlock, lock wait...
+QUERY = "query"            # SQL inválido, tabela/coluna inexistente
+OTHER = "other"
+
+# Só estes são repetidos: repetir um timeout só dobraria o tempo perdido
+RETRYABLE = {TRANSIENT}
+
+# 3024 ER_QUERY_TIMEOUT (5.7.8+), 1907 (5.7.4–5.7.7, max_statement_time)
+TIMEOUT_CODES = {3024, 1907}
+# 1040 too many connections, 1205 lock wait, 1213 deadlock,
+# 2003 can't connect, 2006 gone away, 2013 lost connection, 2055 lost (SSL)
+TRANSIENT_CODES = {1040, 1205, 1213, 2003, 2006, 2013, 2055}
+
+
+def classify_error(exc):
+    if isinstance(exc, multiprocessing.TimeoutError):
+        return TIMEOUT
+    if pymysql is not None and isinstance(exc, pymysql.err.MySQLError):
+        code = exc.args[0] if exc.args and isinstance(exc.args[0], int) else None
+        if code in TIMEOUT_CODES:
+            return TIMEOUT
+        # read_timeout do cliente estourado: 2013 "... (timed out)"
+        if code == 2013 and "timed out" in str(exc):
+            return TIMEOUT
+        if code in TRANSIENT_CODES or isinstance(exc, pymysql.err.InterfaceError):
+            return TRANSIENT
+        if isinstance(exc, (pymysql.err.ProgrammingError, pymysql.err.DataError)):
+            return QUERY
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return TRANSIENT
+    return OTHER
+
+
+# ================================
+# TIMEOUTS
+# ================================
+
+def client_timeout_s(timeout_ms):
+    """Timeout de leitura do cliente (None = sem limite)."""
+    if not timeout_ms:
+        return None
+    return timeout_ms / 1000 + CLIENT_TIMEOUT_GRACE_S
+
+
+def set_statement_timeout(cur, timeout_ms):
+    # 0 desliga o limite; vale para os SELECTs seguintes da sessão
+    cur.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(timeout_ms or 0),))
+
+
+# ================================
+# RETRIES
+# ================================
+
+@dataclass
+class RunOutcome:
+    result: object = None
+    attempts: int = 0
+    error_class: str = None
+    error: Exception = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def run_with_retries(fn, retries, backoff_s, log=print, classify=classify_error):
+    """
+    Executa fn() até 1 + retries vezes. Só erros de RETRYABLE são repetidos,
+    com espera de backoff_s, 2*backoff_s, 4*backoff_s... `classify` troca a
+    classificação de erros (backends que não são MySQL).
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return RunOutcome(result=fn(), attempts=attempt)
+        except Exception as e:
+            error_class = classify(e)
+            if error_class not in RETRYABLE or attempt > retries:
+                return RunOutcome(attempts=attempt, error_class=error_class, error=e)
+            delay = backoff_s * 2 ** (attempt - 1)
+            log(f"{error_class} error ({e}); retry {attempt}/{retries} in {delay:.1f} s")
+            time.sleep(delay)
+
+
+def run_record(run, outcome, time_ms=None, rows=None, client=0, wire_bytes=None,
+               server=None, result_digest=None):
+    """Evento de um run para o run_log (ok ou falho)."""
+    return {
+        "run": run,
+        "client": client,
+        "server": server,
+        "time_ms": time_ms,
+        "rows": rows,
+        "wire_bytes": wire_bytes,
+        "result_digest": result_digest,
+        "status": "ok" if outcome.ok else "failed",
+        "attempts": outcome.attempts,
+        "error_class": outcome.error_class,
+        "error": None if outcome.ok else str(outcome.error)[:500],
+    }
+
+
+# ================================
+# CLIENTES CONCORRENTES
+# ================================
+
+def run_concurrently(runs, clients, execute):
+    """
+    Executa execute(run, client) para cada número em `runs` com `clients`
+    clientes em loop fechado: cada cliente (thread, com suas próprias conexões)
+    pega o próximo run assim que termina o anterior. Devolve o tempo de
+    parede em ms.
+    """
+    pending = queue.SimpleQueue()
+    for run in runs:
+        pending.put(run)
+
+    def client_loop(client):
+        while True:
+            try:
+                run = pending.get_nowait()
+            except queue.Empty:
+                return
+            execute(run, client)
+
+    start = time.perf_counter()
+    if clients <= 1:
+        client_loop(0)
+    else:
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            for future in [pool.submit(client_loop, c) for c in range(clients)]:
+                future.result()
+    return (time.perf_counter() - start) * 1000
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# run_log.py
+# Log de eventos append-only dos runs (JSON lines); os <task>_runs.csv e o
+# resumo são derivados dele
+#
+# Eventos (um por linha):
+#   {"event": "start", "context": {...}}              1ª linha, identifica a execução
+#   {"event": "task", "task": ..., "fields": {...}}   colunas fixas da task no resumo
+#   {"event": "run", "task": ..., "run": n, ...}      um por run concluído (ok ou falho);
+#                                                     um run falho refeito com --resume
+#                                                     ganha outro evento, que vale no lugar
+#   {"event": "segment", "task": ..., "clients": n,   trecho de runs executado por n
+#    "runs": ok, "wall_ms": t}                         clientes concorrentes (vazão)
+
+import os
+import csv
+import json
+import math
+import time
+import threading
+from datetime import datetime
+
+from latency_histogram import LatencyHistogram, HISTOGRAM_FILE, write_histograms
+
+RUN_LOG_FILE = "run_log.jsonl"
+
+# fsync em lotes: a cada N eventos ou T segundos (e sempre no close)
+FSYNC_EVERY = 16
+FSYNC_INTERVAL_S = 5.0
+
+RUN_COLUMNS = [
+    "run", "client", "server", "time_ms", "rows", "wire_bytes", "result_digest",
+    "status", "attempts", "error_class", "error",
+]
+
+
+# ================================
+# LEITURA
+# ================================
+
+def read_events(path):
+    """
+    Itera os eventos do log sem carregá-lo inteiro. Uma última linha cortada
+    (interrupção no meio da escrita) é ignorada.
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            yield json.loads(line)
+
+
+def _valid_length(path):
+    """Tamanho do log até a última linha completa."""
+    valid = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid += len(line)
+    return valid
+
+
+# ================================
+# ESCRITA
+# ================================
+
+class RunLog:
+    """
+    run_log.jsonl no diretório de saída. Cada evento é escrito e flushado assim
+    que o run termina (sobrevive a um crash do processo); o fsync é feito em
+    lotes (sobrevive a uma queda da máquina, perdendo no máximo o último lote).
+
+    Com resume=True o log existente é mantido e completed() diz quais runs já
+    terminaram ok, para a execução continuar nos que faltam: runs falhos
+    (timeout, erro transitório) são executados de novo.
+    """
+
+    def __init__(self, output_dir, context, resume=False,
+                 fsync_every=FSYNC_EVERY, fsync_interval_s=FSYNC_INTERVAL_S):
+        self.path = os.path.join(output_dir, RUN_LOG_FILE)
+        self.context = context
+        self.fsync_every = fsync_every
+        self.fsync_interval_s = fsync_interval_s
+        self._done = {}
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        # runs de clientes concorrentes (threads) escrevem no mesmo log
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(self.path) and _valid_length(self.path) > 0:
+            self._load()
+            self._fh = open(self.path, "a", encoding="utf-8")
+        else:
+            self._fh = open(self.path, "w", encoding="utf-8")
+            self._write({"event": "start", "context": context}, sync=True)
+
+    def _load(self):
+        for entry in read_events(self.path):
+            if entry["event"] == "start":
+                if entry["context"] != self.context:
+                    raise ValueError(
+                        f"Run log {self.path} belongs to another execution "
+                        f"({entry['context']}); run without --resume to start over"
+                    )
+            elif entry["event"] == "run" and entry.get("status", "ok") == "ok":
+                self._done.setdefault(entry["task"], set()).add(entry["run"])
+        # descarta a linha cortada, para os appends seguintes ficarem válidos
+        os.truncate(self.path, _valid_length(self.path))
+
+    def _write(self, entry, sync=False):
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+            self._pending += 1
+            if (sync or self._pending >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval_s):
+                self._sync()
+
+    def _sync(self):
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def completed(self, task):
+        """Números dos runs de `task` já registrados com sucesso."""
+        return self._done.get(task, set())
+
+    def task(self, task, fields):
+        self._write({"event": "task", "task": task, "fields": fields})
+
+    def run(self, task, record):
+        self._write({
+            "event": "run",
+            "task": task,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            **record,
+        })
+        if record.get("status", "ok") == "ok":
+            with self._lock:
+                self._done.setdefault(task, set()).add(record["run"])
+
+    def segment(self, task, clients, ok_runs, wall_ms):
+        self._write({
+            "event": "segment",
+            "task": task,
+            "clients": clients,
+            "runs": ok_runs,
+            "wall_ms": wall_ms,
+        })
+
+    def close(self):
+        self.sync()
+        self._fh.close()
+
+
+# ================================
+# DERIVAÇÃO (<task>_runs.csv + resumo)
+# ================================
+
+class RunStats:
+    """
+    Agregado em memória constante dos runs de uma task: média/desvio por
+    Welford e percentis pelo histograma de latência.
+    """
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.valid = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last_rows = None
+        self.last_digest = None
+        self.failed = 0
+        self.retries = 0
+        self.errors = {}
+        self.segment_runs = 0
+        self.segment_wall_ms = 0.0
+        self.wire_runs = 0
+        self.wire_bytes = 0
+
+    def add_segment(self, event):
+        self.segment_runs += event["runs"]
+        self.segment_wall_ms += event["wall_ms"]
+
+    def add_superseded(self, event):
+        # run falho refeito depois com --resume: todas as tentativas viram retries
+        self.retries += event.get("attempts", 1)
+
+    def add(self, event):
+        self.retries += event.get("attempts", 1) - 1
+        if event["status"] != "ok":
+            self.failed += 1
+            cls = event.get("error_class")
+            self.errors[cls] = self.errors.get(cls, 0) + 1
+            return
+        t = event["time_ms"]
+        self.histogram.record(t)
+        self.valid += 1
+        delta = t - self.mean
+        self.mean += delta / self.valid
+        self.m2 += delta * (t - self.mean)
+        self.min = min(self.min, t)
+        self.max = max(self.max, t)
+        self.last_rows = event.get("rows")
+        self.last_digest = event.get("result_digest") or self.last_digest
+        if event.get("wire_bytes") is not None:
+            self.wire_runs += 1
+            self.wire_bytes += event["wire_bytes"]
+
+    def summary(self, rows_column):
+        nan = float("nan")
+        has_runs = self.valid > 0
+        return {
+            "runs_valid": self.valid,
+            "runs_failed": self.failed,
+            "retries": self.retries,
+            "errors": ";".join(f"{cls}:{n}" for cls, n in sorted(self.errors.items())) or None,
+            rows_column: self.last_rows,
+            "result_digest": self.last_digest,
+            "avg_time_ms": round(self.mean, 2) if has_runs else nan,
+            "min_time_ms": round(self.min, 2) if has_runs else nan,
+            "max_time_ms": round(self.max, 2) if has_runs else nan,
+            # desvio populacional (ddof=0), como antes
+            "std_time_ms": round(math.sqrt(self.m2 / self.valid), 2) if has_runs else nan,
+            **{
+                name: nan if value is None else value
+                for name, value in self.histogram.percentiles().items()
+            },
+            # bytes servidor -> cliente por run (runs que mediram)
+            "avg_wire_bytes": round(self.wire_bytes / self.wire_runs) if self.wire_runs else nan,
+            # runs ok por segundo de parede, somando os segmentos (todos os clientes)
+            "throughput_qps": (
+                round(self.segment_runs / (self.segment_wall_ms / 1000), 3)
+                if self.segment_wall_ms > 0 else nan
+            ),
+        }
+
+
+def derive_outputs(log_path, output_dir, rows_column="result_rows"):
+    """
+    Reescreve os <task>_runs.csv e o latency_histograms.json a partir do log e
+    devolve as linhas do resumo (uma por task, na ordem em que aparecem no
+    log): as colunas do evento "task" mais as estatísticas dos runs. Vale o
+    último evento de cada run (um run falho pode ter sido refeito).
+    """
+    last_event = {}
+    for index, event in enumerate(read_events(log_path)):
+        if event["event"] == "run":
+            last_event[(event["task"], event["run"])] = index
+
+    context = {}
+    fields = {}
+    stats = {}
+    files = {}
+    writers = {}
+    try:
+        for index, event in enumerate(read_events(log_path)):
+            if event["event"] == "start":
+                context = event["context"]
+            elif event["event"] == "task":
+                fields[event["task"]] = event["fields"]
+                stats.setdefault(event["task"], RunStats())
+            elif event["event"] == "run":
+                task = event["task"]
+                if last_event[(task, event["run"])] != index:
+                    stats.setdefault(task, RunStats()).add_superseded(event)
+                    continue
+                if task not in writers:
+                    files[task] = open(
+                        os.path.join(output_dir, f"{task}_runs.csv"),
+                        "w", newline="", encoding="utf-8",
+                    )
+                    writers[task] = csv.DictWriter(
+                        files[task], fieldnames=RUN_COLUMNS, extrasaction="ignore"
+                    )
+                    writers[task].writeheader()
+                writers[task].writerow(event)
+                stats.setdefault(task, RunStats()).add(event)
+            elif event["event"] == "segment":
+                stats.setdefault(event["task"], RunStats()).add_segment(event)
+    finally:
+        for f in files.values():
+            f.close()
+
+    write_histograms(
+        os.path.join(output_dir, HISTOGRAM_FILE),
+        {task: task_stats.histogram for task, task_stats in stats.items()},
+        context,
+    )
+
+    return [
+        {**fields.get(task, {"task": task}), **task_stats.summary(rows_column)}
+        for task, task_stats in stats.items()
+    ]
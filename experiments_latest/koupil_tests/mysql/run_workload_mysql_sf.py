@@ -1,161 +1,536 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-
-import os
-import time
-import argparse
-from datetime import datetime
-import pandas as pd
-import pymysql
-
-from workload_config import (
-    TASK_DEFINITIONS,
-    TASK_RUNS,
-    DEFAULT_RUNS_PER_TASK,
-    resolve_database_name
-)
-
-# ============================================================
-# Argumentos
-# ============================================================
-
-def parse_args():
-    parser = argparse.ArgumentParser(description="Run MySQL workload for a given SF")
-    parser.add_argument("--sf", type=int, required=True, help="Scale Factor (ex: 1, 10, 30, 100)")
-    return parser.parse_args()
-
-
-# ============================================================
-# Logging
-# ============================================================
-
-def log_title(msg):
-    print("\n" + "=" * 70)
-    print(msg)
-    print("=" * 70)
-
-
-def log(msg):
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
-
-
-# ============================================================
-# Execução (1 run)
-# ============================================================
-
-def run_query_once(db_config, task_name, sql, run_number):
-    conn = pymysql.connect(**db_config)
-    try:
-        with conn.cursor() as cur:
-            start = time.perf_counter()
-            cur.execute(sql)
-            rows = cur.fetchall()
-            elapsed_ms = (time.perf_counter() - start) * 1000
-
-            df = pd.DataFrame(rows, columns=[d[0] for d in cur.description])
-            log(f"Task {task_name} | run {run_number} | {len(rows)} rows | {elapsed_ms:.2f} ms")
-            return df, len(rows), elapsed_ms
-    finally:
-        conn.close()
-
-
-# ============================================================
-# Main
-# ============================================================
-
-def main():
-    args = parse_args()
-    sf = args.sf
-
-    dbname = resolve_database_name(sf)
-
-    DB_CONFIG = {
-        "host": "127.0.0.1",
-        "port": 3307,
-        "user": "root",
-        "password": "root",
-        "database": dbname,
-        "cursorclass": pymysql.cursors.Cursor,
-    }
-
-    # Padronizado igual Mongo: outputs/sf<SF>/
-    output_dir = os.path.join("outputs", f"sf{sf}")
-    os.makedirs(output_dir, exist_ok=True)
-
-    log_title(f"MySQL Workload – SF{sf}")
-    log(f"Database: {dbname}")
-    log(f"Output directory: {output_dir}")
-
-    summary_rows = []
-
-    for task_name, sql in TASK_DEFINITIONS:
-        runs = TASK_RUNS.get(task_name, DEFAULT_RUNS_PER_TASK)
-
-        log_title(f"Running task: {task_name}")
-        log(f"Configured runs: {runs}")
-
-        run_times = []
-        run_rows = []
-        last_df = None
-
-        for run in range(1, runs + 1):
-            try:
-                df, rows, elapsed_ms = run_query_once(DB_CONFIG, task_name, sql, run)
-                run_times.append(elapsed_ms)
-                run_rows.append(rows)
-                last_df = df
-            except Exception as e:
-                log(f"ERROR running {task_name} (run {run}): {e}")
-
-        if not run_times:
-            continue
-
-        avg_time = sum(run_times) / len(run_times)
-        min_time = min(run_times)
-        max_time = max(run_times)
-        std_time = pd.Series(run_times).std(ddof=0) if len(run_times) > 1 else 0.0
-
-        summary_rows.append({
-            "task": task_name,
-            "sf": sf,
-            "engine": "mysql",
-            "database": dbname,
-            "collection_or_table": "N/A",
-            "runs_configured": runs,
-            "runs_valid": len(run_times),
-            "result_rows": run_rows[-1],
-            "avg_time_ms": round(avg_time, 2),
-            "min_time_ms": round(min_time, 2),
-            "max_time_ms": round(max_time, 2),
-            "std_time_ms": round(std_time, 2),
-        })
-
-        # Resultado da última execução
-        if last_df is not None and not last_df.empty:
-            result_csv = os.path.join(output_dir, f"{task_name}_result.csv")
-            last_df.to_csv(result_csv, index=False)
-
-        # Tempos por run
-        runs_df = pd.DataFrame({
-            "run": list(range(1, len(run_times) + 1)),
-            "time_ms": run_times,
-            "rows": run_rows,
-        })
-
-        runs_csv = os.path.join(output_dir, f"{task_name}_runs.csv")
-        runs_df.to_csv(runs_csv, index=False)
-
-    # ========================================================
-    # Resumo geral (mesmo nome do Mongo)
-    # ========================================================
-
-    summary_df = pd.DataFrame(summary_rows)
-    summary_csv = os.path.join(output_dir, "workload_summary.csv")
-    summary_df.to_csv(summary_csv, index=False)
-
-    log_title("MySQL workload finished")
-    log(f"Summary saved to: {summary_csv}")
-
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import argparse
+from dataclasses import replace
+from datetime import datetime
+import pandas as pd
+import pymysql
+
+from workload_config import (
+    REGISTRY,
+    DEFAULT_RUNS_PER_TASK,
+    DEFAULT_SPLIT_WORKERS,
+    DEFAULT_TIMEOUT_MS,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF_S,
+    resolve_database_name
+)
+from task_registry import Task, ResultDigest, result_digest
+from result_sample import DEFAULT_SAMPLE_SIZE, consume, sample_frame
+from materialized_views import setup_materialized_views, materialized_views_ready
+from partitioned_layouts import (
+    BASELINE_LAYOUT,
+    LAYOUTS,
+    DEFAULT_PARTITIONS,
+    layout_database_name,
+    provision_layout,
+)
+from read_replicas import ReplicaRouter, server_name
+from split_scan import SplitScanner, key_range, chunk_bounds
+from environment_fingerprint import collect_fingerprint, write_fingerprint
+from wire_protocol import (
+    DEFAULT_PROTOCOL,
+    PROTOCOLS,
+    BytesSentCounter,
+    cursor_class,
+    fetch_all,
+    iter_batches,
+    streaming,
+)
+from run_control import (
+    client_timeout_s,
+    set_statement_timeout,
+    run_with_retries,
+    run_record,
+    run_concurrently,
+)
+from run_log import RunLog, derive_outputs
+from workload_trace import TRACE_FILE, TraceRecorder
+
+# ============================================================
+# Argumentos
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run MySQL workload for a given SF")
+    parser.add_argument("--sf", type=int, help="Scale Factor (ex: 1, 10, 30, 100)")
+    parser.add_argument("--only", nargs="+", metavar="TASK",
+                        help="Executa só estas tasks (nomes do registro)")
+    parser.add_argument("--tag", nargs="+", metavar="TAG",
+                        help="Executa só as tasks com alguma destas tags")
+    parser.add_argument("--runs", type=int,
+                        help="Sobrescreve o número de runs de todas as tasks selecionadas")
+    parser.add_argument("--list", action="store_true",
+                        help="Lista as tasks registradas e sai")
+    parser.add_argument("--materialized", action="store_true",
+                        help="Também executa as tasks que leem das tabelas de pré-agregação")
+    parser.add_argument("--refresh-materialized", action="store_true",
+                        help="Recria as tabelas de pré-agregação e os triggers antes de executar")
+    parser.add_argument("--layout", default=BASELINE_LAYOUT,
+                        choices=[BASELINE_LAYOUT] + list(LAYOUTS),
+                        help="Layout físico das tabelas (baseline = sem particionamento)")
+    parser.add_argument("--provision-layout", action="store_true",
+                        help="(Re)cria o database particionado a partir do database base")
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS,
+                        help="Número de partições usado em --provision-layout")
+    parser.add_argument("--split-scan", type=int, nargs="?", default=0,
+                        const=DEFAULT_SPLIT_WORKERS, metavar="N",
+                        help="Também executa as tasks com `split` divididas em N processos")
+    parser.add_argument("--rewrites", action="store_true",
+                        help="Também executa as reescritas registradas das tasks "
+                             "(<task>_<reescrita>), compara os resultados e ranqueia por latência")
+    parser.add_argument("--replicas", type=int, default=0, metavar="K",
+                        help="Lê das K primeiras réplicas (ver read_replicas.py), em round robin; "
+                             "0 = primário")
+    parser.add_argument("--protocol", nargs="+", default=[], choices=list(PROTOCOLS),
+                        metavar="PROFILE",
+                        help="Também executa as tasks com estes perfis de protocolo "
+                             f"(variantes <task>_<perfil>; {', '.join(PROTOCOLS)})")
+    parser.add_argument("--sample", type=int, nargs="?", const=0, metavar="N",
+                        help="Lê o resultado em lotes sem buffer (SSCursor) e guarda só uma "
+                             "amostra aleatória (+ início e fim): N linhas, ou Task.sample / "
+                             f"{DEFAULT_SAMPLE_SIZE} sem N (padrão: resultado inteiro)")
+    parser.add_argument("--timeout-ms", type=int,
+                        help="Timeout por statement para todas as tasks (0 = sem limite; "
+                             f"padrão: timeout_ms da task ou {DEFAULT_TIMEOUT_MS})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Retries por run em erros transitórios (conexão, deadlock)")
+    parser.add_argument("--clients", type=int, default=1,
+                        help="Clientes concorrentes (threads em loop fechado) repartindo os runs de cada task")
+    parser.add_argument("--output-dir",
+                        help="Diretório de saída (padrão: outputs/sf<SF>[_<layout>])")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continua a execução interrompida a partir do run_log.jsonl "
+                             "(runs falhos são executados de novo)")
+    parser.add_argument("--trace", nargs="?", const=TRACE_FILE, metavar="FILE",
+                        help="Grava a sequência de invocações para o workload_replay.py "
+                             f"(padrão: {TRACE_FILE} no diretório de saída)")
+    args = parser.parse_args()
+    if not args.list and args.sf is None:
+        parser.error("--sf is required")
+    return args
+
+
+# ============================================================
+# Logging
+# ============================================================
+
+def log_title(msg):
+    print("\n" + "=" * 70)
+    print(msg)
+    print("=" * 70)
+
+
+def log(msg):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
+
+
+# ============================================================
+# Execução (1 run)
+# ============================================================
+
+def run_query_once(db_config, task_name, sql, run_number, params=None, timeout_ms=None,
+                   protocol=PROTOCOLS[DEFAULT_PROTOCOL], digest=False, sample=None):
+    """
+    Devolve (df, linhas, ms, bytes no fio, servidor que respondeu, digest do
+    resultado ou None); o digest é calculado fora do tempo medido. Com
+    `sample` (Task.sample) o resultado é lido em lotes sem buffer e o df é só
+    a amostra.
+    """
+    if sample is not None:
+        protocol = streaming(protocol)
+    conn = pymysql.connect(**db_config, read_timeout=client_timeout_s(timeout_ms))
+    try:
+        with conn.cursor() as status_cur, conn.cursor(cursor_class(protocol)) as cur:
+            set_statement_timeout(status_cur, timeout_ms)
+            wire = BytesSentCounter(status_cur)
+            start = time.perf_counter()
+            cur.execute(sql, params or None)
+            if sample is None:
+                rows = fetch_all(cur, protocol)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                row_count = len(rows)
+                result = result_digest(rows) if digest else None
+            else:
+                hasher = ResultDigest() if digest else None
+                reservoir, digest_s = consume(iter_batches(cur, protocol), sample, hasher)
+                elapsed_ms = (time.perf_counter() - start - digest_s) * 1000
+                row_count = reservoir.count
+                result = hasher.hexdigest() if hasher else None
+            wire_bytes = wire.delta()
+
+            columns = [d[0] for d in cur.description]
+            if sample is None:
+                df = pd.DataFrame(rows, columns=columns)
+            else:
+                df = sample_frame(reservoir, columns)
+                log(f"Task {task_name} | run {run_number} | kept {len(df)} of {row_count} rows")
+            log(f"Task {task_name} | run {run_number} | {row_count} rows | "
+                f"{wire_bytes / 1e6:.2f} MB | {elapsed_ms:.2f} ms")
+            return df, row_count, elapsed_ms, wire_bytes, server_name(db_config), result
+    finally:
+        conn.close()
+
+
+def run_split_scan_once(scanner, task_name, spec, bounds, run_number, timeout_ms=None):
+    df, rows, elapsed_ms = scanner.run_once(spec, bounds, timeout_ms)
+    log(f"Task {task_name} | run {run_number} | {len(bounds)} chunks | {rows} rows | {elapsed_ms:.2f} ms")
+    return df, rows, elapsed_ms, None, None, None
+
+
+# ============================================================
+# Pré-agregação
+# ============================================================
+
+def prepare_materialized_views(db_config, refresh):
+    conn = pymysql.connect(**db_config)
+    try:
+        if refresh or not materialized_views_ready(conn):
+            log("Building materialized summary tables and triggers...")
+            start = time.perf_counter()
+            setup_materialized_views(conn)
+            log(f"Materialized views ready in {(time.perf_counter() - start) * 1000:.2f} ms")
+        else:
+            log("Materialized views already maintained by triggers")
+    finally:
+        conn.close()
+
+
+# ============================================================
+# Comparação com a task base (pré-agregação / split scan)
+# ============================================================
+
+def add_speedup_vs_base(summary_df, base_tasks):
+    avg_by_task = dict(zip(summary_df["task"], summary_df["avg_time_ms"]))
+    summary_df["base_task"] = summary_df["task"].map(base_tasks)
+    summary_df["speedup_vs_base"] = [
+        round(avg_by_task[base] / avg, 2) if base in avg_by_task and pd.notna(avg) and avg > 0 else None
+        for base, avg in zip(summary_df["base_task"], summary_df["avg_time_ms"])
+    ]
+    return summary_df
+
+
+def add_rewrite_checks(summary_df, rewrite_of):
+    """
+    Reescritas: results_match (mesmo digest da task original) e rewrite_rank,
+    a posição por avg_time_ms entre a original e as suas reescritas (1 = mais rápida).
+    """
+    digest_by_task = dict(zip(summary_df["task"], summary_df["result_digest"]))
+    summary_df["rewrite_of"] = summary_df["task"].map(rewrite_of)
+    summary_df["results_match"] = [
+        digest == digest_by_task.get(base)
+        if pd.notna(base) and pd.notna(digest) and pd.notna(digest_by_task.get(base)) else None
+        for base, digest in zip(summary_df["rewrite_of"], summary_df["result_digest"])
+    ]
+    family = summary_df["rewrite_of"].fillna(summary_df["task"])
+    summary_df["rewrite_rank"] = (
+        summary_df.groupby(family)["avg_time_ms"].rank(method="min")
+        .where(family.isin(set(rewrite_of.values())))
+    )
+    return summary_df
+
+
+# ============================================================
+# Resumo (derivado do run_log)
+# ============================================================
+
+def write_summary(run_log, output_dir, base_tasks, rewrite_of):
+    """Regera os <task>_runs.csv e o workload_summary.csv a partir do log."""
+    summary_df = pd.DataFrame(derive_outputs(run_log.path, output_dir))
+    if base_tasks and not summary_df.empty:
+        summary_df = add_speedup_vs_base(summary_df, base_tasks)
+    if rewrite_of and not summary_df.empty:
+        summary_df = add_rewrite_checks(summary_df, rewrite_of)
+    summary_csv = os.path.join(output_dir, "workload_summary.csv")
+    summary_df.to_csv(summary_csv, index=False)
+    return summary_csv
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def select_tasks(args):
+    include_tags = []
+    if args.materialized:
+        include_tags.append("materialized")
+    if args.split_scan:
+        include_tags.append("split-scan")
+    try:
+        return REGISTRY.select(only=args.only, tags=args.tag, include_tags=include_tags)
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+
+
+def main():
+    args = parse_args()
+    if args.list:
+        print(REGISTRY.describe())
+        return
+
+    sf = args.sf
+    tasks = select_tasks(args)
+
+    base_dbname = resolve_database_name(sf)
+    dbname = layout_database_name(base_dbname, args.layout)
+
+    DB_CONFIG = {
+        "host": "127.0.0.1",
+        "port": 3307,
+        "user": "root",
+        "password": "root",
+        "database": dbname,
+        "cursorclass": pymysql.cursors.Cursor,
+    }
+
+    # Padronizado igual Mongo: outputs/sf<SF>/ (outputs/sf<SF>_<layout>/ para layouts particionados)
+    if args.output_dir:
+        output_dir = args.output_dir
+    elif args.layout == BASELINE_LAYOUT:
+        output_dir = os.path.join("outputs", f"sf{sf}")
+    else:
+        output_dir = os.path.join("outputs", f"sf{sf}_{args.layout}")
+    # Leituras nas réplicas: outputs/sf<SF>[_<layout>]_r<K>/
+    if args.replicas and not args.output_dir:
+        output_dir += f"_r{args.replicas}"
+    os.makedirs(output_dir, exist_ok=True)
+
+    log_title(f"MySQL Workload – SF{sf}")
+    log(f"Database: {dbname}")
+    log(f"Layout: {args.layout}")
+    log(f"Clients: {args.clients}")
+    log(f"Output directory: {output_dir}")
+
+    # Runs nas réplicas; setup (layouts, pré-agregação) e split scan no primário
+    router = None
+    if args.replicas:
+        try:
+            router = ReplicaRouter(DB_CONFIG, args.replicas)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        log(f"Read replicas: {', '.join(server_name(c) for c in router.configs)}")
+
+    if args.provision_layout and args.layout != BASELINE_LAYOUT:
+        conn = pymysql.connect(**{**DB_CONFIG, "database": base_dbname})
+        try:
+            start = time.perf_counter()
+            try:
+                provision_layout(conn, base_dbname, args.layout, args.partitions, log=log)
+            except ValueError as e:
+                raise SystemExit(str(e))
+            log(f"Layout {args.layout} provisioned in {(time.perf_counter() - start) / 60:.1f} min")
+        finally:
+            conn.close()
+
+    log(f"Tasks: {', '.join(task.name for task in tasks)}")
+
+    if any("materialized" in task.tags and task.base_task for task in tasks):
+        prepare_materialized_views(DB_CONFIG, args.refresh_materialized)
+
+    # Reescritas: mesma task lógica, outra forma da query
+    rewrite_of = {}
+    if args.rewrites:
+        for task in list(tasks):
+            for rewrite in task.rewrite_tasks():
+                rewrite_of[rewrite.name] = task.name
+                tasks.append(rewrite)
+    # Tasks cujo resultado é comparado (digest a cada run)
+    verified = set(rewrite_of) | set(rewrite_of.values())
+    digests = {}
+
+    # Variantes de protocolo: mesma query, outro cursor/fetch size
+    task_protocols = {task.name: DEFAULT_PROTOCOL for task in tasks}
+    for profile in [p for p in args.protocol if p != DEFAULT_PROTOCOL]:
+        for task in [t for t in tasks if task_protocols[t.name] == DEFAULT_PROTOCOL]:
+            variant = replace(
+                task,
+                name=f"{task.name}_{profile}",
+                tags=task.tags + ("protocol",),
+                equivalent=None,
+                base_task=task.name,
+                split=None,
+            )
+            task_protocols[variant.name] = profile
+            tasks.append(variant)
+
+    split_runs = {}
+    scanner = None
+    if args.split_scan:
+        scanner = SplitScanner(DB_CONFIG, args.split_scan)
+        for task in [t for t in tasks if t.split]:
+            spec = task.split
+            lo, hi = key_range(DB_CONFIG, spec["table"], spec["key"])
+            if lo is None:
+                log(f"Skipping split scan of {task.name}: {spec['table']} is empty")
+                continue
+            split_task = Task(
+                name=f"{task.name}_split{args.split_scan}",
+                build=lambda sql=spec["sql"]: sql,
+                tags=task.tags + ("split",),
+                runs=task.runs,
+                expected_rows=task.expected_rows,
+                timeout_ms=task.timeout_ms,
+                base_task=task.name,
+            )
+            split_runs[split_task.name] = (spec, chunk_bounds(lo, hi, args.split_scan))
+            tasks.append(split_task)
+
+    base_tasks = {task.name: task.base_task for task in tasks if task.base_task}
+
+    # Cada run concluído vira um evento no run_log.jsonl; os *_runs.csv e o
+    # resumo são regerados dele ao fim de cada task. Com --resume a execução
+    # continua no primeiro run que ainda não está no log
+    try:
+        run_log = RunLog(
+            output_dir,
+            {"engine": "mysql", "sf": sf, "database": dbname, "layout": args.layout},
+            resume=args.resume,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    # Trace: instante, task e params de cada invocação, na ordem em que aconteceram
+    trace = None
+    if args.trace:
+        trace_path = args.trace if os.path.dirname(args.trace) else os.path.join(output_dir, args.trace)
+        trace = TraceRecorder(
+            trace_path,
+            {"engine": "mysql", "sf": sf, "database": dbname, "layout": args.layout},
+            resume=args.resume,
+        )
+        log(f"Trace: {trace_path}")
+
+    for task in tasks:
+        task_name = task.name
+        runs = args.runs or task.runs_or(DEFAULT_RUNS_PER_TASK)
+        expected_rows = task.expected_rows_for(sf)
+        timeout_ms = (
+            args.timeout_ms if args.timeout_ms is not None
+            else task.timeout_ms_for(sf, DEFAULT_TIMEOUT_MS)
+        )
+
+        log_title(f"Running task: {task_name}")
+        log(f"Configured runs: {runs}")
+        log(f"Statement timeout: {f'{timeout_ms} ms' if timeout_ms else 'none'}")
+        if task_name in task_protocols:
+            log(f"Protocol: {task_protocols[task_name]}")
+
+        # Amostra do resultado só com --sample (muda o modo de leitura): tamanho
+        # de --sample N ou de Task.sample (split scans guardam o resultado inteiro)
+        sample = None
+        if args.sample is not None:
+            sample = dict(task.sample or {})
+            if args.sample:
+                sample["size"] = args.sample
+        if task_name in split_runs:
+            sample = None
+        if sample is not None:
+            log(f"Result sample: {sample.get('size', DEFAULT_SAMPLE_SIZE)} rows + head/tail")
+
+        done = run_log.completed(task_name)
+        if done:
+            log(f"Resuming: {len(done)} run(s) already in the run log")
+
+        run_log.task(task_name, {
+            "task": task_name,
+            "sf": sf,
+            "engine": "mysql",
+            "database": dbname,
+            "layout": args.layout,
+            "collection_or_table": "N/A",
+            "runs_configured": runs,
+            "clients": args.clients,
+            "replicas": args.replicas,
+            "protocol": task_protocols.get(task_name),
+            "result_sample": sample.get("size", DEFAULT_SAMPLE_SIZE) if sample else None,
+            "timeout_ms": timeout_ms,
+            "expected_rows": expected_rows,
+            "equivalent_task": task.equivalent,
+        })
+
+        sql = task.query()
+        protocol = PROTOCOLS.get(task_protocols.get(task_name), PROTOCOLS[DEFAULT_PROTOCOL])
+        digest = task_name in verified
+        last_df = None
+        ok_runs = []
+
+        def execute_run(run, client):
+            nonlocal last_df
+
+            def execute():
+                if task_name in split_runs:
+                    spec, bounds = split_runs[task_name]
+                    return run_split_scan_once(scanner, task_name, spec, bounds, run, timeout_ms)
+                # cada tentativa (inclusive retry) vai para a próxima réplica
+                db_config = router.next_config() if router else DB_CONFIG
+                return run_query_once(
+                    db_config, task_name, sql, run, task.params, timeout_ms, protocol, digest, sample
+                )
+
+            started = time.perf_counter()
+            outcome = run_with_retries(execute, args.retries, DEFAULT_RETRY_BACKOFF_S, log=log)
+            if outcome.ok:
+                df, rows, elapsed_ms, wire_bytes, server, result = outcome.result
+                if trace is not None:
+                    trace.record(task_name, started, elapsed_ms, rows, client, task.params, task.base_task)
+                if expected_rows is not None and rows != expected_rows:
+                    log(f"WARNING {task_name} (run {run}): {rows} rows, expected {expected_rows}")
+                run_log.run(task_name, run_record(
+                    run, outcome, elapsed_ms, rows, client, wire_bytes, server, result
+                ))
+                if result:
+                    digests[task_name] = result
+                ok_runs.append(run)
+                last_df = df
+            else:
+                log(f"ERROR running {task_name} (run {run}) [{outcome.error_class}, "
+                    f"{outcome.attempts} attempt(s)]: {outcome.error}")
+                run_log.run(task_name, run_record(run, outcome, client=client))
+                if trace is not None:
+                    trace.record(task_name, started, client=client, params=task.params,
+                                 base_task=task.base_task)
+
+        pending = [run for run in range(1, runs + 1) if run not in done]
+        if pending:
+            wall_ms = run_concurrently(pending, args.clients, execute_run)
+            run_log.segment(task_name, args.clients, len(ok_runs), wall_ms)
+
+        # Resultado da última execução
+        if last_df is not None and not last_df.empty:
+            result_csv = os.path.join(output_dir, f"{task_name}_result.csv")
+            last_df.to_csv(result_csv, index=False)
+
+        # Tempos por run e resumo parcial (mesmo nome do Mongo)
+        run_log.sync()
+        write_summary(run_log, output_dir, base_tasks, rewrite_of)
+
+        base = rewrite_of.get(task_name)
+        if base in digests and task_name in digests and digests[base] != digests[task_name]:
+            log(f"WARNING {task_name} returned a different result than {base}")
+
+    run_log.close()
+    if trace is not None:
+        trace.close()
+    if scanner is not None:
+        scanner.close()
+
+    summary_csv = write_summary(run_log, output_dir, base_tasks, rewrite_of)
+
+    # Fingerprint do ambiente (servidor, dataset, host) ao lado do resumo
+    try:
+        fingerprint_json = write_fingerprint(collect_fingerprint(DB_CONFIG, sf), output_dir)
+    except Exception as e:
+        fingerprint_json = None
+        log(f"WARNING could not capture environment fingerprint: {e}")
+
+    log_title("MySQL workload finished")
+    log(f"Summary saved to: {summary_csv}")
+    if fingerprint_json:
+        log(f"Environment fingerprint saved to: {fingerprint_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# split_scan.py
+# Scan dividido em faixas da chave, executado em paralelo por processos
+
+import time
+from multiprocessing import Pool
+
+import pandas as pd
+import pymysql
+
+from run_control import client_timeout_s, set_statement_timeout
+
+# ================================
+# WORKER (uma conexão por processo, reaproveitada entre runs)
+# ================================
+
+_conn = None
+
+
+def _init_worker(db_config):
+    global _conn
+    _conn = pymysql.connect(**db_config)
+
+
+def _scan_chunk(args):
+    sql, lo, hi, timeout_ms = args
+    # reabre a conexão do worker se ela caiu num run anterior
+    _conn.ping(reconnect=True)
+    with _conn.cursor() as cur:
+        set_statement_timeout(cur, timeout_ms)
+    # SSCursor: a faixa é drenada em streaming, sem materializar tudo no worker
+    with _conn.cursor(pymysql.cursors.SSCursor) as cur:
+        cur.execute(sql, (lo, hi))
+        columns = [d[0] for d in cur.description]
+        rows = 0
+        first = None
+        while True:
+            batch = cur.fetchmany(10_000)
+            if not batch:
+                break
+            if first is None:
+                first = batch[0]
+            rows += len(batch)
+    return columns, rows, first
+
+
+# ================================
+# FAIXAS
+# ================================
+
+def key_range(db_config, table, key):
+    conn = pymysql.connect(**db_config)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT MIN({key}), MAX({key}) FROM {table};")
+            return cur.fetchone()
+    finally:
+        conn.close()
+
+
+def chunk_bounds(lo, hi, chunks):
+    """Faixas [lo, hi) contíguas cobrindo lo..hi (inclusive)."""
+    lo, hi = int(lo), int(hi) + 1
+    step = max(1, -(-(hi - lo) // chunks))
+    return [(start, min(start + step, hi)) for start in range(lo, hi, step)]
+
+
+# ================================
+# MERGE
+# ================================
+
+MERGE_FUNCS = {
+    "sum": sum,
+    "min": min,
+    "max": max,
+}
+
+
+def merge_chunks(results, merge):
+    """
+    merge=None: scan de linhas, só a contagem é somada.
+    merge={coluna: sum|min|max}: agregado de 1 linha por faixa.
+    """
+    total_rows = sum(rows for _, rows, _ in results)
+    if not merge:
+        return None, total_rows
+
+    columns = results[0][0]
+    values = [dict(zip(columns, first)) for _, _, first in results if first is not None]
+    merged = {
+        col: MERGE_FUNCS[merge[col]]([v[col] for v in values if v[col] is not None])
+        if col in merge else None
+        for col in columns
+    }
+    return pd.DataFrame([merged]), 1
+
+
+# ================================
+# EXECUÇÃO
+# ================================
+
+class SplitScanner:
+    """Pool de N processos, cada um com sua conexão MySQL."""
+
+    def __init__(self, db_config, workers):
+        self.workers = workers
+        self.pool = Pool(workers, initializer=_init_worker, initargs=(db_config,))
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run_once(self, spec, bounds, timeout_ms=None):
+        """
+        timeout_ms vale para cada faixa (MAX_EXECUTION_TIME nos workers); o
+        run inteiro desiste com multiprocessing.TimeoutError após o mesmo
+        limite mais a margem do cliente.
+        """
+        start = time.perf_counter()
+        pending = self.pool.map_async(
+            _scan_chunk, [(spec["sql"], lo, hi, timeout_ms) for lo, hi in bounds]
+        )
+        results = pending.get(timeout=client_timeout_s(timeout_ms))
+        df, rows = merge_chunks(results, spec.get("merge"))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return df, rows, elapsed_ms
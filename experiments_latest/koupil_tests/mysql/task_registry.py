@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# task_registry.py
+# Registro declarativo das tasks do workload
+#
+# As tasks são funções decoradas com @REGISTRY.task(...) no workload_config.
+# O decorator só guarda a função e os metadados; a query (SQL ou pipeline)
+# é montada na primeira vez que a task é usada, com os `params` da task.
+# Formas equivalentes da mesma query entram com @REGISTRY.rewrite(task, nome)
+# e viram as variantes <task>_<nome>.
+
+import hashlib
+from dataclasses import dataclass, field, replace
+from typing import Callable, Optional
+
+
+@dataclass
+class Task:
+    name: str
+    build: Callable
+    collection: Optional[str] = None
+    tags: tuple = ()
+    runs: Optional[int] = None
+    params: dict = field(default_factory=dict)
+    # int (igual para todo SF) ou {sf: int}
+    expected_rows: object = None
+    # timeout do statement em ms, int ou {sf: int} (None = padrão do runner)
+    timeout_ms: object = None
+    # task equivalente na outra engine (ex.: T-R1_denorm_scan <-> M1_TR1_denormalized_scan)
+    equivalent: Optional[str] = None
+    # task base da mesma engine com que esta variante é comparada
+    base_task: Optional[str] = None
+    # especificação de split scan (split_scan*.py), se a task suportar
+    split: Optional[dict] = None
+    # entra na execução padrão (sem --only / --tag)
+    default: bool = True
+    description: str = ""
+    # reescritas equivalentes: {nome: build}, com os mesmos params
+    rewrites: dict = field(default_factory=dict)
+    # amostra do resultado quando o runner roda com --sample (result_sample.py):
+    # {"size": n, "head": n, "tail": n, "seed": s}, chaves opcionais
+    sample: Optional[dict] = None
+
+    _query: object = field(default=None, init=False, repr=False)
+
+    def query(self):
+        if self._query is None:
+            self._query = self.build(**self.params)
+        return self._query
+
+    def runs_or(self, default):
+        return self.runs if self.runs is not None else default
+
+    def expected_rows_for(self, sf):
+        if isinstance(self.expected_rows, dict):
+            return self.expected_rows.get(sf)
+        return self.expected_rows
+
+    def timeout_ms_for(self, sf, default):
+        timeout = self.timeout_ms
+        if isinstance(timeout, dict):
+            timeout = timeout.get(sf)
+        return timeout if timeout is not None else default
+
+    def rewrite_tasks(self):
+        """Uma task <nome>_<reescrita> por reescrita, com base_task = esta task."""
+        return [
+            replace(
+                self,
+                name=f"{self.name}_{name}",
+                build=build,
+                tags=self.tags + ("rewrite",),
+                equivalent=None,
+                base_task=self.name,
+                split=None,
+                description=(build.__doc__ or "").strip(),
+                rewrites={},
+            )
+            for name, build in self.rewrites.items()
+        ]
+
+
+class ResultDigest:
+    """
+    Hash do resultado que não depende da ordem das linhas (soma dos hashes de
+    cada linha), para comparar uma reescrita com a query original. Pode ser
+    alimentado em lotes, conforme o resultado é lido.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+    def update(self, rows):
+        for row in rows:
+            # documentos (Mongo) pela lista ordenada de campos
+            values = tuple(sorted(row.items())) if isinstance(row, dict) else tuple(row)
+            digest = hashlib.blake2b(repr(values).encode(), digest_size=16).digest()
+            self.total = (self.total + int.from_bytes(digest, "big")) % (1 << 128)
+            self.count += 1
+        return self
+
+    def hexdigest(self):
+        return f"{self.count}:{self.total:032x}"
+
+
+def result_digest(rows):
+    return ResultDigest().update(rows).hexdigest()
+
+
+class TaskRegistry:
+
+    def __init__(self):
+        self._tasks = {}
+
+    def task(self, name, **meta):
+        def register(build):
+            if name in self._tasks:
+                raise ValueError(f"Task {name} registered twice")
+            doc = (build.__doc__ or "").strip()
+            self._tasks[name] = Task(name=name, build=build, description=doc, **meta)
+            return build
+        return register
+
+    def rewrite(self, task_name, name):
+        """Registra uma forma equivalente da query de `task_name` (já registrada)."""
+        def register(build):
+            task = self._tasks[task_name]
+            if name in task.rewrites:
+                raise ValueError(f"Rewrite {name} of {task_name} registered twice")
+            task.rewrites[name] = build
+            return build
+        return register
+
+    def add(self, task):
+        if task.name in self._tasks:
+            raise ValueError(f"Task {task.name} registered twice")
+        self._tasks[task.name] = task
+        return task
+
+    def __getitem__(self, name):
+        return self._tasks[name]
+
+    def __contains__(self, name):
+        return name in self._tasks
+
+    def __iter__(self):
+        return iter(self._tasks.values())
+
+    def names(self):
+        return list(self._tasks)
+
+    def tags(self):
+        return sorted({tag for task in self._tasks.values() for tag in task.tags})
+
+    def select(self, only=None, tags=None, include_tags=()):
+        """
+        only: nomes exatos (na ordem do registro).
+        tags: tasks com pelo menos uma das tags.
+        Sem filtros: as tasks `default` e as que têm alguma tag de `include_tags`.
+        """
+        if only:
+            unknown = [name for name in only if name not in self._tasks]
+            if unknown:
+                raise KeyError(
+                    f"Unknown task(s): {', '.join(unknown)}. "
+                    f"Available: {', '.join(self._tasks)}"
+                )
+            return [task for task in self._tasks.values() if task.name in only]
+
+        if tags:
+            unknown = [tag for tag in tags if tag not in self.tags()]
+            if unknown:
+                raise KeyError(
+                    f"Unknown tag(s): {', '.join(unknown)}. "
+                    f"Available: {', '.join(self.tags())}"
+                )
+            return [task for task in self._tasks.values() if set(task.tags) & set(tags)]
+
+        return [
+            task for task in self._tasks.values()
+            if task.default or set(task.tags) & set(include_tags)
+        ]
+
+    def describe(self):
+        lines = []
+        for task in self._tasks.values():
+            flags = [] if task.default else ["optional"]
+            if task.runs is not None:
+                flags.append(f"runs={task.runs}")
+            if task.timeout_ms is not None:
+                flags.append(f"timeout_ms={task.timeout_ms}")
+            if task.equivalent:
+                flags.append(f"<-> {task.equivalent}")
+            if task.base_task:
+                flags.append(f"base={task.base_task}")
+            if task.rewrites:
+                flags.append(f"rewrites={','.join(task.rewrites)}")
+            if task.sample is not None:
+                flags.append("sampled")
+            lines.append(
+                f"{task.name:<40} [{', '.join(task.tags)}] {' '.join(flags)}".rstrip()
+            )
+        return "\n".join(lines)
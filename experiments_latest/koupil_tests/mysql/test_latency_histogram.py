@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# test_latency_histogram.py
+# Percentis, merge e serialização do latency_histogram.py
+
+import os
+import sys
+import math
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from latency_histogram import (
+    LatencyHistogram,
+    load_histograms,
+    write_histograms,
+)
+
+
+def exact_percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+def test_percentiles_within_relative_error():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1.2) for _ in range(20_000)]
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+
+    for p in (50, 90, 99, 99.9):
+        exact = exact_percentile(values, p)
+        # 3 dígitos significativos: erro relativo < 0.1% (+ arredondamento em µs)
+        assert hist.percentile(p) == pytest.approx(exact, rel=1e-3, abs=1e-3)
+    assert hist.percentile(100) == pytest.approx(max(values), abs=1e-3)
+    assert hist.mean() == pytest.approx(sum(values) / len(values), rel=1e-6)
+
+
+def test_small_values_are_exact():
+    hist = LatencyHistogram()
+    for v in (0.001, 0.002, 0.003, 1.5):
+        hist.record(v)
+    assert hist.percentile(50) == 0.002
+    assert hist.percentile(100) == 1.5
+    assert hist.percentiles()["p50_ms"] == 0.002
+
+
+def test_empty_histogram():
+    hist = LatencyHistogram()
+    assert hist.percentile(50) is None
+    assert hist.mean() is None
+    assert set(hist.percentiles().values()) == {None}
+
+
+def test_merge_equals_recording_everything():
+    rng = random.Random(3)
+    a_values = [rng.uniform(1, 50) for _ in range(1_000)]
+    b_values = [rng.uniform(40, 5_000) for _ in range(300)]
+
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for v in a_values:
+        a.record(v)
+        both.record(v)
+    for v in b_values:
+        b.record(v)
+        both.record(v)
+
+    merged = a.merge(b)
+    assert merged.counts == both.counts
+    assert (merged.count, merged.total, merged.min, merged.max) == (
+        both.count, both.total, both.min, both.max
+    )
+    assert merged.percentiles() == both.percentiles()
+
+
+def test_merge_with_empty_keeps_min_max():
+    hist = LatencyHistogram()
+    hist.record(5)
+    hist.merge(LatencyHistogram())
+    assert (hist.min, hist.max, hist.count) == (5000, 5000, 1)
+    assert LatencyHistogram().merge(hist).percentile(50) == 5.0
+
+
+def test_merge_rejects_different_precision():
+    with pytest.raises(ValueError):
+        LatencyHistogram(3).merge(LatencyHistogram(2))
+
+
+def test_json_round_trip(tmp_path):
+    hist = LatencyHistogram()
+    for v in (1, 2, 3, 250, 10_000):
+        hist.record(v)
+    path = str(tmp_path / "latency_histograms.json")
+    write_histograms(path, {"T1": hist}, {"sf": 1})
+
+    context, histograms = load_histograms(path)
+    assert context == {"sf": 1}
+    loaded = histograms["T1"]
+    assert loaded.counts == hist.counts
+    assert loaded.percentiles() == hist.percentiles()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# test_regression_check.py
+# Mann-Whitney unilateral do regression_check.py (experiments_latest/)
+
+import os
+import sys
+from itertools import combinations
+from math import comb
+
+import pytest
+
+pytest.importorskip("pandas")
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")))
+
+from regression_check import _exact_u_cdf, mann_whitney_greater
+
+
+def brute_force_p(current, baseline):
+    """P(U >= u) contando todas as atribuições de ranks (sem empates)."""
+    n1, n = len(current), len(current) + len(baseline)
+    u_of = lambda ranks: sum(ranks) - n1 * (n1 + 1) / 2
+    ordered = sorted(current + baseline)
+    u_obs = u_of([ordered.index(v) + 1 for v in current])
+    hits = sum(1 for ranks in combinations(range(1, n + 1), n1) if u_of(ranks) >= u_obs)
+    return hits / comb(n, n1)
+
+
+def test_exact_distribution_sums_to_one_and_is_symmetric():
+    for n1, n2 in ((1, 1), (3, 4), (5, 5), (2, 7)):
+        dist = _exact_u_cdf(n1, n2)
+        assert len(dist) == n1 * n2 + 1
+        assert sum(dist) == pytest.approx(1.0)
+        assert dist == pytest.approx(dist[::-1])
+
+
+def test_known_exact_p_values():
+    assert mann_whitney_greater([4, 5, 6], [1, 2, 3]) == (9, pytest.approx(1 / 20))
+    assert mann_whitney_greater([3, 4], [1, 2]) == (4, pytest.approx(1 / 6))
+    assert mann_whitney_greater([1, 2], [3, 4]) == (0, pytest.approx(1.0))
+
+
+@pytest.mark.parametrize("current, baseline", [
+    ([10.5, 12.0, 11.1, 9.8], [9.0, 9.5, 10.0, 10.1, 8.7]),
+    ([1.0, 7.0, 3.0], [2.0, 4.0, 5.0, 6.0]),
+    ([20.0, 21.0, 19.5, 22.0, 18.0], [17.0, 19.0, 16.5]),
+])
+def test_exact_p_values_match_enumeration(current, baseline):
+    _, p = mann_whitney_greater(current, baseline)
+    assert p == pytest.approx(brute_force_p(current, baseline))
+
+
+def test_ties_use_normal_approximation():
+    u, p = mann_whitney_greater([5, 5, 6, 7], [5, 4, 3, 3])
+    assert u == 15.0
+    assert 0 < p < 0.1
+    # sem variação nenhuma não há evidência de regressão
+    assert mann_whitney_greater([5, 5], [5, 5])[1] == pytest.approx(1.0)
+
+
+def test_large_samples_agree_with_exact():
+    current = [i + 0.5 for i in range(25)]
+    baseline = list(range(20))
+    u, p = mann_whitney_greater(current, baseline)
+    # n1*n2 > 400: aproximação normal, próxima da exata
+    exact = sum(_exact_u_cdf(25, 20)[int(u):])
+    assert p == pytest.approx(exact, abs=0.01)
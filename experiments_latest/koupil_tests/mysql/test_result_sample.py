@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# test_result_sample.py
+# Uniformidade da amostra do result_sample.py (o mesmo módulo dos runners
+# de teste2 e documents_tests)
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from result_sample import ReservoirSample
+
+ROWS = 100
+SIZE = 10
+TRIALS = 4_000
+
+
+def _inclusion_counts(batch):
+    counts = [0] * ROWS
+    for seed in range(TRIALS):
+        sample = ReservoirSample(size=SIZE, head=0, tail=0, seed=seed)
+        for i in range(0, ROWS, batch):
+            sample.extend(list(range(i, min(i + batch, ROWS))))
+        for position, _ in sample._reservoir:
+            counts[position] += 1
+    return counts
+
+
+@pytest.mark.parametrize("batch", [1, 7, ROWS])
+def test_every_row_equally_likely(batch):
+    counts = _inclusion_counts(batch)
+    expected = TRIALS * SIZE / ROWS
+    tolerance = 5 * (expected * (1 - SIZE / ROWS)) ** 0.5
+
+    assert all(abs(c - expected) < tolerance for c in counts)
+    # 1º salto longo demais super-representa o reservatório inicial
+    initial = sum(counts[:SIZE]) / SIZE
+    assert abs(initial - expected) < tolerance / 4
+
+
+def test_sample_keeps_size_and_count():
+    sample = ReservoirSample(size=SIZE, head=3, tail=3, seed=1)
+    sample.extend(list(range(ROWS)))
+    assert sample.count == ROWS
+    assert len(sample._reservoir) == SIZE
+    assert [row for _, part, row in sample.rows() if part == "head"] == [0, 1, 2]
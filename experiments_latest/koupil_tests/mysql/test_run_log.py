@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# test_run_log.py
+# --resume e linha cortada do run_log.py; resumo derivado do log
+
+import os
+import sys
+import csv
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_log import RUN_LOG_FILE, RunLog, derive_outputs, read_events
+
+CONTEXT = {"engine": "mysql", "sf": 1}
+
+
+def ok(run, time_ms, attempts=1):
+    return {"run": run, "status": "ok", "time_ms": time_ms, "rows": 3, "attempts": attempts}
+
+
+def failed(run, error_class="timeout", attempts=1):
+    return {"run": run, "status": "failed", "error_class": error_class,
+            "error": "boom", "attempts": attempts}
+
+
+def write_log(output_dir, runs, task="T1"):
+    log = RunLog(str(output_dir), CONTEXT)
+    log.task(task, {"task": task})
+    for record in runs:
+        log.run(task, record)
+    log.close()
+    return log.path
+
+
+def test_resume_skips_ok_runs_and_retries_failed(tmp_path):
+    write_log(tmp_path, [ok(1, 10.0), failed(2), ok(3, 12.0)])
+
+    log = RunLog(str(tmp_path), CONTEXT, resume=True)
+    assert log.completed("T1") == {1, 3}
+    assert log.completed("other") == set()
+    log.run("T1", ok(2, 11.0))
+    assert log.completed("T1") == {1, 2, 3}
+    log.close()
+
+
+def test_rerun_replaces_the_failed_run_in_the_outputs(tmp_path):
+    path = write_log(tmp_path, [ok(1, 10.0), failed(2, "transient", attempts=3)])
+    log = RunLog(str(tmp_path), CONTEXT, resume=True)
+    log.run("T1", ok(2, 20.0))
+    log.close()
+
+    (summary,) = derive_outputs(path, str(tmp_path))
+    assert summary["runs_valid"] == 2
+    assert summary["runs_failed"] == 0
+    assert summary["errors"] is None
+    # 3 tentativas do run falho + 0 do refeito
+    assert summary["retries"] == 3
+    assert summary["avg_time_ms"] == 15.0
+
+    with open(tmp_path / "T1_runs.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["run"], r["status"]) for r in rows] == [("1", "ok"), ("2", "ok")]
+
+
+def test_failures_count_when_not_rerun(tmp_path):
+    path = write_log(tmp_path, [ok(1, 10.0), failed(2), failed(3, "transient", attempts=2)])
+    (summary,) = derive_outputs(path, str(tmp_path))
+    assert summary["runs_valid"] == 1
+    assert summary["runs_failed"] == 2
+    assert summary["retries"] == 1
+    assert summary["errors"] == "timeout:1;transient:1"
+
+
+def test_resume_drops_a_cut_last_line(tmp_path):
+    path = write_log(tmp_path, [ok(1, 10.0), ok(2, 11.0)])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "run", "task": "T1", "run": 3, "sta')
+
+    assert [e.get("run") for e in read_events(path) if e["event"] == "run"] == [1, 2]
+
+    log = RunLog(str(tmp_path), CONTEXT, resume=True)
+    assert log.completed("T1") == {1, 2}
+    log.run("T1", ok(3, 12.0))
+    log.close()
+
+    runs = [e["run"] for e in read_events(path) if e["event"] == "run"]
+    assert runs == [1, 2, 3]
+    with open(path, "rb") as f:
+        assert f.read().endswith(b"\n")
+
+
+def test_resume_rejects_another_execution(tmp_path):
+    write_log(tmp_path, [ok(1, 10.0)])
+    with pytest.raises(ValueError):
+        RunLog(str(tmp_path), {**CONTEXT, "sf": 10}, resume=True)
+
+
+def test_without_resume_the_log_starts_over(tmp_path):
+    write_log(tmp_path, [ok(1, 10.0)])
+    log = RunLog(str(tmp_path), CONTEXT)
+    assert log.completed("T1") == set()
+    log.close()
+    events = list(read_events(os.path.join(str(tmp_path), RUN_LOG_FILE)))
+    assert [e["event"] for e in events] == ["start"]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# test_scaling_sweep.py
+# Ajustes USL, Kneedle e lei de potência do scaling_sweep.py (experiments_latest/)
+
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")))
+
+from scaling_sweep import fit_power_law, fit_usl, knee_point
+
+CLIENTS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def usl(n, x1, sigma, kappa):
+    n = np.asarray(n, dtype=float)
+    return x1 * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def test_usl_recovers_the_parameters():
+    fit = fit_usl(CLIENTS, usl(CLIENTS, 100.0, 0.05, 0.001))
+    assert fit["x1_qps"] == 100.0
+    assert fit["sigma"] == pytest.approx(0.05, abs=1e-4)
+    assert fit["kappa"] == pytest.approx(0.001, abs=1e-6)
+    assert fit["r2"] == pytest.approx(1.0)
+    # N* = sqrt((1 - sigma) / kappa)
+    assert fit["peak_clients"] == pytest.approx(30.8, abs=0.1)
+    assert fit["peak_qps"] == pytest.approx(float(usl(30.82, 100.0, 0.05, 0.001)), rel=1e-3)
+
+
+def test_usl_without_n1_extrapolates_x1():
+    fit = fit_usl(CLIENTS[1:], usl(CLIENTS[1:], 50.0, 0.1, 0.0))
+    assert fit["sigma"] == pytest.approx(0.1, abs=0.02)
+    # sem coerência não há pico
+    assert fit["kappa"] == pytest.approx(0.0, abs=1e-4)
+
+
+def test_usl_linear_scaling_has_no_peak():
+    fit = fit_usl(CLIENTS, [100.0 * n for n in CLIENTS])
+    assert (fit["sigma"], fit["kappa"]) == (0.0, 0.0)
+    assert fit["peak_clients"] is None and fit["peak_qps"] is None
+
+
+def test_usl_needs_three_positive_points():
+    assert fit_usl([1, 2], [10, 20]) is None
+    assert fit_usl([1, 2, 4], [10, 0, 30]) is None
+
+
+def test_knee_of_a_saturating_curve():
+    clients = [1, 2, 4, 8, 16, 32]
+    throughput = [100, 200, 400, 420, 425, 430]
+    assert knee_point(clients, throughput) == 4
+
+
+def test_no_knee_on_a_straight_or_flat_line():
+    assert knee_point([1, 2, 3, 4], [10, 20, 30, 40]) is None
+    assert knee_point([1, 2, 3, 4], [10, 10, 10, 10]) is None
+    assert knee_point([1, 2], [10, 20]) is None
+
+
+def test_power_law():
+    sfs = [1, 10, 100]
+    fit = fit_power_law(sfs, [2.0 * sf ** 1.5 for sf in sfs])
+    assert fit == {"a_ms": pytest.approx(2.0), "exponent": pytest.approx(1.5)}
+    assert fit_power_law([1], [2.0]) is None
+    assert fit_power_law([1, 10], [2.0, 0.0]) is None
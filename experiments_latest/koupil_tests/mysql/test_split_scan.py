@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# test_split_scan.py
+# Faixas de chave do --split-scan (split_scan.chunk_bounds)
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pymysql")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from split_scan import chunk_bounds
+
+
+def covered(bounds):
+    return [key for start, end in bounds for key in range(start, end)]
+
+
+@pytest.mark.parametrize("lo, hi, chunks", [
+    (1, 100, 4),
+    (1, 101, 4),
+    (0, 0, 4),
+    (5, 7, 8),
+    (-10, 10, 3),
+    (1, 1_000_003, 16),
+])
+def test_bounds_cover_the_range_once(lo, hi, chunks):
+    bounds = chunk_bounds(lo, hi, chunks)
+    assert covered(bounds) == list(range(lo, hi + 1))
+    assert len(bounds) <= chunks
+    assert all(end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:]))
+
+
+def test_even_split():
+    assert chunk_bounds(1, 100, 4) == [(1, 26), (26, 51), (51, 76), (76, 101)]
+
+
+def test_decimal_keys_from_min_max():
+    # MIN()/MAX() de colunas DECIMAL chegam como Decimal
+    from decimal import Decimal
+    assert chunk_bounds(Decimal(1), Decimal(4), 2) == [(1, 3), (3, 5)]
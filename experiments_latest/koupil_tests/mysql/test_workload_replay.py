@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# test_workload_replay.py
+# Importadores de logs do workload_replay.py (experiments_latest/): general
+# log e slow log do MySQL, system.profile do MongoDB
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("pandas")
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")))
+
+from workload_replay import (
+    import_general_log,
+    import_profile,
+    import_slow_log,
+    normalize_sql,
+    pipeline_key,
+)
+
+DATABASE = "ecommerce_sf1"
+SINGLE_ORDER = "SELECT order_id, total_price\nFROM `Order`\nWHERE order_id = 1;"
+SQL_CATALOG = {normalize_sql(SINGLE_ORDER): "T-R2_single_order"}
+
+HEADER = (
+    "/usr/sbin/mysqld, Version: 8.0.36 (MySQL Community Server - GPL). started with:\n"
+    "Tcp port: 3307  Unix socket: /var/run/mysqld/mysqld.sock\n"
+    "Time                 Id Command    Argument\n"
+)
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_general_log(tmp_path):
+    first, *rest = SINGLE_ORDER.splitlines()
+    text = HEADER + "\n".join([
+        "2024-05-01T12:00:00.000000Z\t   12 Connect\troot@localhost on ecommerce_sf1 using TCP/IP",
+        "2024-05-01T12:00:00.100000Z\t   12 Query\t" + first,
+        *rest,
+        "2024-05-01T12:00:00.300000Z\t   13 Connect\troot@localhost on other_db using TCP/IP",
+        "2024-05-01T12:00:00.310000Z\t   13 Query\tSELECT 1",
+        "2024-05-01T12:00:00.400000Z\t   13 Init DB\tecommerce_sf1",
+        "2024-05-01T12:00:00.500000Z\t   13 Query\t/* raw */ SELECT COUNT(*) FROM Product",
+        "2024-05-01T12:00:00.600000Z\t   12 Query\tUPDATE Product SET price = 1",
+        # reinício do servidor no meio do statement não entra no SQL
+        "2024-05-01T12:00:00.700000Z\t   12 Query\tSELECT 2",
+        HEADER.rstrip("\n"),
+        "2024-05-01T12:00:00.800000Z\t   12 Quit\t",
+    ]) + "\n"
+
+    entries, skipped = import_general_log(write(tmp_path, "general.log", text), DATABASE, SQL_CATALOG)
+
+    assert [e["task"] for e in entries] == ["T-R2_single_order", None, None]
+    assert [e["client"] for e in entries] == [0, 1, 0]
+    assert entries[1]["sql"] == "/* raw */ SELECT COUNT(*) FROM Product"
+    assert entries[2]["sql"] == "SELECT 2"
+    assert entries[1]["t"] - entries[0]["t"] == pytest.approx(0.4)
+    assert all(e["time_ms"] is None for e in entries)
+    assert skipped == {"other database": 1, "not a read": 1}
+
+
+def test_slow_log(tmp_path):
+    text = HEADER + "\n".join([
+        "# Time: 2024-05-01T12:00:01.000000Z",
+        "# User@Host: root[root] @ localhost [127.0.0.1]  Id:    12",
+        "# Query_time: 0.500000  Lock_time: 0.000010 Rows_sent: 1  Rows_examined: 10",
+        "use ecommerce_sf1;",
+        "SET timestamp=1714564800;",
+        SINGLE_ORDER,
+        "# Time: 2024-05-01T12:00:02.000000Z",
+        "# User@Host: root[root] @ localhost [127.0.0.1]  Id:    14",
+        "# Query_time: 0.250000  Lock_time: 0.000010 Rows_sent: 3  Rows_examined: 10",
+        "SET timestamp=1714564801;",
+        "SELECT * FROM Product LIMIT 3;",
+        "# Time: 2024-05-01T12:00:03.000000Z",
+        "# User@Host: root[root] @ localhost [127.0.0.1]  Id:    14",
+        "# Query_time: 0.010000  Lock_time: 0.000010 Rows_sent: 0  Rows_examined: 0",
+        "SET timestamp=1714564802;",
+        "DELETE FROM Product WHERE product_id = 1;",
+        "# Time: 2024-05-01T12:00:04.000000Z",
+        "# User@Host: root[root] @ localhost [127.0.0.1]  Id:    15",
+        "# Query_time: 0.010000  Lock_time: 0.000010 Rows_sent: 0  Rows_examined: 0",
+        "use other_db;",
+        "SET timestamp=1714564803;",
+        "SELECT 1;",
+    ]) + "\n"
+
+    entries, skipped = import_slow_log(write(tmp_path, "slow.log", text), DATABASE, SQL_CATALOG)
+
+    assert [e["task"] for e in entries] == ["T-R2_single_order", None]
+    assert [(e["time_ms"], e["rows"]) for e in entries] == [(500.0, 1), (250.0, 3)]
+    assert [e["client"] for e in entries] == [0, 1]
+    assert entries[1]["sql"] == "SELECT * FROM Product LIMIT 3;"
+    # "# Time" é o fim do statement: início = Time - Query_time
+    assert entries[1]["t"] - entries[0]["t"] == pytest.approx(1.0 + 0.5 - 0.25)
+    assert skipped == {"not a read": 1, "other database": 1}
+
+
+def test_profiler():
+    pytest.importorskip("bson")
+    pipeline = [{"$match": {"order_id": {"$exists": True}}}, {"$limit": 1}]
+    catalog = {pipeline_key("orders", pipeline): "T-R2_single_order"}
+    t0 = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    docs = [
+        {"op": "getmore", "ns": "ecommerce.orders", "command": {"getMore": 77},
+         "millis": 3, "nreturned": 2, "cursorid": 77, "cursorExhausted": True,
+         "ts": t0 + timedelta(milliseconds=10)},
+        {"op": "command", "ns": "ecommerce.orders",
+         "command": {"aggregate": "orders", "pipeline": pipeline, "lsid": {"id": "A"}},
+         "millis": 5, "nreturned": 1, "cursorid": 77, "ts": t0},
+        {"op": "query", "ns": "ecommerce.orders",
+         "command": {"find": "orders", "filter": {"x": {"$gt": 1}}, "limit": 5, "lsid": {"id": "B"}},
+         "millis": 2, "nreturned": 5, "ts": t0 + timedelta(seconds=1)},
+        {"op": "getmore", "ns": "ecommerce.orders", "command": {"getMore": 99},
+         "millis": 1, "nreturned": 1, "cursorid": 99, "ts": t0 + timedelta(seconds=2)},
+        {"op": "insert", "ns": "ecommerce.orders", "command": {"insert": "orders"},
+         "millis": 1, "ts": t0 + timedelta(seconds=2)},
+        {"op": "command", "ns": "other.x", "command": {"aggregate": "x", "pipeline": []},
+         "millis": 1, "ts": t0},
+    ]
+
+    entries, skipped = import_profile(docs, "ecommerce", catalog)
+
+    first, second = entries
+    assert first["task"] == "T-R2_single_order"
+    # getMore somado ao aggregate que abriu o cursor
+    assert (first["time_ms"], first["rows"]) == (8, 3)
+    assert first["t"] == pytest.approx(t0.timestamp() - 0.005)
+    assert second["task"] is None
+    assert second["collection"] == "orders"
+    assert second["pipeline"] == [{"$match": {"x": {"$gt": 1}}}, {"$limit": 5}]
+    assert (first["client"], second["client"]) == (0, 1)
+    assert skipped == {
+        "other namespace": 1,
+        "getMore without its command": 1,
+        "insert not replayed": 1,
+    }
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# wire_protocol.py
+# Perfis de protocolo cliente/servidor (dimensão de experimento) e bytes
+# transferidos por run
+#
+# fetch_size=None usa o Cursor padrão: o resultado inteiro é lido para a
+# memória do cliente no execute. Com fetch_size=N usa SSCursor (sem buffer,
+# as linhas vêm do servidor conforme são lidas) e busca em lotes de N com
+# fetchmany.
+#
+# Compressão do protocolo não entra nos perfis: o PyMySQL não a implementa
+# (compress=True levanta NotImplementedError).
+
+import pymysql
+
+DEFAULT_PROTOCOL = "default"
+
+PROTOCOLS = {
+    "default": {"fetch_size": None},
+    "stream_1k": {"fetch_size": 1_000},
+    "stream_10k": {"fetch_size": 10_000},
+    "stream_100k": {"fetch_size": 100_000},
+}
+
+STREAM_FETCH_SIZE = 10_000
+
+
+# ================================
+# CURSOR / LEITURA
+# ================================
+
+def cursor_class(protocol):
+    if protocol.get("fetch_size"):
+        return pymysql.cursors.SSCursor
+    return pymysql.cursors.Cursor
+
+
+def streaming(protocol):
+    """
+    O perfil com leitura sem buffer: perfis sem fetch_size passam a ler em
+    lotes de STREAM_FETCH_SIZE (usado quando só uma amostra do resultado é
+    guardada e o resultado inteiro não deve ficar em memória).
+    """
+    if protocol.get("fetch_size"):
+        return protocol
+    return {**protocol, "fetch_size": STREAM_FETCH_SIZE}
+
+
+def iter_batches(cur, protocol):
+    size = protocol.get("fetch_size")
+    if not size:
+        yield cur.fetchall()
+        return
+    while True:
+        batch = cur.fetchmany(size)
+        if not batch:
+            return
+        yield batch
+
+
+def fetch_all(cur, protocol):
+    size = protocol.get("fetch_size")
+    if not size:
+        return cur.fetchall()
+    rows = []
+    while True:
+        batch = cur.fetchmany(size)
+        if not batch:
+            return rows
+        rows.extend(batch)
+
+
+# ================================
+# BYTES NO FIO
+# ================================
+
+def session_bytes_sent(cur):
+    cur.execute("SHOW SESSION STATUS LIKE 'Bytes_sent'")
+    return int(cur.fetchone()[1])
+
+
+class BytesSentCounter:
+    """
+    Bytes_sent da sessão (servidor -> cliente) desde a criação, sem contar a
+    resposta do próprio SHOW STATUS. `cur` precisa ser um cursor bufferizado
+    da mesma conexão.
+    """
+
+    def __init__(self, cur):
+        self.cur = cur
+        first = session_bytes_sent(cur)
+        self.start = session_bytes_sent(cur)
+        self.overhead = self.start - first
+
+    def delta(self):
+        return session_bytes_sent(self.cur) - self.start - self.overhead
@@ -1,11 +1,28 @@
 # -*- coding: utf-8 -*-
 
+from task_registry import TaskRegistry
+
 # ================================
 # CONFIGURAÇÃO GERAL
 # ================================
 
 DEFAULT_RUNS_PER_TASK = 5
-TASK_RUNS = {}
+DEFAULT_SPLIT_WORKERS = 4
+
+# Limite por statement (MAX_EXECUTION_TIME); `timeout_ms` da task sobrescreve
+DEFAULT_TIMEOUT_MS = 30 * 60 * 1000
+# Retries de erros transitórios (conexão, deadlock), com backoff exponencial
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_S = 2.0
+
+# Todas as tasks abaixo são registradas aqui. Metadados por task:
+#   tags, runs, params, expected_rows, timeout_ms, equivalent (task gêmea no MongoDB),
+#   base_task (variante comparada com outra task), split (split_scan.py),
+#   sample (amostra do resultado com --sample, result_sample.py),
+#   default=False (só roda com --only / --tag / flag da variante)
+# Reescritas equivalentes de uma task: @REGISTRY.rewrite(task, nome), executadas
+# com --rewrites como <task>_<nome> e conferidas contra o resultado da original
+REGISTRY = TaskRegistry()
 
 # ================================
 # RESOLUÇÃO DO NOME DO DATABASE
@@ -24,7 +41,25 @@ def resolve_database_name(sf: int) -> str:
 # ================================
 # T-R1 – Desnormalizado + Scans
 # ================================
-SQL_TR1_ORDER_SCAN = """
+@REGISTRY.task(
+    "T-R1_denorm_scan",
+    tags=("T-R1", "scan", "aggregate"),
+    expected_rows=1,
+    equivalent="M1_TR1_denormalized_scan",
+    split={
+        "table": "`Order`",
+        "key": "order_id",
+        "sql": """
+            SELECT SUM(o.total_price) AS total_revenue,
+            COUNT(*) AS num_orderes FROM `Order` o
+            WHERE o.total_price > 0
+              AND o.order_id >= %s AND o.order_id < %s;
+        """,
+        "merge": {"total_revenue": "sum", "num_orderes": "sum"},
+    },
+)
+def tr1_order_scan():
+    return """
 SELECT SUM(o.total_price) AS total_revenue,
 COUNT(*) AS num_orderes FROM `Order` o WHERE o.total_price > 0;
 """
@@ -32,21 +67,62 @@ COUNT(*) AS num_orderes FROM `Order` o WHERE o.total_price > 0;
 # ================================
 # T-R2 – Documento-centric CRUD
 # ================================
-SQL_TR2_SINGLE_ORDER = """
+@REGISTRY.task(
+    "T-R2_single_order",
+    tags=("T-R2", "lookup"),
+    expected_rows=1,
+    equivalent="M2_TR2_single_order_lookup",
+)
+def tr2_single_order():
+    return """
 SELECT
     o.order_id,
     o.customer_id,
     o.total_price
 FROM `Order` o
 WHERE o.order_id = (
-    SELECT order_id FROM `Order` LIMIT 1
+    SELECT order_id FROM `Order` ORDER BY order_id LIMIT 1
+);
+"""
+
+
+@REGISTRY.rewrite("T-R2_single_order", "join_derived")
+def tr2_single_order_join_derived():
+    """Subquery escalar como tabela derivada no JOIN."""
+    return """
+SELECT
+    o.order_id,
+    o.customer_id,
+    o.total_price
+FROM (SELECT order_id FROM `Order` ORDER BY order_id LIMIT 1) first_order
+JOIN `Order` o ON o.order_id = first_order.order_id;
+"""
+
+
+@REGISTRY.rewrite("T-R2_single_order", "in_semijoin")
+def tr2_single_order_in_semijoin():
+    """IN sobre a derivada (LIMIT não é aceito direto em subquery IN)."""
+    return """
+SELECT
+    o.order_id,
+    o.customer_id,
+    o.total_price
+FROM `Order` o
+WHERE o.order_id IN (
+    SELECT order_id FROM (SELECT order_id FROM `Order` ORDER BY order_id LIMIT 1) first_order
 );
 """
 
 # ================================
 # T-R3 – Normalizado + Joins
 # ================================
-SQL_TR3_PRODUCT_REVENUE = """
+@REGISTRY.task(
+    "T-R3_join_revenue",
+    tags=("T-R3", "aggregate", "group-by"),
+    equivalent="M3_TR3_join_like_unwind",
+)
+def tr3_product_revenue():
+    return """
 SELECT
     product_id,
     SUM(price) AS total_revenue
@@ -58,23 +134,148 @@ ORDER BY total_revenue DESC;
 # ================================
 # T-R4 – Normalizado + Índices
 # ================================
-SQL_TR4_PRODUCT_FILTER = """
+@REGISTRY.task(
+    "T-R4_index_filter",
+    tags=("T-R4", "index", "join"),
+    equivalent="M4_TR4_filter_by_product",
+)
+def tr4_product_filter():
+    return """
 SELECT DISTINCT
     o.order_id
 FROM Order_line ol
 JOIN `Order` o ON o.order_id = ol.order_id
 WHERE ol.product_id = (
-    SELECT product_id FROM Product LIMIT 1
+    SELECT product_id FROM Product ORDER BY product_id LIMIT 1
+);
+"""
+
+
+@REGISTRY.rewrite("T-R4_index_filter", "exists")
+def tr4_product_filter_exists():
+    """Semi-join com EXISTS: para no primeiro item do pedido, sem DISTINCT."""
+    return """
+SELECT
+    o.order_id
+FROM `Order` o
+WHERE EXISTS (
+    SELECT 1
+    FROM Order_line ol
+    WHERE ol.order_id = o.order_id
+      AND ol.product_id = (SELECT product_id FROM Product ORDER BY product_id LIMIT 1)
+);
+"""
+
+
+@REGISTRY.rewrite("T-R4_index_filter", "in_semijoin")
+def tr4_product_filter_in():
+    """Semi-join com IN: o otimizador escolhe entre materialização e loose scan."""
+    return """
+SELECT
+    o.order_id
+FROM `Order` o
+WHERE o.order_id IN (
+    SELECT ol.order_id
+    FROM Order_line ol
+    WHERE ol.product_id = (SELECT product_id FROM Product ORDER BY product_id LIMIT 1)
 );
 """
 
 # ================================
-# DEFINIÇÃO DAS TASKS
+# PRÉ-AGREGAÇÃO (materialized_views.py)
 # ================================
-TASK_DEFINITIONS = [
-    ("T-R1_denorm_scan", SQL_TR1_ORDER_SCAN),
-    ("T-R2_single_order", SQL_TR2_SINGLE_ORDER),
-    ("T-R3_join_revenue", SQL_TR3_PRODUCT_REVENUE),
-    ("T-R4_index_filter", SQL_TR4_PRODUCT_FILTER),
-]
+# Tag "materialized": executadas com --materialized, lado a lado com as tasks base
+
+@REGISTRY.task(
+    "T-R1_denorm_scan_mv",
+    tags=("T-R1", "materialized"),
+    expected_rows=1,
+    equivalent="M1_TR1_denormalized_scan_mv",
+    base_task="T-R1_denorm_scan",
+    default=False,
+)
+def tr1_order_scan_mv():
+    return """
+SELECT total_revenue,
+num_orders AS num_orderes FROM mv_order_totals WHERE id = 1;
+"""
+
+
+@REGISTRY.task(
+    "T-R3_join_revenue_mv",
+    tags=("T-R3", "materialized"),
+    equivalent="M3_TR3_join_like_unwind_mv",
+    base_task="T-R3_join_revenue",
+    default=False,
+)
+def tr3_product_revenue_mv():
+    return """
+SELECT
+    product_id,
+    total_revenue
+FROM mv_product_revenue
+ORDER BY total_revenue DESC;
+"""
+
 
+@REGISTRY.task(
+    "T-R5_orders_per_customer",
+    tags=("T-R5", "aggregate", "group-by", "materialized"),
+    equivalent="M5_TR5_orders_per_customer",
+    default=False,
+)
+def tr5_orders_per_customer():
+    return """
+SELECT
+    o.customer_id,
+    COUNT(*) AS total_orders
+FROM `Order` o
+GROUP BY o.customer_id;
+"""
+
+
+@REGISTRY.task(
+    "T-R5_orders_per_customer_mv",
+    tags=("T-R5", "materialized"),
+    equivalent="M5_TR5_orders_per_customer_mv",
+    base_task="T-R5_orders_per_customer",
+    default=False,
+)
+def tr5_orders_per_customer_mv():
+    return """
+SELECT
+    customer_id,
+    total_orders
+FROM mv_customer_orders;
+"""
+
+# ================================
+# SPLIT SCAN (split_scan.py)
+# ================================
+# Tasks com `split` ganham a variante <task>_split<N> com --split-scan N:
+# a faixa de `key` é dividida em N partes, cada parte roda em um processo
+# com sua própria conexão e os resultados são combinados por `merge`
+# (None = scan de linhas, soma só a contagem). O SQL recebe [lo, hi).
+
+# Scan de linhas single-stream, base de T-R1_order_rows_scan_split<N>
+@REGISTRY.task(
+    "T-R1_order_rows_scan",
+    tags=("T-R1", "scan", "split-scan"),
+    equivalent="M1_TR1_order_docs_scan",
+    default=False,
+    split={
+        "table": "`Order`",
+        "key": "order_id",
+        "sql": """
+            SELECT o.order_id, o.customer_id, o.total_price
+            FROM `Order` o
+            WHERE o.order_id >= %s AND o.order_id < %s;
+        """,
+        "merge": None,
+    },
+)
+def tr1_order_rows_scan():
+    return """
+SELECT o.order_id, o.customer_id, o.total_price
+FROM `Order` o;
+"""
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# workload_trace.py
+# Trace do workload: a sequência de invocações de tasks com o instante de
+# cada uma, gravada pelo runner (--trace) ou importada dos logs do servidor,
+# para ser reexecutada pelo experiments_latest/workload_replay.py
+#
+# JSON lines, uma invocação por linha, em ordem de t:
+#   {"event": "trace", "context": {...}}          1ª linha: engine, sf, database,
+#                                                 source (run, general_log,
+#                                                 slow_log, profiler) e latency
+#                                                 (client, server ou None)
+#   {"event": "query", "t": s, "task": ...,       s = segundos desde o início;
+#    "params": {...}, "client": n,                time_ms/rows da execução
+#    "time_ms": ..., "rows": ..., "status": ...}  original (None se o log não tem)
+# Variantes (protocolo, split, reescrita) levam também "base_task". Statements
+# importados que não casam com nenhuma task têm task None e o texto cru:
+# "sql" (MySQL) ou "collection" + "pipeline" (MongoDB, Extended JSON).
+
+import os
+import json
+import time
+import threading
+
+TRACE_FILE = "workload_trace.jsonl"
+
+
+# ================================
+# LEITURA
+# ================================
+
+def _valid_length(path):
+    """Tamanho do trace até a última linha completa."""
+    valid = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid += len(line)
+    return valid
+
+
+def read_trace(path):
+    """
+    (context, invocações em ordem de t). Uma última linha cortada é ignorada;
+    num trace continuado com --resume vale o contexto da 1ª linha.
+    """
+    context = None
+    queries = []
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            entry = json.loads(line)
+            if entry["event"] == "trace":
+                if context is None:
+                    context = entry["context"]
+            elif entry["event"] == "query":
+                queries.append(entry)
+    queries.sort(key=lambda q: q["t"])
+    return context or {}, queries
+
+
+# ================================
+# ESCRITA
+# ================================
+
+def write_trace(path, context, queries):
+    """Grava um trace inteiro (importação de logs); t relativo à 1ª invocação."""
+    queries = sorted(queries, key=lambda q: q["t"])
+    zero = queries[0]["t"] if queries else 0.0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"event": "trace", "context": context}, default=str) + "\n")
+        for query in queries:
+            entry = {"event": "query", **query, "t": round(query["t"] - zero, 6)}
+            f.write(json.dumps(entry, default=str) + "\n")
+    return path
+
+
+class TraceRecorder:
+    """
+    Grava as invocações de uma execução do runner conforme terminam (flush a
+    cada linha; runs de clientes concorrentes escrevem no mesmo arquivo). t é
+    o início da invocação no relógio monotônico, desde a criação do recorder.
+
+    Com resume=True um trace existente é continuado: as novas invocações
+    começam logo depois da última já gravada.
+    """
+
+    def __init__(self, path, context, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offset = 0.0
+        if resume and os.path.exists(path) and _valid_length(path) > 0:
+            _, previous = read_trace(path)
+            self._offset = max((q["t"] for q in previous), default=0.0)
+            os.truncate(path, _valid_length(path))
+            self._fh = open(path, "a", encoding="utf-8")
+        else:
+            self._fh = open(path, "w", encoding="utf-8")
+            self._write({
+                "event": "trace",
+                "context": {**context, "source": "run", "latency": "client"},
+            })
+        self._zero = time.perf_counter()
+
+    def _write(self, entry):
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+
+    def record(self, task, started, time_ms=None, rows=None, client=0,
+               params=None, base_task=None):
+        """
+        started: time.perf_counter() no início da invocação (antes dos
+        retries). Sem time_ms a invocação é registrada como falha.
+        """
+        entry = {
+            "event": "query",
+            "t": round(self._offset + started - self._zero, 6),
+            "task": task,
+            "params": params or {},
+            "client": client,
+            "time_ms": time_ms,
+            "rows": rows,
+            "status": "ok" if time_ms is not None else "failed",
+        }
+        if base_task:
+            entry["base_task"] = base_task
+        self._write(entry)
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
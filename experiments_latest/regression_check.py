@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# regression_check.py
+# Base histórica (SQLite) dos tempos por run e detecção de regressões
+#
+# Uso:
+#   # grava os *_runs.csv de uma execução na base
+#   python regression_check.py record --outputs koupil_tests/mysql/outputs/sf10
+#
+#   # compara uma execução nova com a base (exit code 1 se houver regressão)
+#   python regression_check.py check --outputs koupil_tests/mysql/outputs/sf10 --threshold 0.10
+#
+# Os runs de `check` não são gravados; rode `record` depois se a execução
+# deve passar a fazer parte da base.
+#
+# Só entram na comparação execuções da base cujo environment_fingerprint.json
+# é compatível com o da execução checada (mesma versão de servidor, cache,
+# contagem de linhas, índices e nº de CPUs do cliente).
+
+import os
+import re
+import sys
+import glob
+import json
+import math
+import socket
+import sqlite3
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from statistics import NormalDist, median
+
+import pandas as pd
+
+from environment_compat import load_fingerprint, incompatibilities
+
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_runs.sqlite")
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_ALPHA = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    execution_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    sf INTEGER NOT NULL,
+    database_name TEXT,
+    outputs_dir TEXT NOT NULL,
+    label TEXT,
+    hostname TEXT,
+    platform TEXT,
+    cpu_count INTEGER,
+    python_version TEXT,
+    git_commit TEXT,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    execution_id INTEGER NOT NULL REFERENCES executions(execution_id),
+    task TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    time_ms REAL NOT NULL,
+    rows INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_task ON runs(task);
+CREATE INDEX IF NOT EXISTS idx_executions_key ON executions(engine, sf);
+"""
+
+
+# ============================================================
+# Leitura de uma pasta de outputs
+# ============================================================
+
+def _read_summary(outputs_dir):
+    paths = sorted(glob.glob(os.path.join(outputs_dir, "workload_summary*.csv")))
+    paths += sorted(glob.glob(os.path.join(outputs_dir, "summary.csv")))
+    return pd.read_csv(paths[0]) if paths else None
+
+
+def infer_execution(outputs_dir, engine=None, sf=None):
+    """engine / sf / database a partir do resumo ou do nome da pasta."""
+    summary = _read_summary(outputs_dir)
+    database = None
+
+    if summary is not None and not summary.empty:
+        if engine is None:
+            if "engine" in summary.columns:
+                engine = str(summary["engine"].iloc[0])
+            elif "collection" in summary.columns:
+                engine = "mongodb"
+        if sf is None and "sf" in summary.columns:
+            sf = int(summary["sf"].iloc[0])
+        if "database" in summary.columns:
+            database = str(summary["database"].iloc[0])
+
+    if sf is None:
+        match = re.search(r"sf(\d+)", os.path.basename(os.path.normpath(outputs_dir)))
+        if match:
+            sf = int(match.group(1))
+    if engine is None:
+        engine = "mysql"
+    if sf is None:
+        raise SystemExit(f"Could not infer SF for {outputs_dir}; pass --sf")
+    return engine, sf, database
+
+
+def read_runs(outputs_dir):
+    """
+    Junta todos os <task>_runs.csv. Aceita os dois formatos do repositório:
+    run,time_ms,rows (runners atuais) e run,rows,elapsed_ms (relational_tests).
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(outputs_dir, "*_runs.csv"))):
+        task = os.path.basename(path)[: -len("_runs.csv")]
+        df = pd.read_csv(path)
+        if "time_ms" not in df.columns and "elapsed_ms" in df.columns:
+            df = df.rename(columns={"elapsed_ms": "time_ms"})
+        if "time_ms" not in df.columns:
+            continue
+        if "status" in df.columns:
+            # runs que falharam (timeout, erro) não têm tempo
+            df = df[df["status"] == "ok"].copy()
+        df["task"] = task
+        if "rows" not in df.columns:
+            df["rows"] = None
+        frames.append(df[["task", "run", "time_ms", "rows"]])
+    if not frames:
+        raise SystemExit(f"No *_runs.csv files found in {outputs_dir}")
+    return pd.concat(frames, ignore_index=True)
+
+
+# ============================================================
+# Ambiente
+# ============================================================
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_metadata():
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "python_version": platform.python_version(),
+        "git_commit": _git_commit(),
+    }
+
+
+# ============================================================
+# Base SQLite
+# ============================================================
+
+def open_store(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(executions)")}
+    if "fingerprint" not in columns:
+        conn.execute("ALTER TABLE executions ADD COLUMN fingerprint TEXT")
+    return conn
+
+
+def record_execution(conn, outputs_dir, engine, sf, database, runs, label=None):
+    meta = environment_metadata()
+    fingerprint = load_fingerprint(outputs_dir)
+    cur = conn.execute(
+        "INSERT INTO executions (recorded_at, engine, sf, database_name, outputs_dir, label, "
+        "hostname, platform, cpu_count, python_version, git_commit, fingerprint) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            datetime.now().isoformat(timespec="seconds"), engine, sf, database,
+            os.path.abspath(outputs_dir), label,
+            meta["hostname"], meta["platform"], meta["cpu_count"],
+            meta["python_version"], meta["git_commit"],
+            json.dumps(fingerprint) if fingerprint else None,
+        ),
+    )
+    execution_id = cur.lastrowid
+    conn.executemany(
+        "INSERT INTO runs (execution_id, task, run, time_ms, rows) VALUES (?, ?, ?, ?, ?)",
+        [
+            (execution_id, r.task, int(r.run), float(r.time_ms),
+             None if pd.isna(r.rows) else int(r.rows))
+            for r in runs.itertuples(index=False)
+        ],
+    )
+    conn.commit()
+    return execution_id
+
+
+def compatible_executions(conn, engine, sf, fingerprint, last_executions=None):
+    """
+    Execuções da base (engine, sf) comparáveis com `fingerprint`.
+    fingerprint=None desliga a checagem de ambiente.
+    Retorna (ids, [(id, motivos), ...] das excluídas).
+    """
+    sql = "SELECT execution_id, fingerprint FROM executions WHERE engine = ? AND sf = ? ORDER BY execution_id DESC"
+    params = [engine, sf]
+    if last_executions:
+        sql += " LIMIT ?"
+        params.append(last_executions)
+
+    ids, excluded = [], []
+    for execution_id, stored in conn.execute(sql, params):
+        if fingerprint is None:
+            ids.append(execution_id)
+        elif stored is None:
+            excluded.append((execution_id, ["no environment fingerprint recorded"]))
+        else:
+            diffs = incompatibilities(fingerprint, json.loads(stored))
+            if diffs:
+                excluded.append((execution_id, diffs))
+            else:
+                ids.append(execution_id)
+    return ids, excluded
+
+
+def baseline_samples(conn, task, execution_ids):
+    if not execution_ids:
+        return []
+    sql = (
+        "SELECT time_ms FROM runs WHERE task = ? AND execution_id IN ("
+        + ", ".join("?" * len(execution_ids)) + ")"
+    )
+    return [row[0] for row in conn.execute(sql, [task] + list(execution_ids))]
+
+
+# ============================================================
+# Mann-Whitney U (unilateral: atual mais lento que a base)
+# ============================================================
+
+def _exact_u_cdf(n1, n2):
+    """Distribuição exata de U sem empates (contagem por recorrência)."""
+    # counts[i][j][u] = nº de arranjos com i elementos de x, j de y e estatística u
+    max_u = n1 * n2
+    prev = [[1] + [0] * max_u for _ in range(n2 + 1)]  # i = 0
+    for i in range(1, n1 + 1):
+        cur = [[0] * (max_u + 1) for _ in range(n2 + 1)]
+        cur[0][0] = 1
+        for j in range(1, n2 + 1):
+            for u in range(max_u + 1):
+                # último elemento vem de x (maior que os j de y) ou de y
+                from_x = prev[j][u - j] if u >= j else 0
+                cur[j][u] = from_x + cur[j - 1][u]
+        prev = cur
+    counts = prev[n2]
+    total = sum(counts)
+    return [c / total for c in counts]
+
+
+def mann_whitney_greater(current, baseline):
+    """
+    H1: valores de `current` tendem a ser maiores que os de `baseline`.
+    Retorna (U, p-valor). Usa a distribuição exata para amostras pequenas
+    sem empates e a aproximação normal (com correção de empates) no resto.
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted(
+        [(v, 0) for v in current] + [(v, 1) for v in baseline],
+        key=lambda t: t[0],
+    )
+
+    # ranks médios
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = avg_rank
+        size = j - i + 1
+        tie_term += size ** 3 - size
+        i = j + 1
+
+    r1 = sum(r for r, (_, group) in zip(ranks, combined) if group == 0)
+    u = r1 - n1 * (n1 + 1) / 2
+
+    if tie_term == 0 and n1 * n2 <= 400:
+        dist = _exact_u_cdf(n1, n2)
+        p = sum(dist[int(u):])
+        return u, min(1.0, p)
+
+    n = n1 + n2
+    mean_u = n1 * n2 / 2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var_u <= 0:
+        return u, 1.0
+    z = (u - mean_u - 0.5) / math.sqrt(var_u)
+    return u, 1 - NormalDist().cdf(z)
+
+
+# ============================================================
+# Comparação
+# ============================================================
+
+def check_execution(conn, engine, sf, runs, threshold, alpha, execution_ids):
+    rows = []
+    for task, group in runs.groupby("task", sort=True):
+        current = group["time_ms"].tolist()
+        baseline = baseline_samples(conn, task, execution_ids)
+
+        row = {
+            "task": task,
+            "engine": engine,
+            "sf": sf,
+            "current_runs": len(current),
+            "baseline_runs": len(baseline),
+            "current_median_ms": round(median(current), 2),
+            "baseline_median_ms": None,
+            "median_change": None,
+            "u_statistic": None,
+            "p_value": None,
+            "status": "no_baseline",
+        }
+
+        if len(baseline) >= 2 and len(current) >= 2:
+            base_median = median(baseline)
+            change = (median(current) - base_median) / base_median if base_median > 0 else 0.0
+            u, p = mann_whitney_greater(current, baseline)
+            regressed = p < alpha and change > threshold
+            row.update({
+                "baseline_median_ms": round(base_median, 2),
+                "median_change": round(change, 4),
+                "u_statistic": u,
+                "p_value": round(p, 5),
+                "status": "REGRESSION" if regressed else "ok",
+            })
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Baseline store and regression check for workload runs")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="SQLite baseline file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in [("record", "Add an outputs directory to the baseline"),
+                            ("check", "Compare an outputs directory against the baseline")]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--outputs", required=True, help="Directory with *_runs.csv (e.g. outputs/sf10)")
+        p.add_argument("--engine", help="mysql / mongodb (inferred from the summary when omitted)")
+        p.add_argument("--sf", type=int, help="Scale factor (inferred when omitted)")
+        if name == "record":
+            p.add_argument("--label", help="Free-text label stored with the execution")
+        else:
+            p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                           help="Minimum relative median slowdown to flag (0.10 = 10%%)")
+            p.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                           help="Significance level of the Mann-Whitney test")
+            p.add_argument("--last", type=int, default=None,
+                           help="Only compare against the last N recorded executions")
+            p.add_argument("--tasks", nargs="*", help="Restrict the check to these tasks")
+            p.add_argument("--ignore-environment", action="store_true",
+                           help="Compare even without/with incompatible environment fingerprints")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    engine, sf, database = infer_execution(args.outputs, args.engine, args.sf)
+    runs = read_runs(args.outputs)
+    conn = open_store(args.store)
+
+    try:
+        if args.command == "record":
+            execution_id = record_execution(conn, args.outputs, engine, sf, database, runs, args.label)
+            print(f"Recorded execution {execution_id}: {engine} SF{sf}, "
+                  f"{runs['task'].nunique()} tasks, {len(runs)} runs -> {args.store}")
+            return 0
+
+        fingerprint = None
+        if not args.ignore_environment:
+            fingerprint = load_fingerprint(args.outputs)
+            if fingerprint is None:
+                print(f"Refusing to compare: no environment fingerprint in {args.outputs} "
+                      f"(use --ignore-environment to compare anyway)")
+                return 2
+
+        execution_ids, excluded = compatible_executions(conn, engine, sf, fingerprint, args.last)
+        for execution_id, reasons in excluded:
+            print(f"Skipping baseline execution {execution_id} (incompatible environment):")
+            for reason in reasons:
+                print(f"  {reason}")
+        if not execution_ids and excluded:
+            print("Refusing to compare: no baseline execution has a compatible environment")
+            return 2
+
+        if args.tasks:
+            runs = runs[runs["task"].isin(args.tasks)]
+        report = check_execution(conn, engine, sf, runs, args.threshold, args.alpha, execution_ids)
+        print(report.to_string(index=False))
+
+        report_csv = os.path.join(args.outputs, "regression_check.csv")
+        report.to_csv(report_csv, index=False)
+        print(f"\nReport saved to: {report_csv}")
+
+        regressions = report[report["status"] == "REGRESSION"]
+        if not regressions.empty:
+            print(f"\n{len(regressions)} task(s) regressed: {', '.join(regressions['task'])}")
+            return 1
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# results_index.py
+# Índice de todos os CSVs de resultados do repositório, com cache
+#
+# Varre a árvore uma vez e classifica cada CSV das pastas de resultados:
+#   outputs_sf<SF>[_<variante>]/, outputs/sf<SF>[_<variante>]/ e diretórios de
+#   sweep <engine>/sf<S>_c<N>[_r<K>]/  -> uma execução
+#   resultados*/, resumo*/              -> resumos consolidados (<nome>_sf<SF>.csv)
+# Chave de cada arquivo: experimento (caminho da árvore até a pasta de
+# outputs), engine, SF, variante, tipo (summary / runs / result) e task.
+#
+# Os frames já tipados de summary e runs ficam no cache (pickle na raiz do
+# repositório) junto com mtime/tamanho do arquivo; na próxima abertura só os
+# CSVs alterados são relidos. Os result (saída das queries, podem ser grandes)
+# são lidos sob demanda.
+#
+# Uso (notebook):
+#   from results_index import ResultsIndex
+#   idx = ResultsIndex()
+#   idx.files(engine="mongodb")                       # o índice
+#   idx.load("summary", sf=[1, 10], consolidated=False)
+#   idx.load("runs", experiment="teste2", task="Q5_orders_without_expensive_items")
+#
+# Uso (linha de comando):
+#   python results_index.py                           # contagem por experimento/engine/tipo
+#   python results_index.py --kind runs --engine mysql --sf 10 --csv runs_sf10.csv
+#   python results_index.py --rebuild
+
+import os
+import re
+import pickle
+import argparse
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.dirname(HERE)
+
+CACHE_FILE = ".results_index.pkl"
+# muda quando o formato dos frames em cache muda
+CACHE_VERSION = 2
+
+KINDS = ("summary", "runs", "result")
+
+# ============================================================
+# Classificação dos arquivos
+# ============================================================
+
+RUN_DIR_RE = re.compile(r"^(?:outputs_)?sf(\d+)(?:_(.+))?$")
+CONSOLIDATED_DIR_RE = re.compile(r"^(?:resultados|resumo)", re.IGNORECASE)
+FILE_SF_RE = re.compile(r"_sf(\d+)\.csv$")
+MONGO_PATH_RE = re.compile(r"mongo|document", re.IGNORECASE)
+# multimodel_tests/outputs/sf<SF>_<engine>: a engine vem no lugar da variante
+MODEL_ENGINES = ("graph", "kv")
+
+SKIP_DIRS = {".git", "__pycache__", "cluster", ".venv", "venv", "node_modules"}
+
+META_COLUMNS = ["experiment", "engine", "sf", "variant", "consolidated", "source"]
+
+
+def _experiment(parts):
+    """Caminho até a pasta de outputs, sem o próprio "outputs"."""
+    if parts and parts[-1] == "outputs":
+        parts = parts[:-1]
+    return "/".join(parts) or "."
+
+
+def classify(relpath):
+    """
+    Metadados de um CSV de resultados (caminho relativo à raiz, com "/"), ou
+    None se o arquivo não está numa pasta de resultados.
+    """
+    parts = relpath.split("/")
+    dirname, filename = parts[-2] if len(parts) > 1 else "", parts[-1]
+
+    run_dir = RUN_DIR_RE.match(dirname)
+    if run_dir:
+        sf, variant, consolidated = int(run_dir.group(1)), run_dir.group(2), False
+    elif CONSOLIDATED_DIR_RE.match(dirname):
+        match = FILE_SF_RE.search(filename)
+        sf, variant, consolidated = (int(match.group(1)) if match else None), None, True
+    else:
+        return None
+
+    stem = filename[: -len(".csv")]
+    if stem.startswith(("summary", "workload_summary")):
+        kind, task = "summary", None
+    elif stem.endswith("_runs"):
+        kind, task = "runs", stem[: -len("_runs")]
+    else:
+        kind, task = "result", stem[: -len("_result")] if stem.endswith("_result") else stem
+
+    engine = "mongodb" if MONGO_PATH_RE.search(relpath) else "mysql"
+    if variant:
+        head, _, rest = variant.partition("_")
+        if head in MODEL_ENGINES:
+            engine, variant = head, rest or None
+
+    return {
+        "experiment": _experiment(parts[:-2]),
+        "engine": engine,
+        "sf": sf,
+        "variant": variant,
+        "consolidated": consolidated,
+        "kind": kind,
+        "task": task,
+        "source": relpath,
+    }
+
+
+def scan(root):
+    """{relpath: (mtime_ns, size)} de todos os CSVs da árvore."""
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if name.endswith(".csv"):
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                found[os.path.relpath(path, root).replace(os.sep, "/")] = (st.st_mtime_ns, st.st_size)
+    return found
+
+
+# ============================================================
+# Frames tipados
+# ============================================================
+
+# Nomes antigos -> atuais (relational_tests / teste2 antes do run_log)
+RENAMES = {
+    "runs": {"elapsed_ms": "time_ms"},
+    "summary": {"avg_ms": "avg_time_ms", "example_rows": "result_rows"},
+}
+
+INT_COLUMNS = {
+    "run", "client", "rows", "wire_bytes", "attempts",
+    "runs_configured", "runs_valid", "runs_failed", "retries", "result_rows",
+}
+# errors: "timeout:1;transient:2" (resumo do run_log)
+TEXT_COLUMNS = {
+    "task", "server", "status", "error_class", "error", "errors", "result_digest", "database",
+    "collection", "collection_or_table", "equivalent_task", "base_task", "protocol",
+    "rewrite_of", "layout",
+}
+
+
+def typed(df, kind):
+    """Nomes e tipos uniformes: inteiros anuláveis, texto como string, o resto float."""
+    df = df.rename(columns=RENAMES.get(kind, {}))
+    for column in df.columns:
+        if column in INT_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        elif column in TEXT_COLUMNS:
+            df[column] = df[column].astype("string")
+        elif column.endswith(("_ms", "_qps", "_bytes", "_vs_base")):
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    if kind == "runs" and "status" not in df.columns:
+        # formato anterior ao controle de erros: só runs bem-sucedidos
+        df["status"] = pd.Series("ok", index=df.index, dtype="string")
+    return df
+
+
+def read_frame(root, meta):
+    df = pd.read_csv(os.path.join(root, meta["source"]))
+    if meta["kind"] != "result":
+        df = typed(df, meta["kind"])
+    if meta["task"] is not None:
+        df.insert(0, "task", pd.Series(meta["task"], index=df.index, dtype="string"))
+    # o engine/SF da chave prevalece sobre colunas do próprio resumo
+    sf = meta["sf"]
+    if sf is None and "sf" in df.columns:
+        sf = pd.to_numeric(df["sf"], errors="coerce")
+    df = df.drop(columns=[c for c in META_COLUMNS if c in df.columns])
+    for position, column in enumerate(META_COLUMNS):
+        value = sf if column == "sf" else meta[column]
+        df.insert(position, column, value)
+    df["sf"] = df["sf"].astype("Int64")
+    for column in ("experiment", "engine", "variant", "source"):
+        df[column] = df[column].astype("string")
+    return df
+
+
+# ============================================================
+# Índice
+# ============================================================
+
+def _matches(value, wanted):
+    if wanted is None:
+        return True
+    if isinstance(wanted, (list, tuple, set)):
+        return value in wanted
+    return value == wanted
+
+
+class ResultsIndex:
+    """
+    Índice dos resultados sob `root` (padrão: raiz do repositório). O cache é
+    atualizado na criação e em refresh(): arquivos novos ou com mtime/tamanho
+    diferente são relidos, arquivos apagados saem do índice.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, cache_path=None, rebuild=False):
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path or os.path.join(self.root, CACHE_FILE)
+        self.entries = {} if rebuild else self._read_cache()
+        self.refresh()
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, "rb") as f:
+                cache = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return {}
+        if cache.get("version") != CACHE_VERSION or cache.get("root") != self.root:
+            return {}
+        return cache["entries"]
+
+    def _write_cache(self):
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(
+                {"version": CACHE_VERSION, "root": self.root, "entries": self.entries},
+                f, protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp, self.cache_path)
+
+    def refresh(self):
+        """Relê só o que mudou no disco; devolve o nº de arquivos relidos."""
+        found = scan(self.root)
+        changed = 0
+        for relpath in set(self.entries) - set(found):
+            del self.entries[relpath]
+            changed += 1
+        for relpath, stamp in found.items():
+            entry = self.entries.get(relpath)
+            if entry is not None and entry["stamp"] == stamp:
+                continue
+            meta = classify(relpath)
+            if meta is None:
+                continue
+            frame = None
+            if meta["kind"] != "result":
+                try:
+                    frame = read_frame(self.root, meta)
+                except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+                    print(f"WARNING {relpath}: not indexed ({e.__class__.__name__}: {e})")
+                    continue
+            self.entries[relpath] = {"stamp": stamp, "meta": meta, "frame": frame}
+            changed += 1
+        if changed:
+            self._write_cache()
+        return changed
+
+    def files(self, kind=None, **filters):
+        """
+        Uma linha por arquivo com a chave (experiment, engine, sf, variant,
+        consolidated, kind, task, source). Filtros aceitam valor ou lista.
+        """
+        rows = [
+            entry["meta"] for entry in self.entries.values()
+            if _matches(entry["meta"]["kind"], kind)
+            and all(_matches(entry["meta"][key], wanted) for key, wanted in filters.items()
+                    if not (key == "task" and entry["meta"]["task"] is None))
+        ]
+        columns = ["experiment", "engine", "sf", "variant", "consolidated", "kind", "task", "source"]
+        files = pd.DataFrame(rows, columns=columns)
+        files["sf"] = files["sf"].astype("Int64")
+        return files.sort_values(["experiment", "engine", "sf", "kind", "source"], ignore_index=True)
+
+    def load(self, kind, experiment=None, engine=None, sf=None, variant=None,
+             consolidated=None, task=None):
+        """
+        Frame único (tipado) com todos os arquivos do tipo que casam com os
+        filtros, prefixado pelas colunas da chave. Os resumos consolidados
+        repetem os das pastas de outputs: use consolidated=False para não
+        contar a mesma execução duas vezes.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        filters = {"experiment": experiment, "engine": engine, "variant": variant,
+                   "consolidated": consolidated, "task": task}
+        frames = []
+        for relpath in self.files(kind, **filters)["source"]:
+            entry = self.entries[relpath]
+            frame = entry["frame"] if entry["frame"] is not None else read_frame(self.root, entry["meta"])
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=META_COLUMNS + ["task"])
+        df = pd.concat(frames, ignore_index=True)
+        # SF e task filtrados por linha: resumos consolidados sem SF no nome
+        # e resumos (uma linha por task) não têm essas chaves no arquivo
+        if sf is not None:
+            df = df[df["sf"].isin(sf if isinstance(sf, (list, tuple, set)) else [sf])]
+        if task is not None:
+            df = df[df["task"].isin(task if isinstance(task, (list, tuple, set)) else [task])]
+        return df.reset_index(drop=True)
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Index and query every results CSV in the repository")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="Tree to scan (default: repository root)")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cache and re-read every file")
+    parser.add_argument("--kind", choices=KINDS, help="Load this kind of file instead of listing the index")
+    parser.add_argument("--experiment", nargs="+")
+    parser.add_argument("--engine", nargs="+")
+    parser.add_argument("--sf", type=int, nargs="+")
+    parser.add_argument("--task", nargs="+")
+    parser.add_argument("--consolidated", choices=["yes", "no"],
+                        help="Only consolidated summaries (yes) or only per-run output directories (no)")
+    parser.add_argument("--csv", help="Write the loaded frame to this CSV instead of printing it")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    index = ResultsIndex(args.root, rebuild=args.rebuild)
+    consolidated = None if args.consolidated is None else args.consolidated == "yes"
+
+    if args.kind is None:
+        files = index.files(experiment=args.experiment, engine=args.engine, sf=args.sf,
+                            consolidated=consolidated, task=args.task)
+        counts = files.groupby(["experiment", "engine", "kind"]).size().unstack(fill_value=0)
+        print(counts.to_string())
+        print(f"\n{len(files)} files indexed under {index.root}")
+        return
+
+    df = index.load(args.kind, experiment=args.experiment, engine=args.engine, sf=args.sf,
+                    consolidated=consolidated, task=args.task)
+    if args.csv:
+        df.to_csv(args.csv, index=False)
+        print(f"{len(df)} rows saved to: {args.csv}")
+    else:
+        print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
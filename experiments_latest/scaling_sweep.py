@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# scaling_sweep.py
+# Varre SF x clientes concorrentes com os runners, ajusta modelos de escala
+# e acha o ponto de saturação (joelho) de cada task em cada engine
+#
+# Para cada engine, SF e número de clientes N roda o runner com
+#   --sf S --clients N --runs N*R --output-dir <out>/<engine>/sf<S>_c<N>
+# e junta os workload_summary*.csv desses diretórios. Ajustes:
+#   - vazão x clientes: Universal Scalability Law
+#       X(N) = X1*N / (1 + sigma*(N-1) + kappa*N*(N-1)),  pico em N* = sqrt((1-sigma)/kappa)
+#   - joelho: ponto da curva de vazão mais distante da reta entre o primeiro
+#     e o último ponto medido (Kneedle)
+#   - latência x SF: lei de potência t = a*SF^b (b ~ 1: cresce linear com o volume)
+#   - vazão x réplicas de leitura (--replicas, diretórios sf<S>_c<N>_r<K>):
+#     speedup sobre o menor K e eficiência = speedup / (K / K_min)
+# Resultado único: <out>/scaling_results.json (pontos, ajustes e ambiente)
+#
+# Uso:
+#   python scaling_sweep.py --engine mysql mongodb --sf 1 10 --clients 1 2 4 8 16
+#   python scaling_sweep.py --sf 10 --clients 8 16 32 --replicas 0 1 2 3
+#   python scaling_sweep.py --out sweeps/sweep1 --fit-only
+
+import os
+import re
+import sys
+import json
+import math
+import argparse
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from environment_compat import load_fingerprint, incompatibilities
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ENGINES = {
+    "mysql": {
+        "dir": os.path.join(HERE, "koupil_tests", "mysql"),
+        "runner": "run_workload_mysql_sf.py",
+        "summary": "workload_summary.csv",
+    },
+    "mongodb": {
+        "dir": os.path.join(HERE, "..", "documents_tests"),
+        "runner": "run_workload_mongo.py",
+        "summary": "workload_summary_mongo.csv",
+    },
+}
+
+DEFAULT_SFS = [1, 10]
+DEFAULT_CLIENTS = [1, 2, 4, 8, 16, 32]
+DEFAULT_RUNS_PER_CLIENT = 5
+
+POINT_DIR_RE = re.compile(r"^sf(\d+)_c(\d+)(?:_r(\d+))?$")
+RESULTS_FILE = "scaling_results.json"
+
+POINT_COLUMNS = [
+    "task", "equivalent_task", "runs_valid", "runs_failed",
+    "avg_time_ms", "p50_ms", "p90_ms", "p99_ms", "p99_9_ms", "throughput_qps",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sweep scale factor x client count and fit scaling models")
+    parser.add_argument("--engine", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--sf", nargs="+", type=int, default=DEFAULT_SFS)
+    parser.add_argument("--clients", nargs="+", type=int, default=DEFAULT_CLIENTS)
+    parser.add_argument("--replicas", nargs="+", type=int, default=[0],
+                        help="Read replica counts (0 = primary only); passed as --replicas")
+    parser.add_argument("--runs-per-client", type=int, default=DEFAULT_RUNS_PER_CLIENT)
+    parser.add_argument("--only", nargs="+", metavar="TASK", help="Passed through to the runners")
+    parser.add_argument("--tag", nargs="+", metavar="TAG", help="Passed through to the runners")
+    parser.add_argument("--timeout-ms", type=int, help="Passed through to the runners")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume interrupted points from their run logs")
+    parser.add_argument("--out", default=os.path.join("sweeps", datetime.now().strftime("%Y%m%d_%H%M%S")),
+                        help="Sweep directory")
+    parser.add_argument("--fit-only", action="store_true",
+                        help="Do not run anything; refit the points already in --out")
+    parser.add_argument("--ignore-environment", action="store_true",
+                        help="Fit even if points of the same engine/SF ran on different environments")
+    return parser.parse_args()
+
+
+# ============================================================
+# Execução da grade
+# ============================================================
+
+def point_dir(out, engine, sf, clients, replicas=0):
+    name = f"sf{sf}_c{clients}" + (f"_r{replicas}" if replicas else "")
+    return os.path.join(out, engine, name)
+
+
+def run_point(args, engine, sf, clients, replicas=0):
+    spec = ENGINES[engine]
+    cmd = [
+        sys.executable, spec["runner"],
+        "--sf", str(sf),
+        "--clients", str(clients),
+        "--runs", str(clients * args.runs_per_client),
+        "--output-dir", os.path.abspath(point_dir(args.out, engine, sf, clients, replicas)),
+    ]
+    if replicas:
+        cmd += ["--replicas", str(replicas)]
+    if args.only:
+        cmd += ["--only", *args.only]
+    if args.tag:
+        cmd += ["--tag", *args.tag]
+    if args.timeout_ms is not None:
+        cmd += ["--timeout-ms", str(args.timeout_ms)]
+    if args.resume:
+        cmd.append("--resume")
+
+    label = f"{engine} SF{sf} clients={clients} replicas={replicas}"
+    print(f"\n>>> {label}: {' '.join(cmd[1:])}")
+    result = subprocess.run(cmd, cwd=spec["dir"])
+    if result.returncode != 0:
+        print(f"WARNING {label}: runner exited with {result.returncode}")
+
+
+# ============================================================
+# Leitura dos pontos
+# ============================================================
+
+def load_points(out):
+    frames = []
+    for engine, spec in ENGINES.items():
+        engine_dir = os.path.join(out, engine)
+        if not os.path.isdir(engine_dir):
+            continue
+        for sub in sorted(os.listdir(engine_dir)):
+            match = POINT_DIR_RE.match(sub)
+            summary_csv = os.path.join(engine_dir, sub, spec["summary"])
+            if not match or not os.path.exists(summary_csv):
+                continue
+            df = pd.read_csv(summary_csv)
+            df = df[[c for c in POINT_COLUMNS if c in df.columns]].copy()
+            df.insert(0, "replicas", int(match.group(3) or 0))
+            df.insert(0, "clients", int(match.group(2)))
+            df.insert(0, "sf", int(match.group(1)))
+            df.insert(0, "engine", engine)
+            frames.append(df)
+    if not frames:
+        raise SystemExit(f"No sweep points found under {out}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_environments(out, points, ignore_environment):
+    """
+    Fingerprint por engine/SF/réplicas; recusa pontos de ambientes diferentes.
+    Com réplicas o servidor muda (ex.: replica set local do Mongo), então cada
+    contagem de réplicas é um grupo próprio.
+    """
+    environments = {}
+    for (engine, sf, replicas), group in points.groupby(["engine", "sf", "replicas"]):
+        label = f"{engine} SF{sf}" + (f" replicas={replicas}" if replicas else "")
+        fingerprints = [
+            (clients, load_fingerprint(point_dir(out, engine, sf, clients, replicas)))
+            for clients in sorted(group["clients"].unique())
+        ]
+        known = [(clients, fp) for clients, fp in fingerprints if fp is not None]
+        if not known:
+            print(f"WARNING {label}: no environment fingerprint, compatibility not checked")
+            continue
+        for clients, fp in known[1:]:
+            diffs = incompatibilities(known[0][1], fp)
+            if diffs and not ignore_environment:
+                raise SystemExit(
+                    f"{label}: clients={clients} ran on a different environment "
+                    f"than clients={known[0][0]}:\n  " + "\n  ".join(diffs)
+                )
+        key = str(sf) + (f"_r{replicas}" if replicas else "")
+        environments.setdefault(engine, {})[key] = known[0][1].get("compatibility")
+    return environments
+
+
+# ============================================================
+# Modelos
+# ============================================================
+
+def fit_usl(clients, throughput):
+    """
+    Universal Scalability Law por mínimos quadrados na forma linearizada
+    N/C(N) - 1 = sigma*(N-1) + kappa*N*(N-1), com C(N) = X(N)/X(1).
+    """
+    n = np.asarray(clients, dtype=float)
+    x = np.asarray(throughput, dtype=float)
+    if len(n) < 3 or np.any(x <= 0):
+        return None
+    # X(1) medido, ou extrapolado linearmente do menor N
+    x1 = x[n == 1][0] if np.any(n == 1) else x[0] / n[0]
+    y = n / (x / x1) - 1
+    design = np.column_stack([n - 1, n * (n - 1)])
+    (sigma, kappa), *_ = np.linalg.lstsq(design, y, rcond=None)
+    sigma, kappa = max(sigma, 0.0), max(kappa, 0.0)
+
+    predicted = x1 * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+    ss_res = float(np.sum((x - predicted) ** 2))
+    ss_tot = float(np.sum((x - x.mean()) ** 2))
+    peak = math.sqrt((1 - sigma) / kappa) if kappa > 0 and sigma < 1 else None
+    return {
+        "x1_qps": round(float(x1), 3),
+        "sigma": round(float(sigma), 6),
+        "kappa": round(float(kappa), 8),
+        "r2": round(1 - ss_res / ss_tot, 4) if ss_tot > 0 else None,
+        "peak_clients": round(peak, 1) if peak is not None else None,
+        "peak_qps": (
+            round(float(x1 * peak / (1 + sigma * (peak - 1) + kappa * peak * (peak - 1))), 3)
+            if peak is not None else None
+        ),
+    }
+
+
+def knee_point(clients, throughput):
+    """
+    Kneedle: com N e X normalizados em [0, 1], o joelho é o ponto de maior
+    X_norm - N_norm (mais acima da reta). None se a curva não dobra.
+    """
+    n = np.asarray(clients, dtype=float)
+    x = np.asarray(throughput, dtype=float)
+    if len(n) < 3 or n.max() == n.min() or x.max() == x.min():
+        return None
+    n_norm = (n - n.min()) / (n.max() - n.min())
+    x_norm = (x - x.min()) / (x.max() - x.min())
+    diff = x_norm - n_norm
+    i = int(np.argmax(diff))
+    if diff[i] <= 0 or i in (0, len(n) - 1):
+        return None
+    return int(n[i])
+
+
+def fit_power_law(sfs, times):
+    """t = a*SF^b em log-log; None com < 2 SFs."""
+    s = np.asarray(sfs, dtype=float)
+    t = np.asarray(times, dtype=float)
+    if len(s) < 2 or np.any(t <= 0):
+        return None
+    b, log_a = np.polyfit(np.log(s), np.log(t), 1)
+    return {"a_ms": round(float(math.exp(log_a)), 4), "exponent": round(float(b), 4)}
+
+
+def concurrency_fits(points):
+    fits = []
+    valid = points.dropna(subset=["throughput_qps"])
+    for (engine, task, sf, replicas), group in valid.groupby(["engine", "task", "sf", "replicas"]):
+        group = group.sort_values("clients")
+        n, x = group["clients"].tolist(), group["throughput_qps"].tolist()
+        best = group.loc[group["throughput_qps"].idxmax()]
+        fits.append({
+            "engine": engine,
+            "task": task,
+            "sf": int(sf),
+            "replicas": int(replicas),
+            "clients_measured": n,
+            "max_qps": round(float(best["throughput_qps"]), 3),
+            "clients_at_max_qps": int(best["clients"]),
+            "knee_clients": knee_point(n, x),
+            "usl": fit_usl(n, x),
+        })
+    return fits
+
+
+def sf_fits(points):
+    fits = []
+    valid = points.dropna(subset=["avg_time_ms"])
+    for (engine, task, clients, replicas), group in valid.groupby(
+            ["engine", "task", "clients", "replicas"]):
+        group = group.sort_values("sf")
+        fit = fit_power_law(group["sf"], group["avg_time_ms"])
+        p99 = group.dropna(subset=["p99_ms"]) if "p99_ms" in group.columns else group.iloc[0:0]
+        fits.append({
+            "engine": engine,
+            "task": task,
+            "clients": int(clients),
+            "replicas": int(replicas),
+            "sfs_measured": group["sf"].tolist(),
+            "avg_time": fit,
+            "p99": fit_power_law(p99["sf"], p99["p99_ms"]) if len(p99) else None,
+        })
+    return fits
+
+
+def replica_fits(points):
+    """
+    Vazão x número de réplicas (K > 0) com SF e clientes fixos: speedup sobre
+    o menor K medido e eficiência (1.0 = escala linear com as réplicas). Com o
+    ponto K = 0 (só primário) também o speedup sobre o primário.
+    """
+    fits = []
+    valid = points.dropna(subset=["throughput_qps"])
+    for (engine, task, sf, clients), group in valid.groupby(["engine", "task", "sf", "clients"]):
+        by_replicas = dict(zip(group["replicas"], group["throughput_qps"]))
+        counts = sorted(k for k in by_replicas if k > 0)
+        if len(counts) < 2:
+            continue
+        k_min, x_min = counts[0], by_replicas[counts[0]]
+        primary = by_replicas.get(0)
+        fits.append({
+            "engine": engine,
+            "task": task,
+            "sf": int(sf),
+            "clients": int(clients),
+            "primary_qps": round(float(primary), 3) if primary else None,
+            "by_replicas": [
+                {
+                    "replicas": int(k),
+                    "qps": round(float(by_replicas[k]), 3),
+                    "speedup": round(by_replicas[k] / x_min, 3) if x_min else None,
+                    "efficiency": round(by_replicas[k] / x_min / (k / k_min), 3) if x_min else None,
+                    "speedup_vs_primary": round(by_replicas[k] / primary, 3) if primary else None,
+                }
+                for k in counts
+            ],
+        })
+    return fits
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def main():
+    args = parse_args()
+    os.makedirs(args.out, exist_ok=True)
+
+    if not args.fit_only:
+        for engine in args.engine:
+            for sf in args.sf:
+                for replicas in args.replicas:
+                    for clients in args.clients:
+                        run_point(args, engine, sf, clients, replicas)
+
+    points = load_points(args.out)
+    environments = load_environments(args.out, points, args.ignore_environment)
+
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "grid": {
+            "engines": sorted(points["engine"].unique().tolist()),
+            "sf": sorted(int(s) for s in points["sf"].unique()),
+            "clients": sorted(int(c) for c in points["clients"].unique()),
+            "replicas": sorted(int(r) for r in points["replicas"].unique()),
+            "runs_per_client": args.runs_per_client,
+        },
+        "environment": environments,
+        "points": json.loads(points.to_json(orient="records")),
+        "concurrency_fits": concurrency_fits(points),
+        "sf_fits": sf_fits(points),
+        "replica_fits": replica_fits(points),
+    }
+    results_json = os.path.join(args.out, RESULTS_FILE)
+    with open(results_json, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    knees = pd.DataFrame([
+        {
+            "engine": fit["engine"],
+            "task": fit["task"],
+            "sf": fit["sf"],
+            "replicas": fit["replicas"],
+            "max_qps": fit["max_qps"],
+            "clients_at_max_qps": fit["clients_at_max_qps"],
+            "knee_clients": fit["knee_clients"],
+            "usl_peak_clients": (fit["usl"] or {}).get("peak_clients"),
+        }
+        for fit in results["concurrency_fits"]
+    ])
+    if not knees.empty:
+        print(knees.to_string(index=False))
+    print(f"\nSaved to: {results_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,807 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# workload_replay.py
+# Importa traces de workload dos logs do servidor e os reexecuta contra
+# qualquer uma das engines
+#
+# Um trace (workload_trace.py, nas pastas dos runners) é a sequência de
+# invocações de tasks com o instante e a latência original de cada uma. Origens:
+#   run           runner com --trace      latência do cliente (como nos *_runs.csv)
+#   general_log   general log do MySQL    só o instante (sem latência)
+#   slow_log      slow log do MySQL       Query_time do servidor, Rows_sent
+#   profiler      system.profile (Mongo)  millis do servidor (getMores somados
+#                                         ao comando que abriu o cursor)
+# Statements dos logs são casados com as tasks do registro da engine (SQL
+# normalizado; coleção + pipeline). Os que não casam entram crus e só são
+# reexecutados na mesma engine. Dos logs do MySQL só entram leituras.
+#
+# O replay é em loop aberto: cada invocação é disparada no seu instante
+# dividido por --speed (--speed 0 dispara todas de uma vez) num pool de
+# --workers threads, pelos mesmos run_query_once / run_pipeline_once dos
+# runners. Num trace de uma engine reexecutado na outra, cada task vira a sua
+# `equivalent`. Variantes gravadas pelo runner com --split-scan / --protocol
+# (<task>_split<N>, <task>_<perfil>) não são reconstruídas: são puladas e
+# contadas, nunca trocadas pela task base. Por invocação: atraso do disparo (lag_ms), latência original e
+# do replay, divergence_ms = replay - original e ratio = replay / original.
+# Na mesma engine o alvo é o layout e o database do trace (--layout /
+# --database trocam); na outra, o database do SF no layout baseline.
+#
+# Saída (padrão outputs/replay_<engine>_sf<SF>[_<layout>]/):
+#   replay_queries.csv   uma linha por invocação
+#   replay_summary.csv   por task executada (e "(all)"): percentis originais e
+#                        do replay, divergência mediana / p90 e razão mediana
+#
+# Uso:
+#   python workload_replay.py import-general-log general.log --sf 10 --out trace.jsonl
+#   python workload_replay.py import-slow-log slow.log --sf 10 --out trace.jsonl
+#   python workload_replay.py import-profile --sf 10 --out trace.jsonl            # do servidor
+#   python workload_replay.py import-profile --file profile.json --sf 10 --out trace.jsonl
+#   python workload_replay.py replay trace.jsonl                     # mesma engine, velocidade original
+#   python workload_replay.py replay trace.jsonl --engine mongodb --speed 2 --workers 8
+#
+# A latência do servidor (slow log, profiler) não inclui conexão e rede,
+# enquanto a do replay sim: compare a divergência entre tasks, não o valor
+# absoluto.
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import hashlib
+import argparse
+import importlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from statistics import median
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MYSQL_DIR = os.path.join(HERE, "koupil_tests", "mysql")
+MONGO_DIR = os.path.join(HERE, "..", "documents_tests")
+
+# engine -> (pasta, módulo do runner)
+ENGINES = {
+    "mysql": (MYSQL_DIR, "run_workload_mysql_sf"),
+    "mongodb": (MONGO_DIR, "run_workload_mongo"),
+}
+
+# Mesmo servidor do run_workload_mysql_sf.py
+MYSQL_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 3307,
+    "user": "root",
+    "password": "root",
+}
+
+# Statements importados dos logs do MySQL: só leituras (o replay não altera o dataset)
+READ_PREFIXES = ("select", "with", "(")
+
+# Retries distorcem a latência: por padrão a invocação falha de primeira
+DEFAULT_RETRIES = 0
+DEFAULT_SPEED = 1.0
+DEFAULT_TRACE = "workload_trace.jsonl"
+
+QUERIES_FILE = "replay_queries.csv"
+SUMMARY_FILE = "replay_summary.csv"
+
+
+def log(msg):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
+
+
+def load_runner(engine):
+    """
+    Módulo do runner da engine. Os módulos comuns (task_registry,
+    workload_trace, latency_histogram...) vêm de koupil_tests/mysql nas duas
+    engines; os registros de tasks são diferentes: uma engine por processo.
+    """
+    directory, module = ENGINES[engine]
+    sys.path.insert(0, directory)
+    return importlib.import_module(module)
+
+
+def all_tasks(registry):
+    """Tasks do registro e as suas reescritas, por nome."""
+    tasks = {}
+    for task in registry:
+        tasks[task.name] = task
+        for rewrite in task.rewrite_tasks():
+            tasks[rewrite.name] = rewrite
+    return tasks
+
+
+def _short_hash(text):
+    return hashlib.blake2b(text.encode(), digest_size=4).hexdigest()
+
+
+# ============================================================
+# Casamento de statements com tasks
+# ============================================================
+
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Sem comentários, espaços colapsados, sem ';' final, minúsculo."""
+    sql = SPACE_RE.sub(" ", COMMENT_RE.sub(" ", sql)).strip()
+    return sql.rstrip(";").strip().lower()
+
+
+def sql_catalog(registry):
+    """{SQL normalizado: task} (a primeira task registrada com aquele SQL)."""
+    catalog = {}
+    for task in all_tasks(registry).values():
+        catalog.setdefault(normalize_sql(task.query()), task.name)
+    return catalog
+
+
+def pipeline_key(collection, pipeline):
+    from bson import json_util
+    return collection, json_util.dumps(pipeline, sort_keys=True)
+
+
+def pipeline_catalog(registry):
+    """{(coleção, pipeline canônica): task}."""
+    catalog = {}
+    for task in all_tasks(registry).values():
+        if task.collection:
+            catalog.setdefault(pipeline_key(task.collection, task.query()), task.name)
+    return catalog
+
+
+def sql_entry(sql, start_s, client, catalog, time_ms=None, rows=None):
+    """Invocação do trace para um statement do log (task ou SQL cru)."""
+    task = catalog.get(normalize_sql(sql))
+    entry = {
+        "t": start_s,
+        "task": task,
+        "params": {},
+        "client": client,
+        "time_ms": time_ms,
+        "rows": rows,
+        "status": "ok",
+    }
+    if task is None:
+        entry["sql"] = sql.strip()
+    return entry
+
+
+def _is_read(sql):
+    return normalize_sql(sql).startswith(READ_PREFIXES)
+
+
+# ============================================================
+# Importação: general log do MySQL
+# ============================================================
+#
+# 2024-05-01T12:00:00.123456Z	   12 Query	SELECT ...
+# (linhas seguintes sem timestamp continuam o statement)
+
+GENERAL_LINE_RE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?)Z?\s+(\d+) (\w+(?: \w+)?)(?:\t(.*))?$"
+)
+# cabeçalho repetido a cada (re)início do servidor
+LOG_HEADER_RE = re.compile(r"^(\S+, Version: |Tcp port: |Time\s+Id\s+Command\s+Argument)")
+CONNECT_DB_RE = re.compile(r" on (\S*) using ")
+USE_RE = re.compile(r"^use\s+`?([^`;\s]+)`?\s*;?$", re.I)
+
+
+def _epoch(timestamp):
+    return datetime.fromisoformat(timestamp.rstrip("Z")).timestamp()
+
+
+def import_general_log(path, database, catalog):
+    """(invocações, contagem dos statements pulados por motivo)."""
+    thread_db = {}
+    clients = {}
+    entries = []
+    skipped = Counter()
+    # [início, thread, texto]: fechado na próxima linha com timestamp
+    current = None
+
+    def flush():
+        if current is None:
+            return
+        start_s, thread, sql = current
+        use = USE_RE.match(sql.strip())
+        db = thread_db.get(thread)
+        if use:
+            thread_db[thread] = use.group(1)
+        elif db is not None and db != database:
+            skipped["other database"] += 1
+        elif not _is_read(sql):
+            skipped["not a read"] += 1
+        else:
+            client = clients.setdefault(thread, len(clients))
+            entries.append(sql_entry(sql, start_s, client, catalog))
+
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            match = GENERAL_LINE_RE.match(line)
+            if match is None:
+                if current is not None and not LOG_HEADER_RE.match(line):
+                    current[2] += "\n" + line
+                continue
+            flush()
+            current = None
+            timestamp, thread, command, argument = match.groups()
+            argument = argument or ""
+            if command == "Connect":
+                db = CONNECT_DB_RE.search(argument)
+                thread_db[thread] = db.group(1) if db and db.group(1) else None
+            elif command == "Init DB":
+                thread_db[thread] = argument.strip()
+            elif command in ("Query", "Execute"):
+                current = [_epoch(timestamp), thread, argument]
+    flush()
+    return entries, skipped
+
+
+# ============================================================
+# Importação: slow log do MySQL
+# ============================================================
+#
+# # Time: 2024-05-01T12:00:00.123456Z
+# # User@Host: root[root] @ localhost [127.0.0.1]  Id:    12
+# # Query_time: 0.001234  Lock_time: 0.000010 Rows_sent: 1  Rows_examined: 1
+# use ecommerce_sf1;
+# SET timestamp=1714564800;
+# SELECT ...;
+#
+# "# Time" é gravado no fim do statement: início = Time - Query_time (ou o
+# Start do log_slow_extra, quando existe).
+
+SLOW_FIELD_RE = re.compile(r"(\w+): (\S+)")
+SLOW_ID_RE = re.compile(r"Id:\s*(\d+)")
+SET_TIMESTAMP_RE = re.compile(r"^SET timestamp=(\d+);$", re.I)
+
+
+def import_slow_log(path, database, catalog):
+    """(invocações, contagem dos statements pulados por motivo)."""
+    thread_db = {}
+    clients = {}
+    entries = []
+    skipped = Counter()
+    logged_at = None
+    current = None
+
+    def flush():
+        if current is None or not current["sql"]:
+            return
+        sql = "\n".join(current["sql"])
+        thread = current["thread"]
+        db = thread_db.get(thread)
+        if db is not None and db != database:
+            skipped["other database"] += 1
+            return
+        if not _is_read(sql):
+            skipped["not a read"] += 1
+            return
+        fields = current["fields"]
+        query_s = float(fields.get("Query_time", 0))
+        if "Start" in fields:
+            start_s = _epoch(fields["Start"])
+        elif current["logged_at"] is not None:
+            start_s = current["logged_at"] - query_s
+        elif current["timestamp"] is not None:
+            start_s = current["timestamp"]
+        else:
+            skipped["no timestamp"] += 1
+            return
+        rows = int(fields["Rows_sent"]) if "Rows_sent" in fields else None
+        client = clients.setdefault(thread, len(clients))
+        entries.append(sql_entry(sql, start_s, client, catalog, round(query_s * 1000, 3), rows))
+
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("# Time:"):
+                logged_at = _epoch(line[len("# Time:"):].strip())
+            elif line.startswith("# User@Host:"):
+                flush()
+                thread = SLOW_ID_RE.search(line)
+                current = {
+                    "thread": thread.group(1) if thread else None,
+                    "logged_at": logged_at,
+                    "timestamp": None,
+                    "fields": {},
+                    "sql": [],
+                }
+            elif line.startswith("# Query_time:"):
+                if current is not None:
+                    current["fields"].update(SLOW_FIELD_RE.findall(line))
+            elif line.startswith("#") or LOG_HEADER_RE.match(line) or current is None:
+                continue
+            elif USE_RE.match(line.strip()):
+                thread_db[current["thread"]] = USE_RE.match(line.strip()).group(1)
+            elif SET_TIMESTAMP_RE.match(line.strip()):
+                current["timestamp"] = float(SET_TIMESTAMP_RE.match(line.strip()).group(1))
+            else:
+                current["sql"].append(line)
+    flush()
+    return entries, skipped
+
+
+# ============================================================
+# Importação: profiler do MongoDB
+# ============================================================
+
+def find_pipeline(command):
+    """Pipeline equivalente a um comando find."""
+    stages = [{"$match": command.get("filter", {})}]
+    for option, stage in (("sort", "$sort"), ("skip", "$skip"), ("limit", "$limit"),
+                          ("projection", "$project")):
+        if command.get(option):
+            stages.append({stage: command[option]})
+    return stages
+
+
+def read_profile_file(path):
+    """Documentos do system.profile exportados (mongoexport / JSON array, Extended JSON)."""
+    from bson import json_util
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json_util.loads(text)
+    return [json_util.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def import_profile(docs, database, catalog):
+    """
+    (invocações, contagem das operações puladas por motivo). ts do profiler é
+    gravado no fim da operação: início = ts - millis. Os getMore de um cursor
+    somam tempo e documentos à invocação que o abriu.
+    """
+    from bson import json_util
+
+    clients = {}
+    cursors = {}
+    entries = []
+    skipped = Counter()
+    for doc in sorted(docs, key=lambda d: d["ts"]):
+        db, _, collection = doc.get("ns", "").partition(".")
+        if db != database or collection.startswith("system."):
+            skipped["other namespace"] += 1
+            continue
+        command = doc.get("command", {})
+        cursor_id = doc.get("cursorid")
+
+        if doc.get("op") == "getmore":
+            entry = cursors.get(cursor_id)
+            if entry is None:
+                skipped["getMore without its command"] += 1
+                continue
+            entry["time_ms"] += doc.get("millis", 0)
+            entry["rows"] += doc.get("nreturned", 0)
+            if doc.get("cursorExhausted"):
+                del cursors[cursor_id]
+            continue
+
+        if "aggregate" in command:
+            collection, pipeline = command["aggregate"], command.get("pipeline", [])
+        elif "find" in command:
+            collection, pipeline = command["find"], find_pipeline(command)
+        else:
+            skipped[f"{doc.get('op')} not replayed"] += 1
+            continue
+
+        session = command.get("lsid", {}).get("id")
+        client = clients.setdefault(str(session or doc.get("client")), len(clients))
+        millis = doc.get("millis", 0)
+        task = catalog.get(pipeline_key(collection, pipeline))
+        entry = {
+            "t": doc["ts"].timestamp() - millis / 1000,
+            "task": task,
+            "params": {},
+            "client": client,
+            "time_ms": millis,
+            "rows": doc.get("nreturned", 0),
+            "status": "ok",
+        }
+        if task is None:
+            entry["collection"] = collection
+            entry["pipeline"] = json.loads(json_util.dumps(pipeline))
+        entries.append(entry)
+        if cursor_id and not doc.get("cursorExhausted"):
+            cursors[cursor_id] = entry
+    return entries, skipped
+
+
+# ============================================================
+# Replay
+# ============================================================
+
+@dataclass
+class Step:
+    query: dict
+    # task executada na engine alvo ("raw_<hash>" para statement cru)
+    label: str
+    # SQL ou (coleção, pipeline)
+    statement: object
+    params: dict
+    timeout_ms: object
+
+
+def plan_replay(queries, context, engine, registry, sf, default_timeout_ms, timeout_ms=None):
+    """
+    O que executar na engine alvo para cada invocação: (steps, statements crus
+    por label, contagem das invocações puladas por motivo).
+    """
+    same_engine = context.get("engine") == engine
+    lookup = all_tasks(registry) if same_engine else {
+        task.equivalent: task for task in registry if task.equivalent
+    }
+    built = {}
+    raw = {}
+    steps = []
+    skipped = Counter()
+
+    for query in queries:
+        if query.get("task") is None:
+            if not same_engine:
+                skipped["raw statement from the other engine"] += 1
+                continue
+            if engine == "mysql":
+                statement = query["sql"]
+                text = normalize_sql(statement)
+            else:
+                from bson import json_util
+                statement = (query["collection"], json_util.loads(json.dumps(query["pipeline"])))
+                text = " ".join(pipeline_key(*statement))
+            label = f"raw_{_short_hash(text)}"
+            raw.setdefault(label, text)
+            timeout = timeout_ms if timeout_ms is not None else default_timeout_ms
+            steps.append(Step(query, label, statement, None, timeout))
+            continue
+
+        task = lookup.get(query["task"])
+        if task is None:
+            # variantes de split / protocolo (e as sem `equivalent` na outra
+            # engine) são outra execução: reexecutar a base mediria outra coisa
+            if query.get("base_task") in lookup:
+                skipped[f"variant not replayable: {query['task']}"] += 1
+            else:
+                skipped[f"no {engine} task for {query['task']}"] += 1
+            continue
+        # params do trace só valem para a mesma engine
+        params = query.get("params") if same_engine and query.get("params") else task.params
+        key = (task.name, json.dumps(params, sort_keys=True, default=str))
+        if key not in built:
+            built[key] = (task if params == task.params else replace(task, params=params)).query()
+        statement = built[key] if engine == "mysql" else (task.collection, built[key])
+        timeout = timeout_ms if timeout_ms is not None else task.timeout_ms_for(sf, default_timeout_ms)
+        steps.append(Step(query, task.name, statement, params, timeout))
+    return steps, raw, skipped
+
+
+def replay_target(runner, context, engine, sf, layout=None, database=None):
+    """
+    (database, layout, origem) do replay. Na mesma engine vale o layout do
+    trace e, no mesmo SF e layout, o database gravado nele; senão o database
+    do SF no layout (baseline se a engine do trace é outra).
+    """
+    same_engine = context.get("engine") == engine
+    traced_layout = context.get("layout") or runner.BASELINE_LAYOUT
+    layout = layout or (traced_layout if same_engine else runner.BASELINE_LAYOUT)
+    layouts = runner.LAYOUTS if engine == "mysql" else runner.SHARDED_LAYOUTS
+    if layout != runner.BASELINE_LAYOUT and layout not in layouts:
+        raise SystemExit(f"Unknown {engine} layout {layout} "
+                         f"({', '.join([runner.BASELINE_LAYOUT, *layouts])})")
+
+    same_target = same_engine and sf == context.get("sf") and layout == traced_layout
+    traced = context.get("database") if same_target else None
+    if engine == "mysql":
+        if database:
+            return database, layout, "--database"
+        if traced:
+            return traced, layout, "trace"
+        return runner.layout_database_name(runner.resolve_database_name(sf), layout), layout, "SF"
+
+    if database:
+        raise SystemExit("--database only applies to MySQL replays (MongoDB: --sf / --layout)")
+    database = runner.resolve_database(sf, layout)[1]
+    if traced and traced != database:
+        log(f"WARNING: trace database {traced} is not the SF's; replaying on {database}")
+    return database, layout, "trace" if traced == database else "SF"
+
+
+def engine_executor(runner, engine, sf, database, layout):
+    """execute(step, seq) -> (linhas, ms) com a função de 1 run do runner da engine."""
+    if engine == "mysql":
+        db_config = {**MYSQL_CONFIG, "database": database}
+
+        def execute(step, seq):
+            _, rows, elapsed_ms, _, _, _ = runner.run_query_once(
+                db_config, step.label, step.statement, seq, step.params, step.timeout_ms
+            )
+            return rows, elapsed_ms
+    else:
+        def execute(step, seq):
+            collection, pipeline = step.statement
+            # bytes no fio: contador do servidor inteiro, sem sentido com invocações sobrepostas
+            _, rows, elapsed_ms, _, _ = runner.run_pipeline_once(
+                step.label, collection, pipeline, seq, sf,
+                layout=layout, timeout_ms=step.timeout_ms, measure_wire=False,
+            )
+            return rows, elapsed_ms
+    return execute
+
+
+def replay(steps, execute, speed, workers, retries, backoff_s, run_with_retries):
+    """
+    Dispara cada step no seu instante (t / speed desde o primeiro) e devolve
+    (registros por invocação, tempo de parede em s).
+    """
+    records = [None] * len(steps)
+    zero_t = steps[0].query["t"] if steps else 0.0
+    start = time.perf_counter()
+
+    def run(i, scheduled_s):
+        step = steps[i]
+        query = step.query
+        started = time.perf_counter()
+        outcome = run_with_retries(lambda: execute(step, i + 1), retries, backoff_s, log=log)
+        rows, elapsed_ms = outcome.result if outcome.ok else (None, None)
+        original_ms = query.get("time_ms")
+        compared = outcome.ok and original_ms is not None
+        records[i] = {
+            "seq": i + 1,
+            "t": query["t"],
+            "client": query.get("client"),
+            "task": query.get("task") or step.label,
+            "replay_task": step.label,
+            "scheduled_s": round(scheduled_s, 6),
+            "lag_ms": round((started - start - scheduled_s) * 1000, 3),
+            "original_ms": original_ms,
+            "replay_ms": round(elapsed_ms, 3) if outcome.ok else None,
+            "divergence_ms": round(elapsed_ms - original_ms, 3) if compared else None,
+            "ratio": round(elapsed_ms / original_ms, 4) if compared and original_ms > 0 else None,
+            "original_rows": query.get("rows"),
+            "rows": rows,
+            "status": "ok" if outcome.ok else "failed",
+            "attempts": outcome.attempts,
+            "error_class": outcome.error_class,
+            "error": None if outcome.ok else str(outcome.error)[:500],
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for i, step in enumerate(steps):
+            scheduled_s = (step.query["t"] - zero_t) / speed if speed else 0.0
+            delay = start + scheduled_s - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(run, i, scheduled_s))
+        for future in futures:
+            future.result()
+    return records, time.perf_counter() - start
+
+
+def _rank_percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+def summarize(records, raw, histogram_class):
+    """Uma linha por task executada (na ordem da 1ª invocação) e "(all)"."""
+    groups = {}
+    for record in records:
+        groups.setdefault(record["replay_task"], []).append(record)
+    groups["(all)"] = records
+
+    rows = []
+    for name, group in groups.items():
+        ok = [r for r in group if r["status"] == "ok"]
+        original, replayed = histogram_class(), histogram_class()
+        for r in group:
+            if r["original_ms"] is not None:
+                original.record(r["original_ms"])
+        for r in ok:
+            replayed.record(r["replay_ms"])
+        divergences = [r["divergence_ms"] for r in ok if r["divergence_ms"] is not None]
+        ratios = [r["ratio"] for r in ok if r["ratio"] is not None]
+        p90_abs = _rank_percentile([abs(d) for d in divergences], 90)
+        rows.append({
+            "replay_task": name,
+            "trace_tasks": ";".join(sorted({r["task"] for r in group})) if name != "(all)" else None,
+            "invocations": len(group),
+            "failed": len(group) - len(ok),
+            **{f"original_{k}": v for k, v in original.percentiles().items()},
+            **{f"replay_{k}": v for k, v in replayed.percentiles().items()},
+            "median_divergence_ms": round(median(divergences), 3) if divergences else None,
+            "p90_abs_divergence_ms": round(p90_abs, 3) if p90_abs is not None else None,
+            "median_ratio": round(median(ratios), 4) if ratios else None,
+            "rows_mismatch": sum(
+                1 for r in ok if r["original_rows"] is not None and r["rows"] != r["original_rows"]
+            ),
+            "max_lag_ms": max((r["lag_ms"] for r in group), default=None),
+            "statement": raw.get(name, "")[:300] or None,
+        })
+    return rows
+
+
+# ============================================================
+# Comandos
+# ============================================================
+
+def log_import(entries, skipped, out):
+    matched = sum(1 for e in entries if e["task"] is not None)
+    log(f"Imported {len(entries)} invocation(s) ({matched} matched to tasks, "
+        f"{len(entries) - matched} raw) into {out}")
+    for reason, count in skipped.most_common():
+        log(f"Skipped {count}: {reason}")
+
+
+def cmd_import_mysql_log(args, importer, source, latency):
+    runner = load_runner("mysql")
+    from workload_trace import write_trace
+
+    database = args.database or runner.resolve_database_name(args.sf)
+    entries, skipped = importer(args.log, database, sql_catalog(runner.REGISTRY))
+    context = {
+        "engine": "mysql", "sf": args.sf, "database": database,
+        "source": source, "latency": latency, "log": os.path.abspath(args.log),
+    }
+    write_trace(args.out, context, entries)
+    log_import(entries, skipped, args.out)
+
+
+def cmd_import_profile(args):
+    runner = load_runner("mongodb")
+    from workload_trace import write_trace
+
+    if args.file:
+        database = args.database or runner.resolve_database(args.sf)[1]
+        docs = read_profile_file(args.file)
+    else:
+        client, db = runner.connect_mongo(args.sf)
+        try:
+            if args.database:
+                db = client[args.database]
+            database = db.name
+            docs = list(db["system.profile"].find().sort("ts", 1))
+        finally:
+            client.close()
+
+    entries, skipped = import_profile(docs, database, pipeline_catalog(runner.REGISTRY))
+    context = {
+        "engine": "mongodb", "sf": args.sf, "database": database,
+        "source": "profiler", "latency": "server",
+        "log": os.path.abspath(args.file) if args.file else f"{database}.system.profile",
+    }
+    write_trace(args.out, context, entries)
+    log_import(entries, skipped, args.out)
+
+
+def cmd_replay(args):
+    with open(args.trace, "rb") as f:
+        context = json.loads(f.readline()).get("context", {})
+    engine = args.engine or context.get("engine")
+    sf = args.sf if args.sf is not None else context.get("sf")
+    if engine not in ENGINES or sf is None:
+        raise SystemExit("--engine and --sf are required (the trace does not say)")
+
+    runner = load_runner(engine)
+    from workload_trace import read_trace
+    from latency_histogram import LatencyHistogram
+
+    _, queries = read_trace(args.trace)
+    if args.only:
+        queries = [q for q in queries if q.get("task") in args.only or q.get("base_task") in args.only]
+    if args.limit:
+        queries = queries[: args.limit]
+
+    steps, raw, skipped = plan_replay(
+        queries, context, engine, runner.REGISTRY, sf, runner.DEFAULT_TIMEOUT_MS, args.timeout_ms
+    )
+    if not steps:
+        raise SystemExit("Nothing to replay")
+    workers = args.workers or max(1, len({step.query.get("client") for step in steps}))
+    database, layout, origin = replay_target(runner, context, engine, sf, args.layout, args.database)
+    if args.output_dir:
+        output_dir = args.output_dir
+    elif layout == runner.BASELINE_LAYOUT:
+        output_dir = os.path.join("outputs", f"replay_{engine}_sf{sf}")
+    else:
+        output_dir = os.path.join("outputs", f"replay_{engine}_sf{sf}_{layout}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    log(f"Trace: {args.trace} ({context.get('engine')}, {context.get('source')}, "
+        f"{len(queries)} invocation(s) over {queries[-1]['t'] - queries[0]['t']:.1f} s)")
+    log(f"Target: {engine} {database}, layout {layout} (from {origin}; "
+        f"trace: {context.get('database')}, layout {context.get('layout') or 'n/a'})")
+    log(f"Replaying {len(steps)} invocation(s) on {engine} ({database}) | "
+        f"speed {args.speed or 'unpaced'} | {workers} worker(s)")
+    for reason, count in skipped.most_common():
+        log(f"Skipped {count}: {reason}")
+
+    execute = engine_executor(runner, engine, sf, database, layout)
+    records, wall_s = replay(
+        steps, execute, args.speed, workers, args.retries,
+        runner.DEFAULT_RETRY_BACKOFF_S, runner.run_with_retries,
+    )
+
+    queries_csv = os.path.join(output_dir, QUERIES_FILE)
+    pd.DataFrame(records).to_csv(queries_csv, index=False)
+    summary = pd.DataFrame(summarize(records, raw, LatencyHistogram))
+    summary.insert(1, "original_latency", context.get("latency"))
+    summary_csv = os.path.join(output_dir, SUMMARY_FILE)
+    summary.to_csv(summary_csv, index=False)
+
+    failed = sum(1 for r in records if r["status"] != "ok")
+    span_s = steps[-1].query["t"] - steps[0].query["t"]
+    log(f"Replay took {wall_s:.1f} s (trace: {span_s:.1f} s at speed {args.speed or 'unpaced'}), "
+        f"{failed} failed")
+    print(summary.drop(columns=["trace_tasks", "statement"]).to_string(index=False))
+    log(f"Per-invocation results: {queries_csv}")
+    log(f"Summary: {summary_csv}")
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import workload traces from server logs and replay them")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("import-general-log", "MySQL general query log -> trace"),
+                            ("import-slow-log", "MySQL slow query log -> trace")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("log", help="Log file")
+        p.add_argument("--sf", type=int, required=True, help="Scale factor of the logged database")
+        p.add_argument("--database", help="Database to import (default: the SF's database)")
+        p.add_argument("--out", default=DEFAULT_TRACE, help="Trace file to write")
+
+    p = sub.add_parser("import-profile", help="MongoDB profiler (system.profile) -> trace")
+    p.add_argument("--file", help="Exported system.profile (mongoexport / JSON array); "
+                                  "default: read it from the SF's database")
+    p.add_argument("--sf", type=int, required=True, help="Scale factor of the profiled database")
+    p.add_argument("--database", help="Database to import (default: the SF's database)")
+    p.add_argument("--out", default=DEFAULT_TRACE, help="Trace file to write")
+
+    p = sub.add_parser("replay", help="Re-execute a trace")
+    p.add_argument("trace", help="Trace file (workload_trace.jsonl)")
+    p.add_argument("--engine", choices=list(ENGINES), help="Target engine (default: the trace's)")
+    p.add_argument("--sf", type=int, help="Target scale factor (default: the trace's)")
+    p.add_argument("--layout", help="Target layout (default: the trace's on the same engine, "
+                                    "baseline otherwise)")
+    p.add_argument("--database", help="MySQL database (default: the trace's on the same engine, SF "
+                                      "and layout; otherwise the SF's database for the layout)")
+    p.add_argument("--speed", type=float, default=DEFAULT_SPEED,
+                   help="Time scale: 2 = twice as fast, 0.5 = half speed, 0 = no pacing")
+    p.add_argument("--workers", type=int,
+                   help="Concurrent invocations (default: number of clients in the trace)")
+    p.add_argument("--only", nargs="+", metavar="TASK", help="Replay only these trace tasks")
+    p.add_argument("--limit", type=int, help="Replay only the first N invocations")
+    p.add_argument("--timeout-ms", type=int,
+                   help="Statement timeout for every invocation (default: the task's timeout_ms)")
+    p.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                   help="Retries per invocation on transient errors (connection, deadlock)")
+    p.add_argument("--output-dir", help="Output directory (default: outputs/replay_<engine>_sf<SF>[_<layout>])")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "import-general-log":
+        cmd_import_mysql_log(args, import_general_log, "general_log", None)
+    elif args.command == "import-slow-log":
+        cmd_import_mysql_log(args, import_slow_log, "slow_log", "server")
+    elif args.command == "import-profile":
+        cmd_import_profile(args)
+    else:
+        cmd_replay(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# graph_backend.py
+# Backend de grafo em processo (networkx) carregado do database MySQL do SF
+#
+# Grafo não direcionado com nós ("customer", id), ("order", id) e
+# ("product", id) e arestas cliente–pedido e pedido–produto (price). A carga
+# lê Order e Order_line em streaming e o grafo pronto fica em cache
+# (graph_cache/<host>_<port>_<database>.pkl: o mesmo database em outro
+# servidor é outro grafo); --reload refaz a partir do MySQL.
+#
+# O grafo inteiro fica na memória do processo: na prática SF1 e SF10.
+
+import os
+import re
+import time
+import pickle
+
+import pymysql
+
+from source_data import FIRST_QUERIES, LAST_QUERIES, stream, single_ids
+
+GRAPH_CACHE_DIR = "graph_cache"
+
+
+class GraphStore:
+
+    server = "networkx"
+
+    def __init__(self, graph, first, last):
+        self.graph = graph
+        # {"customer": ("customer", id), ...}
+        self.first = first
+        self.last = last
+
+    def close(self):
+        pass
+
+
+# ================================
+# CARGA
+# ================================
+
+def _nodes(ids):
+    return {kind: (kind, id_) if id_ is not None else None for kind, id_ in ids.items()}
+
+
+def load_graph(db_config, log=print):
+    import networkx as nx
+
+    graph = nx.Graph()
+    conn = pymysql.connect(**db_config)
+    try:
+        for batch in stream(conn, "SELECT product_id FROM Product"):
+            graph.add_nodes_from(("product", product_id) for (product_id,) in batch)
+        for batch in stream(conn, "SELECT order_id, customer_id FROM `Order`"):
+            graph.add_edges_from(
+                (("customer", customer_id), ("order", order_id)) for order_id, customer_id in batch
+            )
+        for batch in stream(conn, "SELECT order_id, product_id, price FROM Order_line"):
+            graph.add_edges_from(
+                (("order", order_id), ("product", product_id), {"price": float(price)})
+                for order_id, product_id, price in batch
+            )
+        first = _nodes(single_ids(conn, FIRST_QUERIES))
+        last = _nodes(single_ids(conn, LAST_QUERIES))
+    finally:
+        conn.close()
+    log(f"Graph loaded: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
+    return GraphStore(graph, first, last)
+
+
+def cache_path(db_config):
+    host = re.sub(r"[^\w.-]", "_", str(db_config.get("host", "localhost")))
+    port = db_config.get("port", 3306)
+    return os.path.join(GRAPH_CACHE_DIR, f"{host}_{port}_{db_config['database']}.pkl")
+
+
+def open_graph(db_config, reload=False, log=print):
+    """GraphStore do database em db_config, do cache quando existe."""
+    path = cache_path(db_config)
+    if not reload and os.path.exists(path):
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            store = pickle.load(f)
+        log(f"Graph read from {path} in {time.perf_counter() - start:.1f} s")
+        return store
+
+    start = time.perf_counter()
+    store = load_graph(db_config, log)
+    log(f"Graph built from MySQL in {(time.perf_counter() - start) / 60:.1f} min")
+    os.makedirs(GRAPH_CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return store
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# kv_backend.py
+# Backend chave-valor (Redis local) carregado do database MySQL do SF
+#
+# Chaves com o nome do database como prefixo (vários SFs na mesma instância):
+#   <db>:order:<id>               hash {customer_id, total_price}
+#   <db>:customer:<id>:orders     set de order_id (índice secundário)
+#   <db>:product:<id>:orders      set de order_id (índice secundário)
+#   <db>:orders                   sorted set de order_id (score = id)
+#   <db>:meta                     ids "primeiros"/"últimos" e contagens da carga
+# A carga só roda se <db>:meta não existe (ou com --reload).
+#
+# Redis: docker run -d -p 6379:6379 redis:7
+
+import time
+
+import pymysql
+import redis
+
+from source_data import FIRST_QUERIES, LAST_QUERIES, stream, single_ids
+
+# comandos por ida ao servidor na carga
+LOAD_PIPELINE_SIZE = 10_000
+DELETE_BATCH = 10_000
+
+
+class KVStore:
+
+    def __init__(self, client, database):
+        self.client = client
+        self.database = database
+        kwargs = client.connection_pool.connection_kwargs
+        self.server = f"{kwargs.get('host')}:{kwargs.get('port')}"
+        meta = client.hgetall(self.key("meta"))
+        # {"order": id, ...}: ids crus (int), não chaves
+        self.first = {kind: int(meta[f"first_{kind}"]) for kind in FIRST_QUERIES if meta.get(f"first_{kind}")}
+        self.last = {kind: int(meta[f"last_{kind}"]) for kind in LAST_QUERIES if meta.get(f"last_{kind}")}
+
+    def key(self, *parts):
+        return ":".join([self.database, *map(str, parts)])
+
+    def close(self):
+        self.client.close()
+
+
+# ================================
+# CARGA
+# ================================
+
+def _drop_prefix(client, prefix):
+    batch = []
+    for key in client.scan_iter(match=f"{prefix}:*", count=DELETE_BATCH):
+        batch.append(key)
+        if len(batch) >= DELETE_BATCH:
+            client.unlink(*batch)
+            batch = []
+    if batch:
+        client.unlink(*batch)
+
+
+def load_kv(db_config, client, log=print):
+    database = db_config["database"]
+    _drop_prefix(client, database)
+
+    def key(*parts):
+        return ":".join([database, *map(str, parts)])
+
+    conn = pymysql.connect(**db_config)
+    try:
+        orders = 0
+        for batch in stream(conn, "SELECT order_id, customer_id, total_price FROM `Order`"):
+            pipe = client.pipeline(transaction=False)
+            for order_id, customer_id, total_price in batch:
+                pipe.hset(key("order", order_id), mapping={
+                    "customer_id": customer_id,
+                    "total_price": str(total_price),
+                })
+                pipe.sadd(key("customer", customer_id, "orders"), order_id)
+            pipe.zadd(key("orders"), {order_id: order_id for order_id, _, _ in batch})
+            pipe.execute()
+            orders += len(batch)
+
+        lines = 0
+        for batch in stream(conn, "SELECT order_id, product_id FROM Order_line"):
+            pipe = client.pipeline(transaction=False)
+            for order_id, product_id in batch:
+                pipe.sadd(key("product", product_id, "orders"), order_id)
+            pipe.execute()
+            lines += len(batch)
+
+        first = single_ids(conn, FIRST_QUERIES)
+        last = single_ids(conn, LAST_QUERIES)
+    finally:
+        conn.close()
+
+    meta = {f"first_{kind}": id_ for kind, id_ in first.items() if id_ is not None}
+    meta.update({f"last_{kind}": id_ for kind, id_ in last.items() if id_ is not None})
+    meta.update({"orders": orders, "order_lines": lines})
+    # meta por último: sem ela a carga é considerada incompleta
+    client.hset(key("meta"), mapping=meta)
+    log(f"Key-value store loaded: {orders} orders, {lines} order lines")
+
+
+def open_kv(db_config, redis_url, timeout_s=None, reload=False, log=print):
+    """KVStore do database em db_config; carrega do MySQL se preciso."""
+    client = redis.Redis.from_url(redis_url, decode_responses=True, socket_timeout=timeout_s)
+    database = db_config["database"]
+    if reload or not client.exists(f"{database}:meta"):
+        start = time.perf_counter()
+        load_kv(db_config, client, log)
+        log(f"{database} loaded into Redis in {(time.perf_counter() - start) / 60:.1f} min")
+    return KVStore(client, database)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# run_control_multimodel.py
+# Classificação de erros e timeout do cliente para os backends de grafo e
+# chave-valor; retries e clientes concorrentes são os do run_control.py do
+# runner relacional (no sys.path via workload_config_multimodel.py)
+
+from run_control import (
+    TIMEOUT,
+    TRANSIENT,
+    QUERY,
+    OTHER,
+    run_record,
+    run_concurrently,
+    run_with_retries as _run_with_retries,
+)
+
+try:
+    from redis.exceptions import (
+        ConnectionError as RedisConnectionError,
+        TimeoutError as RedisTimeoutError,
+        ResponseError,
+    )
+except ImportError:
+    # só o backend de grafo instalado
+    RedisConnectionError = RedisTimeoutError = ResponseError = ()
+
+# ================================
+# PADRÕES
+# ================================
+
+# Margem do socket_timeout do cliente Redis sobre o timeout da task
+CLIENT_TIMEOUT_GRACE_S = 30
+
+# ================================
+# CLASSIFICAÇÃO DE ERROS
+# ================================
+# TIMEOUT: socket_timeout do cliente Redis; TRANSIENT: conexão perdida /
+# recusada; QUERY: comando inválido, chave do tipo errado, nó inexistente
+
+
+def classify_error(exc):
+    if isinstance(exc, RedisTimeoutError):
+        return TIMEOUT
+    if isinstance(exc, (RedisConnectionError, ConnectionError)):
+        return TRANSIENT
+    if isinstance(exc, TimeoutError):
+        return TIMEOUT
+    # erros do networkx (NetworkXError, NodeNotFound) são da task, não do ambiente
+    if isinstance(exc, (ResponseError, KeyError)) or type(exc).__module__.startswith("networkx"):
+        return QUERY
+    return OTHER
+
+
+def client_timeout_s(timeout_ms):
+    """socket_timeout do cliente Redis (None = sem limite)."""
+    if not timeout_ms:
+        return None
+    return timeout_ms / 1000 + CLIENT_TIMEOUT_GRACE_S
+
+
+def run_with_retries(fn, retries, backoff_s, log=print):
+    return _run_with_retries(fn, retries, backoff_s, log, classify=classify_error)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# run_workload_multimodel.py
+# Workload de grafo (networkx) e chave-valor (Redis) sobre o dataset M2Bench
+#
+# Mesmo fluxo dos runners relacional e de documentos: tasks do registro,
+# run_log.jsonl, <task>_runs.csv, latency_histograms.json e um resumo com as
+# mesmas estatísticas (p50/p90/p99/p99.9, vazão com --clients). Os dados
+# vêm do database MySQL do SF (ver graph_backend.py / kv_backend.py).
+#
+# Uso:
+#   python run_workload_multimodel.py --engine graph --sf 1
+#   python run_workload_multimodel.py --engine kv --sf 10 --clients 8
+#   python run_workload_multimodel.py --engine kv --sf 10 --reload     # recarrega do MySQL
+#
+# Saída: outputs/sf<SF>_<engine>/workload_summary_<engine>.csv
+
+import os
+import time
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+# workload_config_multimodel põe no sys.path o diretório do runner relacional
+# (task_registry, run_log, run_control)
+from workload_config_multimodel import (
+    REGISTRY,
+    ENGINES,
+    DEFAULT_RUNS_PER_TASK,
+    DEFAULT_TIMEOUT_MS,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF_S,
+    SOURCE_DB_CONFIG,
+    REDIS_URL,
+    resolve_database_name,
+)
+from run_control_multimodel import (
+    client_timeout_s,
+    run_with_retries,
+    run_record,
+    run_concurrently,
+)
+from run_log import RunLog, derive_outputs
+
+
+# ================================
+# ARGUMENTOS
+# ================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Graph / key-value workload on the M2Bench dataset")
+    parser.add_argument("--engine", choices=ENGINES,
+                        help="Backend: graph (networkx em processo) ou kv (Redis)")
+    parser.add_argument("--sf", type=int,
+                        help="Scale factor (os dados vêm do database MySQL ecommerce_sf<SF>)")
+    parser.add_argument("--only", nargs="+", metavar="TASK",
+                        help="Executa só estas tasks (nomes do registro)")
+    parser.add_argument("--tag", nargs="+", metavar="TAG",
+                        help="Executa só as tasks com alguma destas tags")
+    parser.add_argument("--runs", type=int,
+                        help="Sobrescreve o número de runs de todas as tasks selecionadas")
+    parser.add_argument("--list", action="store_true",
+                        help="Lista as tasks registradas e sai")
+    parser.add_argument("--reload", action="store_true",
+                        help="Recarrega o grafo / as chaves a partir do MySQL")
+    parser.add_argument("--redis-url", default=REDIS_URL)
+    parser.add_argument("--timeout-ms", type=int,
+                        help="Timeout do cliente Redis para todas as tasks (0 = sem limite; "
+                             f"padrão: timeout_ms da task ou {DEFAULT_TIMEOUT_MS})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Retries por run em erros transitórios (conexão)")
+    parser.add_argument("--clients", type=int, default=1,
+                        help="Clientes concorrentes (threads em loop fechado) repartindo os runs de cada task")
+    parser.add_argument("--output-dir",
+                        help="Diretório de saída (padrão: outputs/sf<SF>_<engine>)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continua a execução interrompida a partir do run_log.jsonl "
+                             "(runs falhos são executados de novo)")
+    args = parser.parse_args()
+    if not args.list and (args.sf is None or args.engine is None):
+        parser.error("--engine and --sf are required")
+    return args
+
+
+# ================================
+# LOGGING
+# ================================
+
+def log_title(msg):
+    print("\n" + "=" * 70)
+    print(msg)
+    print("=" * 70)
+
+
+def log(msg):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
+
+
+# ================================
+# EXECUÇÃO (1 run)
+# ================================
+
+def run_task_once(store, task_name, operation, run_number):
+    """Devolve (df, linhas, ms, servidor)."""
+    start = time.perf_counter()
+    rows = operation(store)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    df = pd.DataFrame(rows)
+    log(f"Task {task_name} | run {run_number} | {len(rows)} rows | {elapsed_ms:.2f} ms")
+    return df, len(rows), elapsed_ms, store.server
+
+
+def open_store(engine, db_config, args, timeout_ms):
+    # cada backend só importa a sua dependência (networkx / redis)
+    if engine == "graph":
+        from graph_backend import open_graph
+        return open_graph(db_config, args.reload, log=log)
+    from kv_backend import open_kv
+    return open_kv(db_config, args.redis_url, client_timeout_s(timeout_ms), args.reload, log=log)
+
+
+# ================================
+# RESUMO (derivado do run_log)
+# ================================
+
+def write_summary(run_log, output_dir, engine):
+    """Regera os <task>_runs.csv e o workload_summary_<engine>.csv a partir do log."""
+    summary_df = pd.DataFrame(derive_outputs(run_log.path, output_dir))
+    summary_csv = os.path.join(output_dir, f"workload_summary_{engine}.csv")
+    summary_df.to_csv(summary_csv, index=False)
+    return summary_csv
+
+
+# ================================
+# MAIN
+# ================================
+
+def main():
+    args = parse_args()
+    if args.list:
+        print(REGISTRY.describe())
+        return
+
+    engine = args.engine
+    sf = args.sf
+    try:
+        tasks = [t for t in REGISTRY.select(only=args.only, tags=args.tag) if engine in t.tags]
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+    if not tasks:
+        raise SystemExit(f"No {engine} tasks selected")
+
+    dbname = resolve_database_name(sf)
+    db_config = {**SOURCE_DB_CONFIG, "database": dbname}
+    output_dir = args.output_dir or os.path.join("outputs", f"sf{sf}_{engine}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    log_title(f"{engine} workload | SF={sf} | source database: {dbname}")
+    log(f"Tasks: {', '.join(task.name for task in tasks)}")
+
+    # timeout do cliente: um só por conexão, o maior entre as tasks
+    timeout_ms = args.timeout_ms if args.timeout_ms is not None else max(
+        task.timeout_ms_for(sf, DEFAULT_TIMEOUT_MS) for task in tasks
+    )
+    store = open_store(engine, db_config, args, timeout_ms)
+
+    try:
+        run_log = RunLog(
+            output_dir,
+            {"engine": engine, "sf": sf, "database": dbname},
+            resume=args.resume,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    for task in tasks:
+        task_name = task.name
+        runs = args.runs or task.runs_or(DEFAULT_RUNS_PER_TASK)
+        expected_rows = task.expected_rows_for(sf)
+
+        log_title(f"Running task: {task_name}")
+        log(f"Configured runs: {runs}")
+
+        done = run_log.completed(task_name)
+        if done:
+            log(f"Resuming: {len(done)} run(s) already in the run log")
+
+        run_log.task(task_name, {
+            "task": task_name,
+            "sf": sf,
+            "engine": engine,
+            "database": dbname,
+            "runs_configured": runs,
+            "clients": args.clients,
+            "timeout_ms": timeout_ms if engine == "kv" else None,
+            "expected_rows": expected_rows,
+            "equivalent_task": task.equivalent,
+        })
+
+        operation = task.query()
+        last_df = None
+        ok_runs = []
+
+        def execute_run(run, client):
+            nonlocal last_df
+            outcome = run_with_retries(
+                lambda: run_task_once(store, task_name, operation, run),
+                args.retries, DEFAULT_RETRY_BACKOFF_S, log=log,
+            )
+            if outcome.ok:
+                df, rows, elapsed_ms, server = outcome.result
+                if expected_rows is not None and rows != expected_rows:
+                    log(f"WARNING {task_name} (run {run}): {rows} rows, expected {expected_rows}")
+                run_log.run(task_name, run_record(run, outcome, elapsed_ms, rows, client, server=server))
+                ok_runs.append(run)
+                last_df = df
+            else:
+                log(f"ERROR running {task_name} (run {run}) [{outcome.error_class}, "
+                    f"{outcome.attempts} attempt(s)]: {outcome.error}")
+                run_log.run(task_name, run_record(run, outcome, client=client))
+
+        pending = [run for run in range(1, runs + 1) if run not in done]
+        if pending:
+            wall_ms = run_concurrently(pending, args.clients, execute_run)
+            run_log.segment(task_name, args.clients, len(ok_runs), wall_ms)
+
+        if last_df is not None and not last_df.empty:
+            last_df.to_csv(os.path.join(output_dir, f"{task_name}_result.csv"), index=False)
+
+        run_log.sync()
+        write_summary(run_log, output_dir, engine)
+
+    run_log.close()
+    store.close()
+
+    summary_csv = write_summary(run_log, output_dir, engine)
+    log_title("Workload finished")
+    log(f"Summary saved to: {summary_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# source_data.py
+# Leitura do database MySQL do SF para carregar os backends de grafo e
+# chave-valor
+
+import pymysql
+
+FETCH_SIZE = 10_000
+
+# As mesmas subqueries das tasks relacionais (T-R2 / T-R4)
+FIRST_QUERIES = {
+    "order": "SELECT order_id FROM `Order` ORDER BY order_id LIMIT 1",
+    "customer": "SELECT customer_id FROM `Order` ORDER BY order_id LIMIT 1",
+    "product": "SELECT product_id FROM Product ORDER BY product_id LIMIT 1",
+}
+LAST_QUERIES = {
+    "customer": "SELECT customer_id FROM `Order` ORDER BY order_id DESC LIMIT 1",
+}
+
+
+def stream(conn, sql):
+    """Lotes de linhas de `sql` lidos sem buffer (SSCursor)."""
+    with conn.cursor(pymysql.cursors.SSCursor) as cur:
+        cur.execute(sql)
+        while True:
+            batch = cur.fetchmany(FETCH_SIZE)
+            if not batch:
+                return
+            yield batch
+
+
+def single_ids(conn, queries):
+    """{tipo: id} para queries de uma linha e uma coluna (None se vazia)."""
+    ids = {}
+    with conn.cursor() as cur:
+        for kind, sql in queries.items():
+            cur.execute(sql)
+            row = cur.fetchone()
+            ids[kind] = row[0] if row else None
+    return ids
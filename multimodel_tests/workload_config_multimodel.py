@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# workload_config_multimodel.py
+# Tasks de grafo e chave-valor sobre o mesmo dataset M2Bench
+#
+# Os dois modelos são carregados do database MySQL do SF (mesma regra de nome
+# do runner relacional), então as tasks veem exatamente os mesmos dados que
+# T-R*/M*. Cada task é uma função que recebe o backend aberto
+# (graph_backend.GraphStore / kv_backend.KVStore) e devolve a lista de linhas.
+#
+# "Primeiro" pedido/cliente/produto: os mesmos `SELECT ... ORDER BY ... LIMIT 1` das
+# queries relacionais, resolvidos na carga e guardados no backend.
+
+import os
+import sys
+
+# task_registry, run_log, latency_histogram e run_control são os do runner
+# relacional: o diretório dele entra no fim do sys.path (os módulos daqui têm
+# nomes próprios e vêm antes)
+MYSQL_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "experiments_latest", "koupil_tests", "mysql"
+))
+if MYSQL_DIR not in sys.path:
+    sys.path.append(MYSQL_DIR)
+
+from task_registry import TaskRegistry
+
+# ================================
+# CONFIGURAÇÃO GERAL
+# ================================
+
+DEFAULT_RUNS_PER_TASK = 5
+
+# Só o backend chave-valor tem timeout (socket do cliente Redis)
+DEFAULT_TIMEOUT_MS = 30 * 60 * 1000
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_S = 2.0
+
+# Origem dos dados (servidor do runner relacional)
+SOURCE_DB_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 3307,
+    "user": "root",
+    "password": "root",
+}
+
+REDIS_URL = "redis://localhost:6379/0"
+
+ENGINES = ("graph", "kv")
+
+# Todas as tasks abaixo são registradas aqui. A engine é uma das tags
+# ("graph" ou "kv"); demais metadados como no workload relacional:
+#   tags, runs, params, expected_rows, equivalent (task gêmea no MySQL),
+#   default=False (só roda com --only / --tag)
+REGISTRY = TaskRegistry()
+
+
+def resolve_database_name(sf: int) -> str:
+    # mesma regra de koupil_tests/mysql/workload_config.py
+    return f"ecommerce_sf{sf}"
+
+
+# ================================
+# GRAFO – cliente / pedido / produto
+# ================================
+#
+# Nós ("customer", id), ("order", id), ("product", id); arestas
+# cliente–pedido e pedido–produto (atributo price).
+
+@REGISTRY.task(
+    "G1_customer_products",
+    tags=("graph", "traversal"),
+)
+def g1_customer_products():
+    """Produtos comprados pelo primeiro cliente (2 saltos)."""
+    def run(store):
+        graph = store.graph
+        customer = store.first["customer"]
+        products = {
+            product
+            for order in graph.neighbors(customer)
+            for product in graph.neighbors(order)
+            if product[0] == "product"
+        }
+        return [{"product_id": product[1]} for product in sorted(products)]
+    return run
+
+
+@REGISTRY.task(
+    "G2_co_purchased_products",
+    tags=("graph", "traversal", "aggregate"),
+    params={"top": 10},
+)
+def g2_co_purchased_products(top):
+    """Produtos mais comprados junto com o primeiro produto."""
+    def run(store):
+        graph = store.graph
+        product = store.first["product"]
+        counts = {}
+        for order in graph.neighbors(product):
+            for other in graph.neighbors(order):
+                if other[0] == "product" and other != product:
+                    counts[other] = counts.get(other, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+        return [{"product_id": node[1], "orders": count} for node, count in ranked]
+    return run
+
+
+@REGISTRY.task(
+    "G3_customers_same_products",
+    tags=("graph", "traversal"),
+)
+def g3_customers_same_products():
+    """Clientes que compraram algum produto do primeiro cliente (BFS até 4 saltos)."""
+    def run(store):
+        import networkx as nx
+        customer = store.first["customer"]
+        reached = nx.single_source_shortest_path_length(store.graph, customer, cutoff=4)
+        return [
+            {"customer_id": node[1]}
+            for node, hops in sorted(reached.items())
+            if hops == 4 and node[0] == "customer"
+        ]
+    return run
+
+
+@REGISTRY.task(
+    "G4_orders_by_product",
+    tags=("graph", "index"),
+    equivalent="T-R4_index_filter",
+)
+def g4_orders_by_product():
+    """Pedidos com o primeiro produto (vizinhos do nó do produto)."""
+    def run(store):
+        product = store.first["product"]
+        return [{"order_id": order[1]} for order in sorted(store.graph.neighbors(product))]
+    return run
+
+
+@REGISTRY.task(
+    "G5_customer_distance",
+    tags=("graph", "path"),
+    expected_rows=1,
+)
+def g5_customer_distance():
+    """Menor caminho entre o primeiro e o último cliente (BFS bidirecional)."""
+    def run(store):
+        import networkx as nx
+        source, target = store.first["customer"], store.last["customer"]
+        try:
+            hops = nx.shortest_path_length(store.graph, source, target)
+        except nx.NetworkXNoPath:
+            hops = None
+        return [{"from": source[1], "to": target[1], "hops": hops}]
+    return run
+
+
+# ================================
+# CHAVE-VALOR – pedidos e índices
+# ================================
+#
+# <db>:order:<id>               hash {customer_id, total_price}
+# <db>:customer:<id>:orders     set de order_id
+# <db>:product:<id>:orders      set de order_id
+# <db>:orders                   sorted set de order_id (score = id)
+
+@REGISTRY.task(
+    "K1_single_order",
+    tags=("kv", "lookup"),
+    expected_rows=1,
+    equivalent="T-R2_single_order",
+)
+def k1_single_order():
+    """GET de um pedido pela chave."""
+    def run(store):
+        order_id = store.first["order"]
+        order = store.client.hgetall(store.key("order", order_id))
+        return [{"order_id": order_id, **order}] if order else []
+    return run
+
+
+@REGISTRY.task(
+    "K2_multiget_orders",
+    tags=("kv", "lookup", "batch"),
+    params={"count": 1000},
+)
+def k2_multiget_orders(count):
+    """`count` pedidos em uma ida ao servidor (pipeline de HGETALL)."""
+    def run(store):
+        ids = store.client.zrange(store.key("orders"), 0, count - 1)
+        pipe = store.client.pipeline(transaction=False)
+        for order_id in ids:
+            pipe.hgetall(store.key("order", order_id))
+        return [{"order_id": int(order_id), **order} for order_id, order in zip(ids, pipe.execute())]
+    return run
+
+
+@REGISTRY.task(
+    "K3_customer_orders",
+    tags=("kv", "lookup"),
+)
+def k3_customer_orders():
+    """Pedidos do primeiro cliente: índice secundário (set) + pipeline de HGETALL."""
+    def run(store):
+        ids = sorted(store.client.smembers(store.key("customer", store.first["customer"], "orders")), key=int)
+        pipe = store.client.pipeline(transaction=False)
+        for order_id in ids:
+            pipe.hgetall(store.key("order", order_id))
+        return [{"order_id": int(order_id), **order} for order_id, order in zip(ids, pipe.execute())]
+    return run
+
+
+@REGISTRY.task(
+    "K4_orders_by_product",
+    tags=("kv", "index"),
+    equivalent="T-R4_index_filter",
+)
+def k4_orders_by_product():
+    """Pedidos com o primeiro produto (set do índice)."""
+    def run(store):
+        ids = store.client.smembers(store.key("product", store.first["product"], "orders"))
+        return [{"order_id": order_id} for order_id in sorted(map(int, ids))]
+    return run
@@ -4,42 +4,43 @@
 import argparse
 import os
 import time
+from dataclasses import replace
 from datetime import datetime
-import statistics as stats
 import pymysql
 import pandas as pd
 
-# ==========================
-# LER PARÂMETRO --sf
-# ==========================
-parser = argparse.ArgumentParser()
-parser.add_argument("--sf", type=int, default=1, help="Scale factor (define o banco ecommerce_sf<SF>)")
-args = parser.parse_args()
+# workload_config põe no sys.path o diretório dos módulos comuns
+# (experiments_latest/koupil_tests/mysql)
+from workload_config import (
+    REGISTRY,
+    DEFAULT_RUNS_PER_TASK,
+    DEFAULT_TIMEOUT_MS,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF_S,
+    resolve_database_name,
+)
+from run_control import (
+    client_timeout_s,
+    set_statement_timeout,
+    run_with_retries,
+    run_record,
+)
+from run_log import RunLog, derive_outputs
+from task_registry import ResultDigest, result_digest
+from result_sample import DEFAULT_SAMPLE_SIZE, consume, sample_frame
+from wire_protocol import (
+    DEFAULT_PROTOCOL, PROTOCOLS, BytesSentCounter, cursor_class, fetch_all, iter_batches, streaming,
+)
 
-from workload_config import resolve_database_name
-DB_NAME = resolve_database_name(args.sf)
-
-
-print(f"\n📌 Workload apontando para o banco: {DB_NAME}\n")
-
-# ==========================
-# CONFIG DO BANCO
-# ==========================
 DB_CONFIG = {
     "host": "127.0.0.1",
     "port": 3308,
     "user": "root",
     "password": "root",
-    "database": DB_NAME,
     "cursorclass": pymysql.cursors.Cursor,
 }
 
-OUTPUT_DIR = f"outputs_sf{args.sf}"
-
-# ==========================
-# IMPORTAR CONFIG DO WORKLOAD
-# ==========================
-from workload_config import TASK_DEFINITIONS, TASK_RUNS, DEFAULT_RUNS_PER_TASK
+OUTPUT_DIR = None
 
 RESET = "\033[0m"
 BOLD = "\033[1m"
@@ -60,58 +61,206 @@ def ensure_output_dir():
         os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
-def run_query_once(task_name, sql, run_number):
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sf", type=int, default=1, help="Scale factor (define o banco ecommerce_sf<SF>)")
+    parser.add_argument("--only", nargs="+", metavar="TASK", help="Executa só estas tasks (nomes do registro)")
+    parser.add_argument("--tag", nargs="+", metavar="TAG", help="Executa só as tasks com alguma destas tags")
+    parser.add_argument("--runs", type=int, help="Sobrescreve o número de runs de todas as tasks selecionadas")
+    parser.add_argument("--list", action="store_true", help="Lista as tasks registradas e sai")
+    parser.add_argument("--protocol", nargs="+", default=[], choices=list(PROTOCOLS), metavar="PERFIL",
+                        help=f"Também executa as tasks com estes perfis de protocolo ({', '.join(PROTOCOLS)})")
+    parser.add_argument("--rewrites", action="store_true",
+                        help="Também executa as reescritas registradas e confere o resultado contra a task original")
+    parser.add_argument("--sample", type=int, nargs="?", const=0, metavar="N",
+                        help=f"Lê sem buffer e guarda só uma amostra (+ início e fim) do resultado: N linhas, "
+                             f"ou Task.sample / {DEFAULT_SAMPLE_SIZE} sem N (padrão: resultado inteiro)")
+    parser.add_argument("--timeout-ms", type=int, help="Timeout por statement (0 = sem limite)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries por run em erros transitórios")
+    parser.add_argument("--resume", action="store_true", help="Continua a execução interrompida a partir do run_log.jsonl (runs falhos são executados de novo)")
+    return parser.parse_args()
+
+
+def run_query_once(task_name, sql, run_number, params=None, timeout_ms=None, protocol=PROTOCOLS[DEFAULT_PROTOCOL],
+                   digest=False, sample=None):
     ensure_output_dir()
+    # com amostra o resultado é lido em lotes sem buffer e só a amostra fica em memória
+    if sample is not None:
+        protocol = streaming(protocol)
     log(f"=== {task_name} (run {run_number}) ===", CYAN)
 
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = pymysql.connect(**DB_CONFIG, read_timeout=client_timeout_s(timeout_ms))
 
     try:
-        with conn.cursor() as cur:
+        with conn.cursor() as status_cur, conn.cursor(cursor_class(protocol)) as cur:
+            set_statement_timeout(status_cur, timeout_ms)
+            wire = BytesSentCounter(status_cur)
             t0 = time.perf_counter()
-            cur.execute(sql)
-            rows = cur.fetchall()
-            elapsed_ms = (time.perf_counter() - t0) * 1000
-            df = pd.DataFrame(rows, columns=[d[0] for d in cur.description])
-            log(f"OK: {len(rows)} linhas ({elapsed_ms:.2f} ms)", GREEN)
-            return df, len(rows), elapsed_ms
+            cur.execute(sql, params or None)
+            if sample is None:
+                rows = fetch_all(cur, protocol)
+                elapsed_ms = (time.perf_counter() - t0) * 1000
+                wire_bytes = wire.delta()
+                df = pd.DataFrame(rows, columns=[d[0] for d in cur.description])
+                log(f"OK: {len(rows)} linhas, {wire_bytes / 1e6:.2f} MB ({elapsed_ms:.2f} ms)", GREEN)
+                # digest fora do tempo medido
+                return df, len(rows), elapsed_ms, wire_bytes, result_digest(rows) if digest else None
+
+            hasher = ResultDigest() if digest else None
+            reservoir, digest_s = consume(iter_batches(cur, protocol), sample, hasher)
+            elapsed_ms = (time.perf_counter() - t0 - digest_s) * 1000
+            wire_bytes = wire.delta()
+            df = sample_frame(reservoir, [d[0] for d in cur.description])
+            log(f"OK: {reservoir.count} linhas (amostra de {len(df)}), {wire_bytes / 1e6:.2f} MB "
+                f"({elapsed_ms:.2f} ms)", GREEN)
+            return df, reservoir.count, elapsed_ms, wire_bytes, hasher.hexdigest() if hasher else None
     finally:
         conn.close()
 
 
+def write_summary(run_log, rewrite_of):
+    # <task>_runs.csv e summary.csv regerados do run_log
+    summary = [
+        {
+            "task": row["task"],
+            "protocol": row.get("protocol"),
+            "rewrite_of": rewrite_of.get(row["task"]),
+            "avg_ms": row["avg_time_ms"],
+            "p50_ms": row["p50_ms"],
+            "p90_ms": row["p90_ms"],
+            "p99_ms": row["p99_ms"],
+            "p99_9_ms": row["p99_9_ms"],
+            "avg_wire_bytes": row["avg_wire_bytes"],
+            "runs_valid": row["runs_valid"],
+            "runs_failed": row["runs_failed"],
+            "retries": row["retries"],
+            "errors": row["errors"],
+            "result_digest": row["result_digest"],
+        }
+        for row in derive_outputs(run_log.path, OUTPUT_DIR)
+    ]
+    summary_df = pd.DataFrame(summary)
+    if rewrite_of and not summary_df.empty:
+        # results_match: mesmo digest da original; rewrite_rank: 1 = mais rápida da família
+        digest_by_task = dict(zip(summary_df["task"], summary_df["result_digest"]))
+        summary_df["results_match"] = [
+            digest == digest_by_task.get(base) if base and digest and digest_by_task.get(base) else None
+            for base, digest in zip(summary_df["rewrite_of"], summary_df["result_digest"])
+        ]
+        family = summary_df["rewrite_of"].fillna(summary_df["task"])
+        summary_df["rewrite_rank"] = (
+            summary_df.groupby(family)["avg_ms"].rank(method="min")
+            .where(family.isin(set(rewrite_of.values())))
+        )
+    summary_df.to_csv(f"{OUTPUT_DIR}/summary.csv", index=False)
+
+
 def main():
+    global OUTPUT_DIR
+
+    args = parse_args()
+    if args.list:
+        print(REGISTRY.describe())
+        return
+
+    try:
+        tasks = REGISTRY.select(only=args.only, tags=args.tag)
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+
+    # reescritas <task>_<nome>: outra forma da mesma query, com o resultado conferido
+    rewrite_of = {}
+    if args.rewrites:
+        for task in list(tasks):
+            for rewrite in task.rewrite_tasks():
+                rewrite_of[rewrite.name] = task.name
+                tasks.append(rewrite)
+    verified = set(rewrite_of) | set(rewrite_of.values())
+    digests = {}
+
+    # variantes <task>_<perfil>: mesma query com outro cursor/fetch size
+    task_protocols = {task.name: DEFAULT_PROTOCOL for task in tasks}
+    for profile in [p for p in args.protocol if p != DEFAULT_PROTOCOL]:
+        for task in [t for t in tasks if task_protocols[t.name] == DEFAULT_PROTOCOL]:
+            variant = replace(task, name=f"{task.name}_{profile}", equivalent=None, base_task=task.name)
+            task_protocols[variant.name] = profile
+            tasks.append(variant)
+
+    db_name = resolve_database_name(args.sf)
+    DB_CONFIG["database"] = db_name
+    OUTPUT_DIR = f"outputs_sf{args.sf}"
+
+    print(f"\n📌 Workload apontando para o banco: {db_name}\n")
+
     ensure_output_dir()
-    log(f"Iniciando workload para banco {DB_NAME}", BOLD + CYAN)
+    log(f"Iniciando workload para banco {db_name}", BOLD + CYAN)
 
-    metrics = {}
+    # cada run concluído vira um evento no run_log.jsonl; --resume continua do próximo
+    try:
+        run_log = RunLog(
+            OUTPUT_DIR, {"engine": "mysql", "sf": args.sf, "database": db_name}, resume=args.resume
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
 
-    for task_name, sql in TASK_DEFINITIONS:
-        runs = TASK_RUNS.get(task_name, DEFAULT_RUNS_PER_TASK)
-        log(f"Task {task_name}: {runs} runs", MAGENTA)
+    for task in tasks:
+        task_name = task.name
+        sql = task.query()
+        runs = args.runs or task.runs_or(DEFAULT_RUNS_PER_TASK)
+        expected_rows = task.expected_rows_for(args.sf)
+        timeout_ms = args.timeout_ms if args.timeout_ms is not None else task.timeout_ms_for(args.sf, DEFAULT_TIMEOUT_MS)
+        protocol = PROTOCOLS[task_protocols[task_name]]
+        log(f"Task {task_name}: {runs} runs (protocolo {task_protocols[task_name]})", MAGENTA)
+        sample = None
+        if args.sample is not None:
+            sample = dict(task.sample or {})
+            if args.sample:
+                sample["size"] = args.sample
 
-        metrics[task_name] = []
+        done = run_log.completed(task_name)
+        if done:
+            log(f"Retomando: {len(done)} run(s) já no run_log", YELLOW)
+
+        run_log.task(task_name, {"task": task_name, "protocol": task_protocols[task_name], "sf": args.sf})
         last_df = None
 
         for r in range(1, runs + 1):
-            df, rows, ms = run_query_once(task_name, sql, r)
-            metrics[task_name].append({"run": r, "rows": rows, "elapsed_ms": ms})
-            last_df = df
+            if r in done:
+                continue
+
+            outcome = run_with_retries(
+                lambda: run_query_once(task_name, sql, r, task.params, timeout_ms, protocol, task_name in verified, sample),
+                args.retries,
+                DEFAULT_RETRY_BACKOFF_S,
+                log=lambda msg: log(msg, YELLOW),
+            )
+            if outcome.ok:
+                df, rows, ms, wire_bytes, digest = outcome.result
+                if expected_rows is not None and rows != expected_rows:
+                    log(f"AVISO: {rows} linhas, esperado {expected_rows}", YELLOW)
+                run_log.run(task_name, run_record(r, outcome, ms, rows, wire_bytes=wire_bytes, result_digest=digest))
+                if digest is not None:
+                    digests[task_name] = digest
+                last_df = df
+            else:
+                # falha de um run não interrompe o workload
+                log(f"ERRO ({outcome.error_class}, {outcome.attempts} tentativa(s)): {outcome.error}", RED)
+                run_log.run(task_name, run_record(r, outcome))
 
         if last_df is not None:
             last_df.to_csv(f"{OUTPUT_DIR}/{task_name}.csv", index=False)
 
-        pd.DataFrame(metrics[task_name]).to_csv(
-            f"{OUTPUT_DIR}/{task_name}_runs.csv", index=False
-        )
+        run_log.sync()
+        write_summary(run_log, rewrite_of)
 
-    # resumo geral
-    summary = []
-    for task_name, values in metrics.items():
-        times = [v["elapsed_ms"] for v in values]
-        avg = stats.mean(times)
-        summary.append({"task": task_name, "avg_ms": avg})
+        base = rewrite_of.get(task_name)
+        if base in digests and task_name in digests and digests[base] != digests[task_name]:
+            log(f"AVISO: {task_name} devolveu um resultado diferente de {base}", RED)
+
+    run_log.close()
 
-    pd.DataFrame(summary).to_csv(f"{OUTPUT_DIR}/summary.csv", index=False)
+    # resumo geral
+    write_summary(run_log, rewrite_of)
     log("Workload concluído!", GREEN)
 
 
@@ -2,39 +2,80 @@
 # workload_config.py
 # MySQL workload – M2Bench (schema REAL DEFINITIVO)
 
+import os
+import sys
+
+# Módulos comuns dos runners (task_registry, run_log, run_control...) ficam só
+# em experiments_latest/koupil_tests/mysql; entram no fim do sys.path para
+# os daqui (workload_config) terem precedência
+MYSQL_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "experiments_latest", "koupil_tests", "mysql"
+))
+if MYSQL_DIR not in sys.path:
+    sys.path.append(MYSQL_DIR)
+
+from task_registry import TaskRegistry
+
 DEFAULT_RUNS_PER_TASK = 5
-TASK_RUNS = {}
+
+# Limite por statement (MAX_EXECUTION_TIME) e retries de erros transitórios
+DEFAULT_TIMEOUT_MS = 30 * 60 * 1000
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_S = 2.0
+
+# Tasks registradas com @REGISTRY.task(...); `equivalent` aponta para a
+# task gêmea em koupil_testes_document/workload_config_mongo.py; formas
+# equivalentes entram com @REGISTRY.rewrite(task, nome) e rodam com --rewrites;
+# `sample` ajusta a amostra do resultado usada com --sample (result_sample.py)
+REGISTRY = TaskRegistry()
 
 def resolve_database_name(sf: int) -> str:
     if sf == 1:
         return "ecommerce"
     return f"ecommerce_sf{sf}"
 
-TASK_DEFINITIONS = [
-
-    # --------------------------------------------------
-    # Q1 – Scan simples de pedidos
-    # --------------------------------------------------
-    ("Q1_scan_orders", """
+# --------------------------------------------------
+# Q1 – Scan simples de pedidos
+# --------------------------------------------------
+@REGISTRY.task(
+    "Q1_scan_orders",
+    tags=("Q1", "scan"),
+    equivalent="Q1_scan_orders",
+)
+def q1_scan_orders():
+    return """
         SELECT
             o.order_id,
             o.customer_id,
             o.total_price
         FROM `Order` o;
-    """),
+    """
 
-    # --------------------------------------------------
-    # Q2 – Contagem total de pedidos
-    # --------------------------------------------------
-    ("Q2_count_orders", """
+# --------------------------------------------------
+# Q2 – Contagem total de pedidos
+# --------------------------------------------------
+@REGISTRY.task(
+    "Q2_count_orders",
+    tags=("Q2", "aggregate"),
+    expected_rows=1,
+    equivalent="Q2_count_orders",
+)
+def q2_count_orders():
+    return """
         SELECT COUNT(*) AS total_orders
         FROM `Order`;
-    """),
+    """
 
-    # --------------------------------------------------
-    # Q3 – Pedidos que contêm um produto existente
-    # --------------------------------------------------
-    ("Q3_orders_by_product", """
+# --------------------------------------------------
+# Q3 – Pedidos que contêm um produto existente
+# --------------------------------------------------
+@REGISTRY.task(
+    "Q3_orders_by_product",
+    tags=("Q3", "index", "filter", "join"),
+    equivalent="Q3_orders_by_product",
+)
+def q3_orders_by_product():
+    return """
         SELECT DISTINCT o.order_id
         FROM `Order` o
         JOIN Order_line ol
@@ -44,12 +85,18 @@ TASK_DEFINITIONS = [
             FROM Order_line
             LIMIT 1
         );
-    """),
+    """
 
-    # --------------------------------------------------
-    # Q4 – Detalhes completos de um pedido existente
-    # --------------------------------------------------
-    ("Q4_order_details", """
+# --------------------------------------------------
+# Q4 – Detalhes completos de um pedido existente
+# --------------------------------------------------
+@REGISTRY.task(
+    "Q4_order_details",
+    tags=("Q4", "lookup", "join"),
+    equivalent="Q4_order_details",
+)
+def q4_order_details():
+    return """
         SELECT
             o.order_id,
             o.customer_id,
@@ -63,31 +110,84 @@ TASK_DEFINITIONS = [
             FROM `Order`
             LIMIT 1
         );
-    """),
+    """
 
-    # --------------------------------------------------
-    # Q5 – Pedidos sem itens caros (anti-join)
-    # --------------------------------------------------
-    ("Q5_orders_without_expensive_items", """
+# --------------------------------------------------
+# Q5 – Pedidos sem itens caros (anti-join)
+# --------------------------------------------------
+@REGISTRY.task(
+    "Q5_orders_without_expensive_items",
+    tags=("Q5", "anti-join", "filter"),
+    params={"max_price": 1000},
+    equivalent="Q5_orders_without_expensive_items",
+)
+def q5_orders_without_expensive_items(max_price):
+    # max_price chega ao servidor como parâmetro do execute() (Task.params),
+    # não no texto do SQL
+    return """
         SELECT o.order_id
         FROM `Order` o
         WHERE NOT EXISTS (
             SELECT 1
             FROM Order_line ol
             WHERE ol.order_id = o.order_id
-              AND ol.price > 1000
+              AND ol.price > %(max_price)s
         );
-    """),
+    """
 
-    # --------------------------------------------------
-    # Q6 – Número de pedidos por cliente
-    # --------------------------------------------------
-    ("Q6_orders_per_customer", """
+@REGISTRY.rewrite("Q5_orders_without_expensive_items", "left_join_is_null")
+def q5_left_join_is_null(max_price):
+    """Anti-join com LEFT JOIN ... IS NULL."""
+    return """
+        SELECT o.order_id
+        FROM `Order` o
+        LEFT JOIN Order_line ol
+            ON ol.order_id = o.order_id
+           AND ol.price > %(max_price)s
+        WHERE ol.order_id IS NULL;
+    """
+
+@REGISTRY.rewrite("Q5_orders_without_expensive_items", "prefiltered_anti_join")
+def q5_prefiltered_anti_join(max_price):
+    """Pedidos com item caro calculados uma vez (DISTINCT) e excluídos por anti-join."""
+    return """
+        SELECT o.order_id
+        FROM `Order` o
+        LEFT JOIN (
+            SELECT DISTINCT order_id
+            FROM Order_line
+            WHERE price > %(max_price)s
+        ) caros
+            ON caros.order_id = o.order_id
+        WHERE caros.order_id IS NULL;
+    """
+
+@REGISTRY.rewrite("Q5_orders_without_expensive_items", "not_in")
+def q5_not_in(max_price):
+    """NOT IN: só equivale ao NOT EXISTS se Order_line.order_id não tiver NULL."""
+    return """
+        SELECT o.order_id
+        FROM `Order` o
+        WHERE o.order_id NOT IN (
+            SELECT ol.order_id
+            FROM Order_line ol
+            WHERE ol.price > %(max_price)s
+        );
+    """
+
+# --------------------------------------------------
+# Q6 – Número de pedidos por cliente
+# --------------------------------------------------
+@REGISTRY.task(
+    "Q6_orders_per_customer",
+    tags=("Q6", "aggregate", "group-by"),
+    equivalent="Q6_orders_per_customer",
+)
+def q6_orders_per_customer():
+    return """
         SELECT
             o.customer_id,
             COUNT(*) AS total_orders
         FROM `Order` o
         GROUP BY o.customer_id;
-    """),
-]
-
+    """